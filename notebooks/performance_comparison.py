@@ -199,26 +199,12 @@ for _, test_set in vl_test_sets + syn_test_sets + gtd_test_sets:
     if "truth" in test_set and preprocess_truth:
         test_set.truth = Preprocessing.replace_characters_gov(test_set.truth).str.strip()
 
-# %%
-from collections import defaultdict
-
 # %%
 if preprocess_gov:
     old_names = list(gov.ids_by_name.keys())
     new_names = Preprocessing.replace_characters_gov(pd.Series(old_names, dtype=str)).str.strip()
 
-    ids_by_pname = defaultdict(set)
-    for old_name, new_name in zip(old_names, new_names):
-        ids_by_pname[new_name] |= gov.ids_by_name[old_name]
-    ids_by_pname.default_factory = None
-    gov.ids_by_name = ids_by_pname
-
-    pnames_by_id = defaultdict(set)
-    for k, v in ids_by_pname.items():
-        for i in v:
-            pnames_by_id[i] |= {k}
-    pnames_by_id.default_factory = None
-    gov.names_by_id = pnames_by_id
+    gov.rename(dict(zip(old_names, new_names)))
 
 # %% [markdown]
 # Test Set 1
@@ -301,26 +287,13 @@ for _, test_set in vl_test_sets + syn_test_sets + gtd_test_sets:
         test_set.truth = Preprocessing.substitute_full_words(test_set.truth, data_root).str.strip()
 
 # %%
-from collections import defaultdict
-
 if preprocess_gov:
     old_names = list(gov.ids_by_name.keys())
     new_names = Preprocessing.substitute_partial_words(pd.Series(old_names), data_root).str.strip()
     new_names = Preprocessing.substitute_delete_words(pd.Series(new_names), data_root).str.strip()
     new_names = Preprocessing.substitute_full_words(pd.Series(new_names), data_root).str.strip()
 
-    ids_by_pname = defaultdict(set)
-    for old_name, new_name in zip(old_names, new_names):
-        ids_by_pname[new_name] |= gov.ids_by_name[old_name]
-    ids_by_pname.default_factory = None
-    gov.ids_by_name = ids_by_pname
-
-    pnames_by_id = defaultdict(set)
-    for k, v in ids_by_pname.items():
-        for i in v:
-            pnames_by_id[i] |= {k}
-    pnames_by_id.default_factory = None
-    gov.names_by_id = pnames_by_id
+    gov.rename(dict(zip(old_names, new_names)))
 
 # %% [markdown]
 # Test Set 1
@@ -458,25 +431,12 @@ idx = test_set.location.str.lower() != test_set_prep.location.str.lower()
 pd.DataFrame([test_set.location[idx], test_set_prep.location[idx]]).T
 
 # %%
-from collections import defaultdict
-
 old_names = list(gov.ids_by_name.keys())
 new_names = Preprocessing.substitute_partial_words(pd.Series(old_names), data_root)
 new_names = Preprocessing.substitute_delete_words(pd.Series(new_names), data_root)
 new_names = Preprocessing.substitute_full_words(pd.Series(new_names), data_root)
 
-ids_by_pname = defaultdict(set)
-for old_name, new_name in zip(old_names, new_names):
-    ids_by_pname[new_name] |= gov.ids_by_name[old_name]
-ids_by_pname.default_factory = None
-gov.ids_by_name = ids_by_pname
-
-pnames_by_id = defaultdict(set)
-for k, v in ids_by_pname.items():
-    for i in v:
-        pnames_by_id[i] |= {k}
-pnames_by_id.default_factory = None
-gov.names_by_id = pnames_by_id
+gov.rename(dict(zip(old_names, new_names)))
 
 # %%
 m = Matcher(gov, **matcher_params)
@@ -497,13 +457,13 @@ print(len([(part, partdict) for part, partdict in results_with_prep.items() if n
 gov.ids_by_name["neddemin"]
 
 # %%
-gov.all_reachable_nodes_by_id[356042]
+gov.get_reachable_nodes_by_id({356042})
 
 # %%
-gov.decode_path_name(gov.all_reachable_nodes_by_id[356042])
+gov.decode_path_name(gov.get_reachable_nodes_by_id({356042}))
 
 # %% tags=[]
-gov.all_reachable_nodes_by_id
+gov.reachability
 
 # %%
 m = Matcher(gov, **matcher_params)
@@ -517,17 +477,17 @@ gov.ids_by_name['geispolsheim']
 
 # %%
 for id in gov.ids_by_name['geispolsheim']:
-    print([gov.names_by_id[id] for id in gov.all_reachable_nodes_by_id[id]])
+    print([gov.names_by_id[id] for id in gov.get_reachable_nodes_by_id({id})])
 
 # %%
 for id in gov.ids_by_name['erstein']:
-    print([gov.names_by_id[id] for id in gov.all_reachable_nodes_by_id[id]])
+    print([gov.names_by_id[id] for id in gov.get_reachable_nodes_by_id({id})])
 
 # %%
-ids_geispolsheim = set().union(*(gov.all_reachable_nodes_by_id[id] for id in gov.ids_by_name['geispolsheim']))
+ids_geispolsheim = gov.get_reachable_nodes_by_id(gov.ids_by_name['geispolsheim'])
 
 # %%
-ids_erstein = set().union(*(gov.all_reachable_nodes_by_id[id] for id in gov.ids_by_name['erstein']))
+ids_erstein = gov.get_reachable_nodes_by_id(gov.ids_by_name['erstein'])
 
 # %%
 gov.decode_path_name(ids_geispolsheim & ids_erstein)
@@ -536,6 +496,6 @@ gov.decode_path_name(ids_geispolsheim & ids_erstein)
 gov.ids_by_name["unter-elsaß"]
 
 # %%
-set().union(*(gov.names_by_id[id] for id in gov.all_reachable_nodes_by_id[266451]))
+set().union(*(gov.names_by_id[id] for id in gov.get_reachable_nodes_by_id({266451})))
 
 # %%
@@ -1,17 +1,19 @@
 from .correction import (LocCorrection, Phonetic, Preprocessing)
-from .gov import Gov, Matcher
+from .gov import Gov, GovStore, Matcher, ResultStore
 from .testdata import (GovTestData, Manipulator, StringEnriched, Synthetic,
                        get_accuracy, sample_test_set_from_gov)
 
 __all__ = [
     "get_accuracy",
     "Gov",
+    "GovStore",
     "GovTestData",
     "LocCorrection",
     "Manipulator",
     "Matcher",
     "Phonetic",
     "Preprocessing",
+    "ResultStore",
     "sample_test_set_from_gov",
     "StringEnriched",
     "Synthetic",
@@ -3,13 +3,13 @@ import json
 import pprint
 import textwrap
 from datetime import datetime
-from collections import defaultdict
+from typing import Optional
 
 import pandas as pd
 import pyperclip as pc
 
 from compgen2.correction import Preprocessing
-from compgen2.gov import Gov, Matcher
+from compgen2.gov import Gov, Matcher, ResultStore
 
 MATCHER_PARAMS = {
     "use_difflib": True,
@@ -42,17 +42,27 @@ A simple cli tool to match a single location name or a list of location names ag
     )
     parser.add_argument("-d", "--data-root", required=True, help="Path to the local data root directory.")
     parser.add_argument("-p", "--use-preprocessing", action="store_true")
+    parser.add_argument(
+        "-j", "--processes", type=int, default=1, help="Number of processes that match the locations of the file."
+    )
+    parser.add_argument(
+        "-c", "--cache", help="SQLite file that keeps the results across runs. Only new locations are matched."
+    )
 
     return parser.parse_args()
 
 
-def get_matches(locations: list[str], preprocessing: bool, data_root: str) -> dict:
+def get_matches(
+    locations: list[str], preprocessing: bool, data_root: str, num_processes: int = 1, cache: Optional[str] = None
+) -> dict:
     """Find possible matches for all locations.
 
     Args:
         locations (list[str]): list of location names.
         preprocessing (bool): preprocess location before matching.
         data_root (str): root directory holding the data.
+        num_processes (int): number of processes that match the locations.
+        cache (Optional[str]): SQLite file of a result store that is consulted before matching a location.
 
     Returns:
         str: json representation of the result object.
@@ -77,21 +87,14 @@ def get_matches(locations: list[str], preprocessing: bool, data_root: str) -> di
         new_names = Preprocessing.substitute_delete_words(pd.Series(new_names), data_root).str.strip()
         new_names = Preprocessing.substitute_full_words(pd.Series(new_names), data_root).str.strip()
 
-        ids_by_pname = defaultdict(set)
-        for old_name, new_name in zip(old_names, new_names):
-            ids_by_pname[new_name] |= gov.ids_by_name[old_name]
-        ids_by_pname.default_factory = None
-        gov.ids_by_name = ids_by_pname
-
-        pnames_by_id = defaultdict(set)
-        for k, v in ids_by_pname.items():
-            for i in v:
-                pnames_by_id[i] |= {k}
-        pnames_by_id.default_factory = None
-        gov.names_by_id = pnames_by_id
+        gov.rename(dict(zip(old_names, new_names)))
 
-    m = Matcher(gov, **MATCHER_PARAMS)
-    m.get_match_for_locations(locations)
+    result_store = ResultStore(cache, preprocessing=preprocessing) if cache else None
+    m = Matcher(gov, **MATCHER_PARAMS, result_store=result_store)
+    m.get_match_for_locations(locations, num_processes=num_processes)
+    if result_store is not None:
+        print(f"Found {result_store.hits} of {result_store.hits + result_store.misses} results in {cache}.")
+        result_store.close()
 
     return m.results
 
@@ -143,7 +146,7 @@ def main():
         with open(args.file, "r", encoding="utf-8") as fh:
             locations = fh.read().splitlines()
         print(f"Processing {len(locations)} locations...")
-        result = get_matches(locations, args.use_preprocessing, args.data_root)
+        result = get_matches(locations, args.use_preprocessing, args.data_root, args.processes, args.cache)
 
         output = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}_compgen2.json"
         print(f"Results will be written to {output}.")
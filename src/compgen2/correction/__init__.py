@@ -1,3 +1,5 @@
+from .deletion_index import DeletionIndex
 from .loc_autocorrection import LocCorrection
+from .ngram_index import NgramIndex
 from .phonetic import Phonetic
-from .preprocessing import Preprocessing
\ No newline at end of file
+from .preprocessing import Preprocessing
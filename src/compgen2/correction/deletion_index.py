@@ -0,0 +1,205 @@
+"""This module contains the DeletionIndex class for bounded edit distance lookups (SymSpell).
+
+If the Levenshtein distance of two words is at most k, deleting at most k characters from each word yields a common
+word. The index stores all words that result from deleting up to `max_cost` characters of each name (its deletion
+neighborhood). A lookup generates the deletion neighborhood of the query and collects the names that share any of
+these words. Only these candidates are verified by computing their distance to the query.
+
+As in SymSpell, the neighborhoods are built from the first `prefix_length` characters of each word only. This bounds
+the size of the index for long names. The candidates are still verified with the distance of the full words.
+
+The neighborhoods are not stored as strings, but as a sorted array of their hashes plus the aligned name codes.
+A hash collision only adds a candidate, which is then rejected by the verification. The hash does not depend on the
+hash seed of the process, so the index can be saved and memory-mapped by other processes (see `save()`).
+
+Examples:
+```Python
+index = DeletionIndex(gov.name_universe(), max_cost=3)
+index.search("aachne", 2)  # [("aachen", 2)]
+```
+"""
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .trie_levenshtein import string_hashes
+
+
+def _distances(word: str, others: list[str]) -> np.ndarray:
+    """Return the Levenshtein distances of `word` to each word of `others`.
+
+    The rows of the dynamic program are computed for all words at once. Within a row, the insertions are resolved
+    by a running minimum: `row[j] = min(row[k] + j - k for k <= j)`.
+    """
+    lengths = np.fromiter(map(len, others), dtype=np.int64, count=len(others))
+    width = int(lengths.max(initial=0))
+    letters = np.array(others, dtype=f"<U{max(width, 1)}").view(np.uint32).reshape(len(others), -1)[:, :width]
+    columns = np.arange(width + 1)
+    previous_row = np.broadcast_to(columns, (len(others), width + 1))
+    for row, letter in enumerate(word, 1):
+        current_row = np.empty_like(previous_row)
+        current_row[:, 0] = row
+        current_row[:, 1:] = np.minimum(previous_row[:, 1:] + 1, previous_row[:, :-1] + (letters != ord(letter)))
+        previous_row = np.minimum.accumulate(current_row - columns, axis=1) + columns
+    return previous_row[np.arange(len(others)), lengths]
+
+
+def _deletes(word: str, max_cost: int) -> set[str]:
+    """Return all words that result from deleting up to `max_cost` characters of `word`, including `word`."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_cost):
+        frontier = {variant[:i] + variant[i + 1 :] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """Index of the deletion neighborhoods of names for lookups up to a maximum Levenshtein distance.
+
+    Attributes:
+        max_cost (int): Maximum distance of a lookup.
+        prefix_length (int): Number of leading characters of a name whose deletions are indexed.
+        names (Union[np.ndarray, StringTable]): Sorted names, an object array or a `StringTable` if the index was
+            loaded. The position of a name is its code.
+        lengths (np.ndarray): Length of each name.
+        hashes (np.ndarray): Sorted hashes of the deletion neighborhoods of all names.
+        codes (np.ndarray): The name code of each hash.
+    """
+
+    def __init__(self, names: Iterable[str], max_cost: int = 3, prefix_length: int = 7) -> None:
+        self.max_cost = max_cost
+        self.prefix_length = prefix_length
+        self.names = np.array(sorted(names), dtype=object)
+        self.lengths = np.fromiter(map(len, self.names), dtype=np.int32, count=len(self.names))
+        variants = []
+        counts = []
+        for name in self.names.tolist():
+            name_variants = _deletes(name[:prefix_length], max_cost)
+            variants.extend(name_variants)
+            counts.append(len(name_variants))
+        hashes = string_hashes(variants)
+        codes = np.repeat(np.arange(len(self.names), dtype=np.int32), counts)
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.codes = codes[order]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def save(self, folder: str, meta: Optional[dict[str, object]] = None) -> None:
+        """Save the index into `folder`, so that other processes can memory-map it via `load()`."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        names = StringTable.from_strings(self.names.tolist())
+        arrays = {
+            "names_data": names.data,
+            "names_offsets": names.offsets,
+            "lengths": self.lengths,
+            "hashes": self.hashes,
+            "codes": self.codes,
+        }
+        meta = {**(meta or {}), "max_cost": self.max_cost, "prefix_length": self.prefix_length}
+        shared.publish(Path(folder), arrays, meta)
+
+    @staticmethod
+    def load(folder: str) -> tuple["DeletionIndex", dict[str, object]]:
+        """Memory-map the index saved into `folder` and return it with the meta data passed to `save()`."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        arrays, meta = shared.attach(Path(folder))
+        index = DeletionIndex.__new__(DeletionIndex)
+        index.max_cost = meta.pop("max_cost")
+        index.prefix_length = meta.pop("prefix_length")
+        index.names = StringTable(arrays["names_data"], arrays["names_offsets"])
+        index.lengths = arrays["lengths"]
+        index.hashes = arrays["hashes"]
+        index.codes = arrays["codes"]
+        return index, meta
+
+    def search(self, word: str, max_cost: int, relevant_names: Optional[set[str]] = None) -> list[tuple[str, int]]:
+        """Return all names within a Levenshtein distance of `max_cost` to `word`.
+
+        Args:
+            word (str): The query. It is lowercased like in `LocCorrection.search()`.
+            max_cost (int): Maximum distance, at most the `max_cost` of the index.
+            relevant_names (Optional[set[str]]): Only return names in this set. Defaults to all names.
+
+        Raises:
+            ValueError: If `max_cost` exceeds the `max_cost` of the index.
+
+        Returns:
+            list[tuple[str, int]]: Each name and its distance to `word` in alphabetical order.
+        """
+        if max_cost > self.max_cost:
+            raise ValueError(f"max_cost {max_cost} exceeds the max_cost {self.max_cost} of the index.")
+        word = word.lower()
+        variants = string_hashes(_deletes(word[: self.prefix_length], max_cost))
+        begins = np.searchsorted(self.hashes, variants, side="left")
+        ends = np.searchsorted(self.hashes, variants, side="right")
+        codes = np.unique(np.concatenate([self.codes[begin:end] for begin, end in zip(begins, ends)]))
+        codes = codes[np.abs(self.lengths[codes] - len(word)) <= max_cost]
+
+        names = self.names[codes].tolist()
+        if relevant_names is not None:
+            names = [name for name in names if name in relevant_names]
+        if not names:
+            return []
+        distances = _distances(word, names)
+        return [(name, distance) for name, distance in zip(names, distances.tolist()) if distance <= max_cost]
+
+    def search_by_cost(
+        self, word: str, max_cost: int, relevant_names: Optional[set[str]] = None
+    ) -> Iterator[list[tuple[str, int]]]:
+        """Yield the names with a distance of 0, 1, ... up to `max_cost` to `word`, one list per distance.
+
+        The deletions of `word` are looked up one distance at a time. After k deletions, all names within a
+        distance of k are verified, so the list of distance k is complete. The next deletions are only generated
+        if the caller asks for the next list. Each candidate is verified once.
+
+        Args:
+            word (str): The query. It is lowercased like in `LocCorrection.search()`.
+            max_cost (int): Maximum distance, at most the `max_cost` of the index.
+            relevant_names (Optional[set[str]]): Only return names in this set. Defaults to all names.
+
+        Raises:
+            ValueError: If `max_cost` exceeds the `max_cost` of the index.
+
+        Returns:
+            Iterator[list[tuple[str, int]]]: `max_cost` + 1 lists of the names and their distance in alphabetical
+            order.
+        """
+        if max_cost > self.max_cost:
+            raise ValueError(f"max_cost {max_cost} exceeds the max_cost {self.max_cost} of the index.")
+        word = word.lower()
+        frontier = {word[: self.prefix_length]}
+        variants = set(frontier)
+        verified = np.zeros(0, dtype=np.int32)
+        # candidates whose length differs too much from the word for the current distance are verified later
+        pending = verified
+        found = [[] for _ in range(max_cost + 1)]
+        for cost in range(max_cost + 1):
+            if cost:
+                frontier = {variant[:i] + variant[i + 1 :] for variant in frontier for i in range(len(variant))}
+                frontier -= variants
+                variants |= frontier
+            hashes = string_hashes(frontier)
+            begins = np.searchsorted(self.hashes, hashes, side="left")
+            ends = np.searchsorted(self.hashes, hashes, side="right")
+            codes = [self.codes[begin:end] for begin, end in zip(begins, ends)]
+            pending = np.setdiff1d(np.concatenate(codes + [pending]), verified)
+            ready = np.abs(self.lengths[pending] - len(word)) <= cost
+            codes, pending = pending[ready], pending[~ready]
+            verified = np.union1d(verified, codes)
+
+            names = self.names[codes].tolist()
+            if relevant_names is not None:
+                names = [name for name in names if name in relevant_names]
+            if names:
+                for name, distance in zip(names, _distances(word, names).tolist()):
+                    if distance <= max_cost:
+                        found[distance].append(name)
+            yield [(name, cost) for name in sorted(found[cost])]
@@ -1,7 +1,15 @@
 # from Levenshtein import distance
+from bisect import bisect_left
 from functools import lru_cache
+from typing import Iterable, Iterator, Optional
 
-from .trie_levenshtein import TrieNode
+from .trie_levenshtein import ArrayTrie
+
+
+def _in_scope(scope: list[int], begin: int, end: int) -> bool:
+    """Return True if any code of the sorted `scope` is in the range `begin:end`."""
+    position = bisect_left(scope, begin)
+    return position < len(scope) and scope[position] < end
 
 
 class LocCorrection:
@@ -10,72 +18,163 @@ class LocCorrection:
         :param loc_list:  list of string
         """
         self.loc_list = loc_list
-        self.word_count = 0
-        self.trie = TrieNode()
-        self._list2trie()
+        self.meta = {}
+        # read dictionary file into a trie
+        # The words are inserted in sorted order, so each node covers a range of consecutive codes.
+        self.trie = ArrayTrie.from_words(sorted({word.lower() for word in loc_list}))
+        self.word_count = len(self.trie.words)
 
     @staticmethod
     @lru_cache(1000000)
     def from_list(loc_list):
         return LocCorrection(loc_list)
 
-    def _list2trie(self):
-        # read dictionary file into a trie
-        for word in self.loc_list:
-            self.word_count += 1
-            self.trie.insert(word.lower())
-        # The search function returns a list of all words that are less than the given
-        # maximum distance from the target word
+    def save(self, folder: str, meta: Optional[dict[str, object]] = None) -> None:
+        """Save the trie into `folder`, so that other processes can memory-map it via `load()`.
+
+        :param folder: target folder, it is replaced if it exists
+        :param meta: further data to save with the trie, e.g. to check that it is still valid
+        """
+        self.meta = meta or {}
+        self.trie.save(folder, self.meta)
+
+    @staticmethod
+    def load(folder: str) -> "LocCorrection":
+        """Memory-map the trie saved into `folder` by `save()`. Its meta data is available as `meta`."""
+        loc_correction = LocCorrection.__new__(LocCorrection)
+        loc_correction.trie, loc_correction.meta = ArrayTrie.load(folder)
+        loc_correction.loc_list = loc_correction.trie.words
+        loc_correction.word_count = len(loc_correction.trie.words)
+        return loc_correction
+
+    def scope(self, words: Iterable[str]) -> list[int]:
+        """Return the scope of a search that is restricted to `words`.
+
+        The scope is the sorted list of the codes of all allowed words. Like the query of `search()`, the words are
+        lowercased. Unknown words are ignored.
+        A branch of the trie contains an allowed word if any code of the scope is within its range.
+
+        :param words: iterable of allowed words
+        :return: sorted list of codes
+        """
+        codes = self.trie.find([word.lower() for word in words])
+        return sorted(codes[codes >= 0].tolist())
 
-    def search(self, word: str, maxCost: int) -> list[tuple[str, int]]:
+    def search(self, word: str, maxCost: int, scope: Optional[list[int]] = None) -> list[tuple[str, int]]:
         """Return all words that are within max cost of word
 
+        The nodes are visited in pre-order. If no entry of the row of a node is within max cost,
+        its subtree is skipped, as is any subtree without a word of the scope.
+
         :param word: string
         :param maxCost: only return candidates that have a distance to `word` less or equal to max cost.
+        :param scope: only return words of this scope, see `scope()`. Defaults to all words.
         :return:
         """
-        # build first row
         word = word.lower()
-        currentRow = range(len(word) + 1)
+        columns = len(word) + 1
+        trie = self.trie
+        # Item access on memoryviews returns plain ints and is much faster than on NumPy arrays.
+        letters = memoryview(trie.letters)
+        depths = memoryview(trie.depths)
+        ends = memoryview(trie.ends)
+        word_codes = memoryview(trie.word_codes)
+        code_begins = memoryview(trie.code_begins)
+        code_ends = memoryview(trie.code_ends)
+        # rows[depth] is the row of the current node's ancestor at depth, starting with the row of the root
+        rows = [list(range(columns))]
         results = []
-        # recursively search each branch of the trie
-        for letter in self.trie.children:
-            self._searchRecursive(
-                self.trie.children[letter], letter, word, currentRow, results, maxCost
-            )
+        node = 1
+        while node < len(letters):
+            if scope is not None and not _in_scope(scope, code_begins[node], code_ends[node]):
+                node = ends[node]
+                continue
+            depth = depths[node]
+            letter = chr(letters[node])
+            previousRow = rows[depth - 1]
+            currentRow = [previousRow[0] + 1]
+            # Build one row for the letter, with a column for each letter in the target
+            # word, plus one for the empty string at column 0
+            for column in range(1, columns):
+                insertCost = currentRow[column - 1] + 1
+                deleteCost = previousRow[column] + 1
+                if word[column - 1] != letter:
+                    replaceCost = previousRow[column - 1] + 1
+                else:
+                    replaceCost = previousRow[column - 1]
+
+                currentRow.append(min(insertCost, deleteCost, replaceCost))
+            del rows[depth:]
+            rows.append(currentRow)
+            # if the last entry in the row indicates the optimal cost is less than the
+            # defined cost, and there is a word in this trie node, then add it.
+            code = word_codes[node]
+            if currentRow[-1] <= maxCost and code >= 0 and (scope is None or _in_scope(scope, code, code + 1)):
+                if len(results) != 0 and currentRow[-1] > results[-1][1]:
+                    pass
+                else:
+                    results.append((trie.words[code], currentRow[-1]))
+            # if any entries in the row are less than the maximum cost, then
+            # search the subtree of the node, else skip it
+            if min(currentRow) <= maxCost:
+                node += 1
+            else:
+                node = ends[node]
         return results
 
-    # def cal_levenstein(self, word):
-    # This recursive helper is used by the search function above. It assumes that
-    # the previousRow has been filled in already.
-    #    return [distance(word.lower(), i.lower()) for i in self.loc_list]
+    def search_by_cost(
+        self, word: str, maxCost: int, scope: Optional[list[int]] = None
+    ) -> Iterator[list[tuple[str, int]]]:
+        """Yield the words with a distance of 0, 1, ... up to max cost to word, one list per distance
+
+        The nodes are visited best-first: a node is expanded in the order of the minimum of its row,
+        which is a lower bound of the distance of all words below it. All words with a distance of k are
+        known once the nodes with a minimum of k are expanded. Thus, each list is yielded as soon as it is
+        complete and the nodes with a higher minimum are only expanded if the caller asks for the next list.
 
-    def _searchRecursive(self, node, letter, word, previousRow, results, maxCost):
+        :param word: string
+        :param maxCost: the highest distance to yield words for
+        :param scope: only return words of this scope, see `scope()`. Defaults to all words.
+        :return: iterator of maxCost + 1 lists of words and their distance in alphabetical order
+        """
+        word = word.lower()
         columns = len(word) + 1
-        currentRow = [previousRow[0] + 1]
-        # Build one row for the letter, with a column for each letter in the target
-        # word, plus one for the empty string at column 0
-        for column in range(1, columns):
-            insertCost = currentRow[column - 1] + 1
-            deleteCost = previousRow[column] + 1
-            if word[column - 1] != letter:
-                replaceCost = previousRow[column - 1] + 1
-            else:
-                replaceCost = previousRow[column - 1]
-
-            currentRow.append(min(insertCost, deleteCost, replaceCost))
-        # if the last entry in the row indicates the optimal cost is less than the
-        # defined cost, and there is a word in this trie node, then add it.
-        if currentRow[-1] <= maxCost and node.word != None:
-            if len(results) != 0 and currentRow[-1] > results[-1][1]:
-                pass
-            else:
-                results.append((node.word, currentRow[-1]))
-        # recursively search each branch of the trie
-        if min(currentRow) <= maxCost:
-            for letter in node.children:
-                self._searchRecursive(
-                    node.children[letter], letter, word, currentRow, results, maxCost
-                )
-        # if any entries in the row are less than the maximum cost, then
-        # recursively search each branch of the trie
+        trie = self.trie
+        letters = memoryview(trie.letters)
+        ends = memoryview(trie.ends)
+        word_codes = memoryview(trie.word_codes)
+        code_begins = memoryview(trie.code_begins)
+        code_ends = memoryview(trie.code_ends)
+        # buckets[k] holds the nodes to expand with a minimum of k and their rows, found[k] the words at distance k
+        buckets = [[] for _ in range(maxCost + 1)]
+        found = [[] for _ in range(maxCost + 1)]
+        buckets[0].append((0, list(range(columns))))
+        for cost in range(maxCost + 1):
+            bucket = buckets[cost]
+            # expanding a node may append children with the same minimum to the bucket
+            for node, previousRow in bucket:
+                child = node + 1
+                while child < ends[node]:
+                    if scope is not None and not _in_scope(scope, code_begins[child], code_ends[child]):
+                        child = ends[child]
+                        continue
+                    letter = chr(letters[child])
+                    currentRow = [previousRow[0] + 1]
+                    for column in range(1, columns):
+                        insertCost = currentRow[column - 1] + 1
+                        deleteCost = previousRow[column] + 1
+                        if word[column - 1] != letter:
+                            replaceCost = previousRow[column - 1] + 1
+                        else:
+                            replaceCost = previousRow[column - 1]
+
+                        currentRow.append(min(insertCost, deleteCost, replaceCost))
+                    code = word_codes[child]
+                    if currentRow[-1] <= maxCost and code >= 0 and (scope is None or _in_scope(scope, code, code + 1)):
+                        found[currentRow[-1]].append(code)
+                    minimum = min(currentRow)
+                    if minimum <= maxCost and ends[child] > child + 1:
+                        buckets[minimum].append((child, currentRow))
+                    child = ends[child]
+            buckets[cost] = None
+            yield [(trie.words[code], cost) for code in sorted(found[cost])]
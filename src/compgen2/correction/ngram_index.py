@@ -0,0 +1,161 @@
+"""This module contains the NgramIndex class, an inverted index from character n-grams to names.
+
+`difflib.get_close_matches` compares a query with every name of the search space. The index instead collects
+only the names that share at least a minimum number of n-grams (trigrams by default) with the query. These
+candidates are then verified with the usual scoring, e.g. by `difflib.get_close_matches`.
+
+Each name is padded with a start and an end marker, so a name of length l has l distinct-position n-grams and the
+first and last characters are weighted like the inner ones. The posting list of an n-gram is the sorted array of
+the codes (positions in the sorted `names`) of all names that contain it. The index can be saved, so that other
+processes memory-map it instead of building their own (see `save()`).
+
+The minimum number of shared n-grams is a heuristic, thus a name that difflib would accept can be missed.
+`recall()` measures this against the plain difflib search.
+
+Examples:
+```Python
+index = NgramIndex(gov.name_universe())
+candidates = index.candidates("aachne", cutoff=0.75)
+difflib.get_close_matches("aachne", candidates, n=30, cutoff=0.75)
+```
+"""
+import difflib
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+_START = "\x02"
+_END = "\x03"
+
+
+class NgramIndex:
+    """Inverted index from the character n-grams of names to the codes of the names.
+
+    Attributes:
+        n (int): Length of the n-grams.
+        min_share (float): Fraction of the n-grams of a query that a name has to share at cutoff 1.0.
+            The fraction is lowered linearly with the cutoff, see `min_shared()`.
+        names (Union[np.ndarray, StringTable]): Sorted names, an object array or a `StringTable` if the index was
+            loaded. The position of a name is its code.
+        lengths (np.ndarray): Length of each name.
+        postings (dict[str, np.ndarray]): Sorted codes of the names that contain each n-gram.
+    """
+
+    def __init__(self, names: Iterable[str], n: int = 3, min_share: float = 0.5) -> None:
+        self.n = n
+        self.min_share = min_share
+        self.names = np.array(sorted(names), dtype=object)
+        self.lengths = np.fromiter(map(len, self.names), dtype=np.int32, count=len(self.names))
+        postings = defaultdict(list)
+        for code, name in enumerate(self.names.tolist()):
+            for ngram in self.ngrams(name):
+                postings[ngram].append(code)
+        self.postings = {ngram: np.array(codes, dtype=np.int32) for ngram, codes in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def save(self, folder: str) -> None:
+        """Save the index into `folder`, so that other processes can memory-map it via `load()`.
+
+        The posting lists are stored in one array in the order of the sorted n-grams.
+        """
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        ngrams = sorted(self.postings)
+        names = StringTable.from_strings(self.names.tolist())
+        ngram_table = StringTable.from_strings(ngrams)
+        posting_offsets = np.zeros(len(ngrams) + 1, dtype=np.int64)
+        posting_offsets[1:] = np.cumsum([len(self.postings[ngram]) for ngram in ngrams])
+        posting_codes = np.concatenate([self.postings[ngram] for ngram in ngrams] or [np.zeros(0, dtype=np.int32)])
+        arrays = {
+            "names_data": names.data,
+            "names_offsets": names.offsets,
+            "lengths": self.lengths,
+            "ngrams_data": ngram_table.data,
+            "ngrams_offsets": ngram_table.offsets,
+            "posting_offsets": posting_offsets,
+            "posting_codes": posting_codes,
+        }
+        shared.publish(Path(folder), arrays, {"n": self.n, "min_share": self.min_share})
+
+    @staticmethod
+    def load(folder: str) -> "NgramIndex":
+        """Memory-map the index saved into `folder` by `save()`."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        arrays, meta = shared.attach(Path(folder))
+        index = NgramIndex.__new__(NgramIndex)
+        index.n = meta["n"]
+        index.min_share = meta["min_share"]
+        index.names = StringTable(arrays["names_data"], arrays["names_offsets"])
+        index.lengths = arrays["lengths"]
+        # The posting lists are views of the memory-mapped codes.
+        codes = np.asarray(arrays["posting_codes"])
+        offsets = arrays["posting_offsets"].tolist()
+        ngrams = StringTable(arrays["ngrams_data"], arrays["ngrams_offsets"])
+        index.postings = {ngram: codes[begin:end] for ngram, begin, end in zip(ngrams, offsets, offsets[1:])}
+        return index
+
+    def ngrams(self, name: str) -> set[str]:
+        """Return the distinct n-grams of the padded `name`."""
+        padded = f"{_START * (self.n - 1)}{name}{_END}"
+        return {padded[i : i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def min_shared(self, count: int, cutoff: float) -> int:
+        """Return the minimum number of shared n-grams for a query with `count` n-grams at `cutoff`."""
+        return max(1, math.ceil(count * self.min_share * (2 * cutoff - 1)))
+
+    def candidates(self, name: str, cutoff: float, relevant_names: Optional[set[str]] = None) -> list[str]:
+        """Return the names that may reach a difflib ratio of at least `cutoff` with `name`.
+
+        A candidate shares at least `min_shared()` n-grams with `name`. Its length is within the bounds of
+        `difflib.SequenceMatcher.real_quick_ratio()`, i.e. names whose length alone rules out `cutoff` are skipped.
+
+        Args:
+            name (str): The query.
+            cutoff (float): The cutoff of the difflib ratio in (0, 1].
+            relevant_names (Optional[set[str]]): Only return names in this set. Defaults to all names.
+
+        Returns:
+            list[str]: The candidates in alphabetical order.
+        """
+        ngrams = self.ngrams(name)
+        postings = [self.postings[ngram] for ngram in ngrams if ngram in self.postings]
+        if not postings:
+            return []
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        # 2 * min(l, m) / (l + m) >= cutoff
+        min_length = len(name) * cutoff / (2 - cutoff)
+        max_length = len(name) * (2 - cutoff) / cutoff
+        mask = (counts >= self.min_shared(len(ngrams), cutoff)) & (self.lengths >= min_length)
+        mask &= self.lengths <= max_length
+        candidates = self.names[np.flatnonzero(mask)].tolist()
+        if relevant_names is not None:
+            candidates = [candidate for candidate in candidates if candidate in relevant_names]
+        return candidates
+
+    def recall(
+        self, queries: Iterable[str], cutoff: float, relevant_names: Optional[set[str]] = None, n: int = 30
+    ) -> float:
+        """Return the fraction of the difflib matches of all `queries` that are found via the candidates.
+
+        Args:
+            queries (Iterable[str]): Names to search for.
+            cutoff (float): The cutoff of the difflib ratio.
+            relevant_names (Optional[set[str]]): The search space. Defaults to all names.
+            n (int): Maximum number of matches per query, as in `difflib.get_close_matches`.
+        """
+        search_space = self.names.tolist() if relevant_names is None else relevant_names
+        expected = found = 0
+        for query in queries:
+            matches = difflib.get_close_matches(query, search_space, n=n, cutoff=cutoff)
+            candidates = self.candidates(query, cutoff, relevant_names)
+            expected += len(matches)
+            found += len(set(matches) & set(difflib.get_close_matches(query, candidates, n=n, cutoff=cutoff)))
+        return found / expected if expected else 1.0
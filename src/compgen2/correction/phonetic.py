@@ -1,5 +1,39 @@
 import collections
 import re
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+
+class _NamesByPhonetic(Mapping):
+    """Read-only mapping from a phonetic code to the frozenset of its names, backed by the arrays of `Phonetic.save()`.
+
+    The codes are a sorted `StringTable`, the names of the i-th code are `names[name_offsets[i]:name_offsets[i + 1]]`.
+    """
+
+    def __init__(self, codes, name_offsets: np.ndarray, names) -> None:
+        from ..gov.shared import StringCodes
+
+        self._codes = codes
+        self._positions = StringCodes(codes)
+        self._name_offsets = name_offsets
+        self._names = names
+
+    def __getitem__(self, code: str) -> frozenset[str]:
+        position = self._positions[code]
+        begin, end = self._name_offsets[position], self._name_offsets[position + 1]
+        return frozenset(self._names[np.arange(begin, end)].tolist())
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
 
 
 class Phonetic:
@@ -36,6 +70,41 @@ class Phonetic:
             self.names_by_phonetic[self.encode(name)] |= {name}
         
         self.names_by_phonetic.default_factory = None
+
+    def save(self, folder: str) -> None:
+        """Save the phonetic index into `folder`, so that other processes can memory-map it via `load()`."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        codes = sorted(self.names_by_phonetic)
+        names = [sorted(self.names_by_phonetic[code]) for code in codes]
+        code_table = StringTable.from_strings(codes)
+        name_table = StringTable.from_strings(name for code_names in names for name in code_names)
+        name_offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        name_offsets[1:] = np.cumsum([len(code_names) for code_names in names])
+        arrays = {
+            "codes_data": code_table.data,
+            "codes_offsets": code_table.offsets,
+            "name_offsets": name_offsets,
+            "names_data": name_table.data,
+            "names_offsets": name_table.offsets,
+        }
+        shared.publish(Path(folder), arrays, {})
+
+    @staticmethod
+    def load(folder: str) -> "Phonetic":
+        """Memory-map the phonetic index saved into `folder` by `save()`."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        arrays, _ = shared.attach(Path(folder))
+        phonetic = Phonetic()
+        phonetic.names_by_phonetic = _NamesByPhonetic(
+            StringTable(arrays["codes_data"], arrays["codes_offsets"]),
+            arrays["name_offsets"],
+            StringTable(arrays["names_data"], arrays["names_offsets"]),
+        )
+        return phonetic
         
     def encode(self, inputstring: str) -> str:
         """
@@ -1,22 +1,178 @@
-# Keep some interesting statistics
-NodeCount = 0
-WordCount = 0
-
-
 # The Trie data structure keeps a set of words, organized with one node for
 # each letter. Each node has a branch for each letter that may follow it in the
 # set of words.
-class TrieNode:
-    def __init__(self):
-        self.word = None
-        self.children = {}
-
-        global NodeCount
-
-    def insert(self, word):
-        node = self
-        for letter in word:
-            if letter not in node.children:
-                node.children[letter] = TrieNode()
-            node = node.children[letter]
-        node.word = word
+#
+# The nodes are stored in flat NumPy arrays in pre-order, i.e. each node is followed by its subtree and
+# `ends[node]` is the first node after its subtree. The first child of a node is `node + 1` (if it is below
+# the node) and the next sibling of a child is `ends[child]`. Thus, the trie is traversed iteratively and a
+# whole subtree is skipped by jumping to its end.
+# The words are inserted in sorted order with their position (code), so all words below a node have
+# consecutive codes. Each node stores this range as `code_begins` and `code_ends`.
+# Words are looked up by a hash of their UTF-8 bytes that does not depend on the hash seed of the process,
+# so that the sorted hashes can be saved with the trie.
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+_HASH_BASE = np.uint64(1099511628211)
+
+
+def _hashes(data: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Return a 64 bit polynomial hash of each string of the concatenated UTF-8 bytes `data` with `offsets`."""
+    lengths = np.diff(offsets)
+    hashes = np.zeros(len(lengths), dtype=np.uint64)
+    if not len(data):
+        return hashes
+    positions = np.arange(len(data)) - np.repeat(offsets[:-1], lengths)
+    powers = np.ones(int(lengths.max()), dtype=np.uint64)
+    powers[1:] = np.cumprod(np.full(len(powers) - 1, _HASH_BASE, dtype=np.uint64))
+    terms = (data.astype(np.uint64) + np.uint64(1)) * powers[positions]
+    non_empty = lengths > 0
+    hashes[non_empty] = np.add.reduceat(terms, offsets[:-1][non_empty])
+    return hashes
+
+
+def string_hashes(strings: Iterable[str]) -> np.ndarray:
+    """Return the hash of each of the `strings`. Unlike `hash()`, it is the same in every process."""
+    from ..gov.shared import StringTable
+
+    table = StringTable.from_strings(strings)
+    return _hashes(table.data, table.offsets)
+
+
+class ArrayTrie:
+    """Read-only trie of sorted words in flat arrays that can be saved and memory-mapped.
+
+    Attributes:
+        letters (np.ndarray): Code point of the letter of each node. The root (node 0) has no letter.
+        depths (np.ndarray): Depth of each node, the root has depth 0.
+        ends (np.ndarray): First node after the subtree of each node.
+        word_codes (np.ndarray): Code of the word that ends at each node or -1.
+        code_begins (np.ndarray): First code of the words below each node.
+        code_ends (np.ndarray): End of the codes of the words below each node.
+        hashes (np.ndarray): Sorted hashes of all words.
+        hash_codes (np.ndarray): The code of the word of each hash.
+        words (StringTable): The sorted words, the position of a word is its code.
+    """
+
+    _ARRAYS = ("letters", "depths", "ends", "word_codes", "code_begins", "code_ends", "hashes", "hash_codes")
+
+    def __init__(self, arrays: dict[str, np.ndarray], words: "StringTable") -> None:
+        for name in self._ARRAYS:
+            setattr(self, name, arrays[name])
+        self.words = words
+
+    @staticmethod
+    def from_words(words: Iterable[str]) -> "ArrayTrie":
+        """Build the trie of the sorted unique `words`."""
+        # compgen2.gov imports this module via the Matcher, so its helpers are imported on use.
+        from ..gov.shared import StringTable
+
+        words = list(words)
+        letters = [0]
+        depths = [0]
+        word_codes = [-1]
+        code_begins = [0]
+        path = [0]  # the nodes on the path to the previous word
+        previous = ""
+        for code, word in enumerate(words):
+            prefix = 0
+            for letter, previous_letter in zip(word, previous):
+                if letter != previous_letter:
+                    break
+                prefix += 1
+            del path[prefix + 1 :]
+            for depth in range(prefix, len(word)):
+                path.append(len(letters))
+                letters.append(ord(word[depth]))
+                depths.append(depth + 1)
+                word_codes.append(-1)
+                code_begins.append(code)
+            word_codes[path[-1]] = code
+            previous = word
+
+        ends = [len(depths)] * len(depths)
+        open_nodes = []
+        for node, depth in enumerate(depths):
+            while open_nodes and depths[open_nodes[-1]] >= depth:
+                ends[open_nodes.pop()] = node
+            open_nodes.append(node)
+        depths = np.array(depths, dtype=np.int32)
+        ends = np.array(ends, dtype=np.int32)
+        code_begins = np.array(code_begins, dtype=np.int32)
+        # The words below a node end where the words of the next node after its subtree begin.
+        code_ends = np.append(code_begins, np.int32(len(words)))[ends]
+        arrays = {
+            "letters": np.array(letters, dtype=np.uint32),
+            "depths": depths,
+            "ends": ends,
+            "word_codes": np.array(word_codes, dtype=np.int32),
+            "code_begins": code_begins,
+            "code_ends": code_ends.astype(np.int32),
+        }
+        table = StringTable.from_strings(words)
+        hashes = _hashes(table.data, table.offsets)
+        arrays["hash_codes"] = np.argsort(hashes, kind="stable").astype(np.int32)
+        arrays["hashes"] = hashes[arrays["hash_codes"]]
+        return ArrayTrie(arrays, table)
+
+    def __len__(self) -> int:
+        return len(self.letters)
+
+    def find(self, words: Iterable[str]) -> np.ndarray:
+        """Return the code of each of the `words` or -1 if it is not in the trie."""
+        from ..gov.shared import StringTable
+
+        words = list(words)
+        table = StringTable.from_strings(words)
+        hashes = _hashes(table.data, table.offsets)
+        positions = np.minimum(np.searchsorted(self.hashes, hashes), max(len(self.hashes) - 1, 0))
+        codes = np.full(len(words), -1, dtype=np.int64)
+        if not len(self.hashes):
+            return codes
+        candidates = np.flatnonzero(self.hashes[positions] == hashes)
+        found = self._equal(table, candidates, self.hash_codes[positions[candidates]])
+        codes[candidates[found]] = self.hash_codes[positions[candidates[found]]]
+        # Different words with equal hashes are consecutive. This is merely unlikely, so they are checked one by one.
+        for index in candidates[~found].tolist():
+            position = int(positions[index])
+            while position < len(self.hashes) and self.hashes[position] == hashes[index]:
+                if self.words[int(self.hash_codes[position])] == words[index]:
+                    codes[index] = self.hash_codes[position]
+                    break
+                position += 1
+        return codes
+
+    def _equal(self, table: "StringTable", indices: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Return whether the `indices`-th strings of `table` equal the words with `codes`."""
+        lengths = table.offsets[indices + 1] - table.offsets[indices]
+        equal = lengths == self.words.offsets[codes + 1] - self.words.offsets[codes]
+        indices, codes, lengths = indices[equal], codes[equal], lengths[equal]
+        within = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        same = table.data[np.repeat(table.offsets[indices], lengths) + within] == (
+            self.words.data[np.repeat(self.words.offsets[codes], lengths) + within]
+        )
+        # a word is equal if it has no differing byte
+        differing = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.add.at(differing, np.repeat(np.arange(len(indices)), lengths), ~same)
+        equal[equal] = differing[:-1] == 0
+        return equal
+
+    def save(self, folder: str, meta: dict[str, object]) -> None:
+        """Save the arrays and the `meta` data into `folder`, see `load()`."""
+        from ..gov import shared
+
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        arrays["words_data"] = self.words.data
+        arrays["words_offsets"] = self.words.offsets
+        shared.publish(Path(folder), arrays, meta)
+
+    @staticmethod
+    def load(folder: str) -> tuple["ArrayTrie", dict[str, object]]:
+        """Memory-map the trie saved into `folder` and return it with its meta data."""
+        from ..gov import shared
+        from ..gov.shared import StringTable
+
+        arrays, meta = shared.attach(Path(folder))
+        return ArrayTrie(arrays, StringTable(arrays["words_data"], arrays["words_offsets"])), meta
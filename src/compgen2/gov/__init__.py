@@ -1,2 +1,4 @@
 from .gov import Gov
-from .matcher import Matcher
\ No newline at end of file
+from .matcher import Matcher
+from .result_store import ResultStore
+from .store import GovStore
\ No newline at end of file
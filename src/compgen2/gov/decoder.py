@@ -0,0 +1,103 @@
+"""This module contains the PathDecoder class that decodes many Gov ids or paths at once.
+
+The decoder holds one lookup per kind of decoding, each a sorted id array plus the aligned decoded strings:
+    * "id": the textual id of each Gov id (see `Gov.decode_path_id()`),
+    * "name": the display name of each Gov id (see `Gov.decode_path_name()`) and
+    * "type": the type name of each Gov id (see `Gov.decode_path_type()`).
+Decoding is a binary search of all ids followed by a single gather of the strings.
+
+Examples:
+```Python
+decoder = PathDecoder.from_mappings(gov.items_by_id, gov.name_index, gov.types_by_id, gov.type_names_by_type)
+decoder.decode([190315, 356042], "name")  # array(["aachen", "alsdorf"], dtype=object)
+decoder.decode_paths(gov.all_paths, "id")
+```
+"""
+from itertools import chain
+from typing import Iterable, Mapping
+
+import numpy as np
+
+from .name_index import NameIndex
+from .shared import StringMapping
+
+KINDS = ("id", "name", "type")
+
+
+def _first(values: Iterable):
+    return next(iter(values))
+
+
+class PathDecoder:
+    """Vectorized lookup of the textual id, display name and type name of Gov ids.
+
+    Attributes:
+        lookups (dict[str, StringMapping]): The lookup of each kind in `KINDS`.
+    """
+
+    def __init__(self, lookups: dict[str, StringMapping]) -> None:
+        self.lookups = lookups
+
+    @staticmethod
+    def from_mappings(
+        items_by_id: Mapping[int, str],
+        name_index: NameIndex,
+        types_by_id: Mapping[int, Iterable[int]],
+        type_names_by_type: Mapping[int, str],
+    ) -> "PathDecoder":
+        """Create the decoder from the search indices of a Gov instance.
+
+        The display name and the type of an id are picked exactly as by `Gov.decode_path_name()` and
+        `Gov.decode_path_type()`. Ids whose type has no type name cannot be decoded to a type name.
+        """
+        # The names of each id are sorted, so the first one is the smallest.
+        has_names = np.diff(name_index.name_offsets) > 0
+        first_names = name_index.name_values[name_index.name_offsets[:-1][has_names]]
+        type_names = {}
+        for id_, types in types_by_id.items():
+            type_ = _first(types)
+            if type_ in type_names_by_type:
+                type_names[id_] = type_names_by_type[type_]
+        return PathDecoder(
+            {
+                "id": PathDecoder._lookup(items_by_id),
+                "name": StringMapping(name_index.ids[has_names], name_index.names[first_names]),
+                "type": PathDecoder._lookup(type_names),
+            }
+        )
+
+    @staticmethod
+    def _lookup(mapping: Mapping[int, str]) -> StringMapping:
+        keys = np.fromiter(mapping, dtype=np.int64, count=len(mapping))
+        order = np.argsort(keys, kind="stable")
+        strings = np.array(list(mapping.values()), dtype=object)
+        return StringMapping(keys[order], strings[order])
+
+    def decode(self, ids: Iterable[int], kind: str = "id") -> np.ndarray:
+        """Decode all `ids` at once.
+
+        Args:
+            ids (Iterable[int]): Gov ids, e.g. a NumPy array or a DataFrame column.
+            kind (str): One of "id", "name" or "type". Defaults to "id".
+
+        Raises:
+            KeyError: If any id cannot be decoded.
+
+        Returns:
+            np.ndarray: Object array with the decoded string of each id.
+        """
+        if kind not in self.lookups:
+            raise ValueError(f"Unknown kind {kind!r}, expected one of {KINDS}.")
+        if not isinstance(ids, np.ndarray):
+            ids = np.fromiter(ids, dtype=np.int64)
+        return self.lookups[kind].take(ids)
+
+    def decode_paths(self, paths: Iterable[tuple[int, ...]], kind: str = "id") -> list[tuple[str, ...]]:
+        """Decode all nodes of all `paths` at once. Returns one tuple of decoded strings per path."""
+        paths = list(paths)
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.fromiter(map(len, paths), dtype=np.int64, count=len(paths)))
+        nodes = np.fromiter(chain.from_iterable(paths), dtype=np.int64, count=int(offsets[-1]))
+        values = self.decode(nodes, kind).tolist()
+        offsets = offsets.tolist()
+        return [tuple(values[begin:end]) for begin, end in zip(offsets[:-1], offsets[1:])]
@@ -13,18 +13,162 @@ gov.all_paths()
 """
 import logging
 import pickle
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 ## Imports
 from pathlib import Path
+from typing import Callable, Iterable, Mapping, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 
 from ..const import *
+from . import shared, snapshot
+from .decoder import PathDecoder
+from .id_set import IdSet, IdSpace
+from .name_index import NameIndex
+from .properties import TimedProperties, valid_mask
+from .reachability import ReachabilityIndex
+from .shared import CsrMapping, PathSet, StringCodes, StringMapping, StringTable
+from .report import BuildReport
 
 logger = logging.getLogger(__name__)
 
+# Same strings that pd.read_csv interprets as missing values.
+_NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Each search index maps to the method that builds it and the indices that have to be built before.
+# Note: `_all_paths` also collects `items_by_id`, `types_by_id` and `name_index` as a side effect.
+_INDEX_BUILDERS = {
+    "years": ("julian_years", ()),
+    "_items_by_id_raw": ("_items_by_id", ()),
+    "_names_by_id_raw": ("_names_by_id", ("years",)),
+    "_types_by_id_raw": ("_types_by_id", ("years",)),
+    "type_names_by_type": ("_type_names_by_type", ()),
+    "all_relations": ("_all_relations", ("years",)),
+    "all_paths": (
+        "_all_paths",
+        ("years", "_items_by_id_raw", "_names_by_id_raw", "_types_by_id_raw", "all_relations"),
+    ),
+    "ids_by_type": ("_ids_by_type", ("all_paths",)),
+    "ids_by_name": ("_ids_by_name", ("all_paths",)),
+    "reachability": ("_reachability", ("all_paths",)),
+    "path_decoder": ("_path_decoder", ("all_paths", "type_names_by_type")),
+    "id_space": ("_id_space", ("all_paths", "ids_by_type")),
+}
+# Indices that are collected as a side effect while building another index.
+_INDEX_ALIASES = {
+    "items_by_id": "all_paths",
+    "types_by_id": "all_paths",
+    "names_by_id": "all_paths",
+    "name_index": "all_paths",
+}
+# Indices that do not depend on the time window and the supernodes. They are shared by `Gov.with_window()`.
+_WINDOW_INDEPENDENT_INDICES = (
+    "years",
+    "_items_by_id_raw",
+    "_names_by_id_raw",
+    "_types_by_id_raw",
+    "type_names_by_type",
+)
+# Expensive indices that are cached on disk per time window (see `Gov.use_snapshot`).
+_CACHED_INDICES = ("all_paths", "ids_by_type", "reachability")
+
+
+def _empty_indices() -> dict:
+    """Return the empty value of each search index of an eager Gov instance that has not been built yet."""
+    name_index = NameIndex((), ())
+    return {
+        "years": {},
+        "_items_by_id_raw": {},
+        "_names_by_id_raw": TimedProperties.empty(),
+        "_types_by_id_raw": TimedProperties.empty(),
+        "type_names_by_type": {},
+        "all_relations": TimedProperties.empty(),
+        "all_paths": set(),
+        "ids_by_type": {},
+        "ids_by_name": name_index.ids_by_name,
+        "reachability": ReachabilityIndex(()),
+        "path_decoder": PathDecoder.from_mappings({}, name_index, {}, {}),
+        "id_space": IdSpace(()),
+        "items_by_id": {},
+        "types_by_id": defaultdict(set),
+        "names_by_id": name_index.names_by_id,
+        "name_index": name_index,
+    }
+
+
+def _index_waves(builders: dict[str, tuple[str, tuple[str, ...]]]) -> list[list[str]]:
+    """Group the indices into waves so that each index only depends on indices of earlier waves."""
+    waves = []
+    done = set()
+    while len(done) < len(builders):
+        wave = [name for name, (_, deps) in builders.items() if name not in done and done.issuperset(deps)]
+        if not wave:
+            raise ValueError(f"Cyclic dependencies between indices: {set(builders) - done}")
+        waves.append(wave)
+        done.update(wave)
+    return waves
+
+
+class _Index:
+    """Descriptor for a search index of `Gov`.
+
+    A lazy Gov instance builds the index (and the indices it depends on) on first access.
+    Every assignment marks the index as materialized.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            if not instance.lazy:
+                raise AttributeError(self.name) from None
+            instance._materialize(self.name)
+            return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+        instance._materialized.add(self.name)
+
+
+def _closure(ids: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Return the sorted array of `ids` and all nodes that can be reached from them along the edges (source, target)."""
+    reached = np.unique(ids)
+    frontier = reached
+    while len(frontier):
+        frontier = np.setdiff1d(targets[np.isin(sources, frontier)], reached)
+        reached = np.union1d(reached, frontier)
+    return reached
+
 
 def _set_retrieve(s: set):
     return next(iter(s))
@@ -40,9 +184,31 @@ class Gov:
 
     Then, you can start querying the data.
 
+    Alternatively, initialize a lazy instance `Gov(data_root, lazy=True)`.
+    It loads the data and builds each index (including the indices it depends on) on first access.
+
+    The paths and all indices derived from them are only valid within the time window [t_begin, t_end].
+    If `use_snapshot` is set, the expensive indices of each window are cached next to the snapshot and reused.
+    Use `with_window()` to switch the window without loading the tables again.
+
     Attributes:
         data_root (str): Path to a folder containing the data.
-        fully_initialized (bool): Set to `True` if all data and indices are initialized.
+        t_begin (int): Begin of the time window in julian date format (times 10). Defaults to T_BEGIN.
+        t_end (int): End of the time window in julian date format (times 10). Defaults to T_END.
+        supernodes (frozenset): Ids of the root nodes of all paths. Defaults to SUPERNODES.
+        num_workers (int): Number of threads used to read the tables and to build independent indices.
+            Defaults to the default of `ThreadPoolExecutor`.
+        use_snapshot (bool): If True, the pre-filtered tables are cached as Arrow snapshot in `data_root`.
+            Defaults to False, so that `data_root` is only read.
+        lazy (bool): If True, the data is loaded and each index is built on first access.
+        chunk_size (int): If set, the csv files are streamed in chunks of about `chunk_size` bytes. Each chunk is
+            filtered before the next one is read, so the peak memory of `load_data()` stays close to the size of
+            the filtered tables. Defaults to None, i.e. each csv file is read at once.
+        fingerprint (str): Content hash of the source csv files. Set by `load_data()`.
+        shared_folder (Path): Folder of the published indices if the instance is attached to them via `attach()`.
+            Such an instance is read-only.
+        fully_initialized (bool): `True` if all data and indices are initialized.
+        materialized_indices (set): Names of all indices that are already built.
         items (pd.DataFrame): content of govitems.csv
         names (pd.DataFrame): content of propertynames.csv
         types (pd.DataFrame): content of propertytypes.csv
@@ -50,17 +216,59 @@ class Gov:
         type_names (pd.DataFrame): content of typenames.csv
         items_by_id (dict): A mapping between an item's id and its textual id.
         types_by_id (dict): A mapping between an item's id and its type.
-        names_by_id (dict): A mapping between an item's id and its names.
-        ids_by_name (dict): A mapping between a name and its possible ids.
+        names_by_id (Mapping): A read-only mapping between an item's id and its names.
+        ids_by_name (Mapping): A read-only mapping between a name and its possible ids.
+        name_index (NameIndex): Compact index that backs `names_by_id` and `ids_by_name`.
         type_names_by_type (dict): A mapping from the type-id to its type-name.
-        all_relations (set): A set of all relations in Gov
-        all_paths (set): A set of all paths in Gov from SUPERNODES to their children.
-        all_reachable_nodes_by_id (dict): A mapping between an item's id and its reachable nodes.
+        all_relations (TimedProperties): All relations in the time window, keyed by parent with the child as value.
+        all_paths (set): A set of all paths in Gov from the supernodes to their children.
+        reachability (ReachabilityIndex): Index of all nodes that share a path. Query it via `get_reachable_nodes_by_id()`,
+            `is_reachable()` and `count_reachable_nodes()`.
+        path_decoder (PathDecoder): Lookup arrays of the textual id, display name and type name of each id.
+            Used by `decode_ids()` and `decode_paths()`.
+        id_space (IdSpace): Dense numbering of all ids on any path. The query methods return an `IdSet` of this space
+            if they are called with `as_id_set=True`.
     """
 
-    def __init__(self, data_root: str) -> None:
+    # important search indices
+    years = _Index()
+    _items_by_id_raw = _Index()
+    _names_by_id_raw = _Index()
+    _types_by_id_raw = _Index()
+    type_names_by_type = _Index()
+    all_relations = _Index()
+    all_paths = _Index()
+    ids_by_type = _Index()
+    ids_by_name = _Index()
+    reachability = _Index()
+    path_decoder = _Index()
+    id_space = _Index()
+    items_by_id = _Index()
+    types_by_id = _Index()
+    names_by_id = _Index()
+    name_index = _Index()
+
+    def __init__(
+        self,
+        data_root: str,
+        use_snapshot: bool = False,
+        num_workers: Optional[int] = None,
+        lazy: bool = False,
+        t_begin: int = T_BEGIN,
+        t_end: int = T_END,
+        supernodes: Iterable[int] = SUPERNODES,
+        chunk_size: Optional[int] = None,
+    ) -> None:
         self.data_root = Path(data_root)
-        self.fully_initialized = False
+        self.num_workers = num_workers
+        self.use_snapshot = use_snapshot
+        self.lazy = lazy
+        self.chunk_size = chunk_size
+        self.t_begin = t_begin
+        self.t_end = t_end
+        self.supernodes = frozenset(supernodes)
+        self.fingerprint = ""
+        self.shared_folder = None
 
         # raw gov tables
         self.items = pd.DataFrame()
@@ -69,22 +277,93 @@ class Gov:
         self.relations = pd.DataFrame()
         self.type_names = pd.DataFrame()
 
-        # important search indices
-        self._items_by_id_raw = {}
-        self._types_by_id_raw = {}
-        self._names_by_id_raw = {}
-        self.items_by_id = {}
-        self.types_by_id = defaultdict(set)
-        self.names_by_id = defaultdict(set)
-        self.ids_by_name = {}
-        self.ids_by_type = {}
-        self.type_names_by_type = {}
-        self.all_relations = set()
-        self.all_paths = set()
-        self.all_reachable_nodes_by_id = {}
-        self.years = {}
-
-        logger.info("Initialized empty gov instance. Please call `load_data()` next.")
+        self._materialized = set()
+        self._report = BuildReport()
+        self._name_universes = {}  # names of each type group, see `name_universe()`
+        self._reset_indices()
+
+        if self.lazy:
+            logger.info("Initialized lazy gov instance. Data and indices are loaded on first access.")
+        else:
+            logger.info("Initialized empty gov instance. Please call `load_data()` next.")
+
+    @property
+    def fully_initialized(self) -> bool:
+        return self._materialized.issuperset(_INDEX_BUILDERS) and self._materialized.issuperset(_INDEX_ALIASES)
+
+    @property
+    def materialized_indices(self) -> set[str]:
+        return set(self._materialized)
+
+    @property
+    def window_key(self) -> str:
+        """Hash of the source files, the time window and the supernodes. It identifies the search indices."""
+        return snapshot.fingerprint([], self.fingerprint, self.t_begin, self.t_end, sorted(self.supernodes))
+
+    @property
+    def names_key(self) -> str:
+        """Hash of all location names. Unlike the `window_key`, it changes with `rename()`."""
+        names = StringTable.from_strings(self.name_index.names.tolist())
+        return snapshot.fingerprint([], names.data.tobytes(), names.offsets.tobytes())
+
+    def with_window(self, t_begin: int, t_end: int, supernodes: Optional[Iterable[int]] = None) -> "Gov":
+        """Create a Gov instance for another time window that shares the tables of this instance.
+
+        The tables and all indices that do not depend on the time window are reused without copying them.
+        Call `build_indices()` on the new instance unless it is lazy.
+
+        Args:
+            t_begin (int): Begin of the time window in julian date format (times 10).
+            t_end (int): End of the time window in julian date format (times 10).
+            supernodes (Iterable[int], optional): Root nodes of the paths. Defaults to the supernodes of this instance.
+
+        Returns:
+            Gov: New instance for the given time window.
+        """
+        if self.items.empty:
+            self.load_data()
+        gov = Gov(
+            self.data_root,
+            use_snapshot=self.use_snapshot,
+            num_workers=self.num_workers,
+            lazy=self.lazy,
+            t_begin=t_begin,
+            t_end=t_end,
+            supernodes=self.supernodes if supernodes is None else supernodes,
+            chunk_size=self.chunk_size,
+        )
+        gov.fingerprint = self.fingerprint
+        gov.items = self.items
+        gov.names = self.names
+        gov.types = self.types
+        gov.relations = self.relations
+        gov.type_names = self.type_names
+        for name in _WINDOW_INDEPENDENT_INDICES:
+            if name in self._materialized:
+                setattr(gov, name, getattr(self, name))
+        return gov
+
+    def _reset_indices(self):
+        """Drop all search indices. An eager instance falls back to empty indices."""
+        for name in (*_INDEX_BUILDERS, *_INDEX_ALIASES):
+            self.__dict__.pop(name, None)
+        if not self.lazy:
+            self.__dict__.update(_empty_indices())
+        self._materialized.clear()
+        self._name_universes.clear()
+
+    def _materialize(self, name: str):
+        """Build the index `name` and all indices it depends on."""
+        name = _INDEX_ALIASES.get(name, name)
+        if self.items.empty:
+            self.load_data()
+        if self._read_cached_index(name):
+            return
+        builder, dependencies = _INDEX_BUILDERS[name]
+        for dependency in dependencies:
+            getattr(self, dependency)
+        setattr(self, name, self._run_step("index", name, getattr(self, builder)))
+        self._write_cached_index(name)
 
     @staticmethod
     def from_file(file: str):
@@ -93,23 +372,212 @@ class Gov:
             gov = pickle.load(stream)
         return gov
 
+    def publish(self, folder: str):
+        """Publish the read-only search indices into `folder`, so that other processes can share them via `attach()`.
+
+        The indices are stored as NumPy arrays which `attach()` memory-maps. Thus, all attached processes share
+        the same pages of memory instead of holding a private copy of the indices each.
+        """
+        if not self.fully_initialized:
+            if self.items.empty:
+                self.load_data()
+            self.build_indices()
+
+        logger.info(f"Publishing search indices to {folder}.")
+        name_index = self.name_index
+        names = StringTable.from_strings(name_index.names.tolist())
+        types_by_id = CsrMapping.from_dict(self.types_by_id)
+        ids_by_type = CsrMapping.from_dict(self.ids_by_type)
+        items_by_id = StringMapping.from_dict(self.items_by_id)
+        all_paths = PathSet.from_paths(self.all_paths)
+        arrays = {
+            "names_data": names.data,
+            "names_offsets": names.offsets,
+            "name_ids": name_index.ids,
+            "id_offsets": name_index.id_offsets,
+            "id_values": name_index.id_values,
+            "name_offsets": name_index.name_offsets,
+            "name_values": name_index.name_values,
+            "types_keys": types_by_id.key_array,
+            "types_offsets": types_by_id.offsets,
+            "types_values": types_by_id.value_array,
+            "ids_by_type_keys": ids_by_type.key_array,
+            "ids_by_type_offsets": ids_by_type.offsets,
+            "ids_by_type_values": ids_by_type.value_array,
+            "items_keys": items_by_id.key_array,
+            "items_data": items_by_id.strings.data,
+            "items_offsets": items_by_id.strings.offsets,
+            "paths_offsets": all_paths.offsets,
+            "paths_nodes": all_paths.nodes,
+            **{f"reachability_{name}": getattr(self.reachability, name) for name in ReachabilityIndex._ARRAYS},
+        }
+        for kind, lookup in self.path_decoder.lookups.items():
+            strings = StringTable.from_strings(lookup.strings.tolist())
+            arrays[f"decode_{kind}_keys"] = lookup.key_array
+            arrays[f"decode_{kind}_data"] = strings.data
+            arrays[f"decode_{kind}_offsets"] = strings.offsets
+        for name in ("ids", "type_keys", "type_offsets", "type_values"):
+            arrays[f"id_space_{name}"] = getattr(self.id_space, name)
+        meta = {
+            "data_root": str(self.data_root),
+            "fingerprint": self.fingerprint,
+            "t_begin": self.t_begin,
+            "t_end": self.t_end,
+            "supernodes": sorted(self.supernodes),
+            "type_names_by_type": dict(self.type_names_by_type),
+        }
+        shared.publish(Path(folder), arrays, meta)
+
+    @staticmethod
+    def attach(folder: str) -> "Gov":
+        """Attach to the search indices published into `folder` by `publish()`.
+
+        The arrays are memory-mapped read-only, so attaching costs almost no time and memory.
+        All query methods work as usual. `load_data()`, `build_indices()` and `apply_delta()` are not available.
+        """
+        arrays, meta = shared.attach(Path(folder))
+        gov = Gov(
+            meta["data_root"],
+            use_snapshot=False,
+            t_begin=meta["t_begin"],
+            t_end=meta["t_end"],
+            supernodes=meta["supernodes"],
+        )
+        gov.fingerprint = meta["fingerprint"]
+        gov.shared_folder = Path(folder)
+
+        names = StringTable(arrays["names_data"], arrays["names_offsets"])
+        gov.name_index = NameIndex.from_arrays(
+            names,
+            StringCodes(names),
+            arrays["name_ids"],
+            arrays["id_offsets"],
+            arrays["id_values"],
+            arrays["name_offsets"],
+            arrays["name_values"],
+        )
+        gov.names_by_id = gov.name_index.names_by_id
+        gov.ids_by_name = gov.name_index.ids_by_name
+        gov.types_by_id = CsrMapping(arrays["types_keys"], arrays["types_offsets"], arrays["types_values"])
+        gov.ids_by_type = CsrMapping(
+            arrays["ids_by_type_keys"], arrays["ids_by_type_offsets"], arrays["ids_by_type_values"]
+        )
+        items = StringTable(arrays["items_data"], arrays["items_offsets"])
+        gov.items_by_id = StringMapping(arrays["items_keys"], items)
+        gov.all_paths = PathSet(arrays["paths_offsets"], arrays["paths_nodes"])
+        gov.reachability = ReachabilityIndex.from_arrays(
+            {name: arrays[f"reachability_{name}"] for name in ReachabilityIndex._ARRAYS}
+        )
+        gov.type_names_by_type = meta["type_names_by_type"]
+        gov.path_decoder = PathDecoder(
+            {
+                kind: StringMapping(
+                    arrays[f"decode_{kind}_keys"],
+                    StringTable(arrays[f"decode_{kind}_data"], arrays[f"decode_{kind}_offsets"]),
+                )
+                for kind in ("id", "name", "type")
+            }
+        )
+        gov.id_space = IdSpace.from_arrays(
+            *(arrays[f"id_space_{name}"] for name in ("ids", "type_keys", "type_offsets", "type_values"))
+        )
+        # The indices that are only needed to build the other indices are not published.
+        empty_indices = _empty_indices()
+        for name in ("years", "_items_by_id_raw", "_names_by_id_raw", "_types_by_id_raw", "all_relations"):
+            setattr(gov, name, empty_indices[name])
+        logger.info(f"Attached to the search indices in {folder}.")
+        return gov
+
     def load_data(self):
         if self.fully_initialized:
             return
 
         logger.info("Start loading all relevant Gov tables ...")
-        self.items = self._read_item()
-        self.names = self._read_names()
-        self.types = self._read_types()
-        self.relations = self._read_relations()
-        self.type_names = self._read_type_names()
+        with self._report.step("total", "load_data"):
+            self._load_data()
+        logger.info("Finished loading all relevant Gov tables. Please call `build_indices()` next.")
 
-        # filter data
-        self._prefilter_names()
-        self._prefilter_relations()
-        self._prefilter_types()
+    def _load_data(self):
+        """Load the tables from the snapshot or from the csv files. Each step is recorded in the build report."""
+        self.fingerprint = self._run_step("read", "fingerprint", snapshot.fingerprint, self._source_files())
+        if self.use_snapshot and self._run_step("read", "snapshot", self._read_snapshot):
+            return
 
-        logger.info("Finished loading all relevant Gov tables. Please call `build_indices()` next.")
+        if self.chunk_size:
+            self._stream_data()
+        else:
+            self._read_data()
+
+        if self.use_snapshot:
+            self._run_step("write", "snapshot", self._write_snapshot)
+
+    def _read_data(self):
+        """Read each csv file at once and pre-filter the tables afterwards."""
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            items = pool.submit(self._run_step, "read", "items", self._read_item)
+            names = pool.submit(self._run_step, "read", "names", self._read_names)
+            types = pool.submit(self._run_step, "read", "types", self._read_types)
+            relations = pool.submit(self._run_step, "read", "relations", self._read_relations)
+            type_names = pool.submit(self._run_step, "read", "type_names", self._read_type_names)
+            self.items = items.result()
+            self.names = names.result()
+            self.types = types.result()
+            self.relations = relations.result()
+            self.type_names = type_names.result()
+
+        # filter data
+        for table, prefilter in (
+            ("names", self._prefilter_names),
+            ("relations", self._prefilter_relations),
+            ("types", self._prefilter_types),
+        ):
+            with self._report.step("prefilter", table) as record:
+                prefilter()
+                record["entries"] = len(getattr(self, table))
+
+    def _stream_data(self):
+        """Stream the csv files in chunks and pre-filter each chunk before the next one is read.
+
+        The items are read first, since the other tables are filtered by the deleted flag of the items.
+        """
+        self.items = self._run_step("read", "items", self._read_item)
+        alive = self._alive_by_id()
+
+        def keep_names(chunk: pd.DataFrame) -> np.ndarray:
+            return self._is_alive(alive, chunk.id)
+
+        def keep_relations(chunk: pd.DataFrame) -> np.ndarray:
+            return self._is_alive(alive, chunk.child) & self._is_alive(alive, chunk.parent)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            names = pool.submit(self._run_step, "read", "names", self._read_names, None, keep_names)
+            types = pool.submit(self._run_step, "read", "types", self._read_types, None, keep_names)
+            relations = pool.submit(self._run_step, "read", "relations", self._read_relations, None, keep_relations)
+            type_names = pool.submit(self._run_step, "read", "type_names", self._read_type_names)
+            self.names = names.result()
+            self.types = types.result()
+            self.relations = relations.result()
+            self.type_names = type_names.result()
+
+    def _run_step(self, phase: str, name: str, function: Callable, *args):
+        """Call `function` and record it as step of the build report. The length of the result is its entry count."""
+        with self._report.step(phase, name) as record:
+            result = function(*args)
+            if hasattr(result, "__len__") and not isinstance(result, str):
+                record["entries"] = len(result)
+        return result
+
+    def build_report(self) -> dict:
+        """Return wall time, memory and entry counts of all load and build steps so far.
+
+        The report is a JSON serializable dict, see `BuildReport` for a description of the steps.
+        Additionally, it contains the `fingerprint`, the `window_key` and the `materialized_indices`.
+        """
+        report = self._report.to_dict()
+        report["fingerprint"] = self.fingerprint
+        report["window_key"] = self.window_key if self.fingerprint else ""
+        report["materialized_indices"] = sorted(self._materialized)
+        return report
 
     def build_indices(self):
         """Build all relevant indices that are necessary for efficiently querying and working with Gov."""
@@ -117,17 +585,16 @@ class Gov:
             return
 
         logger.info("Start building all relevant search indices ...")
-        self.years = self.julian_years()
-        self._items_by_id_raw = self._items_by_id()
-        self._names_by_id_raw = self._names_by_id()
-        self._types_by_id_raw = self._types_by_id()
-        self.type_names_by_type = self._type_names_by_type()
-        self.all_relations = self._all_relations()
-        self.all_paths = self._all_paths()
-        self.ids_by_type = self._ids_by_type()
-        self.ids_by_name = self._ids_by_name()
-        self.all_reachable_nodes_by_id = self._all_reachable_nodes_by_id()
-        self.fully_initialized = True
+        with self._report.step("total", "build_indices"), ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            for wave in _index_waves(_INDEX_BUILDERS):
+                wave = [name for name in wave if name not in self._materialized and not self._read_cached_index(name)]
+                futures = {
+                    name: pool.submit(self._run_step, "index", name, getattr(self, _INDEX_BUILDERS[name][0]))
+                    for name in wave
+                }
+                for name, future in futures.items():
+                    setattr(self, name, future.result())
+                    self._write_cached_index(name)
 
         logger.info("Finished building all relevant search indices. You can now start working with Gov data.")
 
@@ -141,21 +608,8 @@ class Gov:
         self.types = pd.DataFrame()
         self.relations = pd.DataFrame()
         self.type_names = pd.DataFrame()
-        self._items_by_id_raw = {}
-        self._types_by_id_raw = {}
-        self._names_by_id_raw = {}
-        self.items_by_id = {}
-        self.types_by_id = defaultdict(set)
-        self.names_by_id = defaultdict(set)
-        self.ids_by_type = {}
-        self.ids_by_name = {}
-        self.type_names_by_type = {}
-        self.all_relations = set()
-        self.all_paths = set()
-        self.all_reachable_nodes_by_id = {}
-        self.years = {}
-
-        self.fully_initialized = False
+        self._reset_indices()
+        self._report.clear()
 
         logger.info("Cleared all data and attributes.")
         
@@ -168,116 +622,413 @@ class Gov:
         loc_names = set(self.ids_by_name.keys())
         return loc_names
 
-    def _read_item(self) -> pd.DataFrame:
+    def name_universe(self, type_ids: Optional[Iterable[int]] = None) -> frozenset[str]:
+        """Return the names of all ids that have any of the types `type_ids`, or all names if `type_ids` is None.
+
+        The names of each type group are collected once and shared by all callers, e.g. the fuzzy search of
+        `Matcher`. They are dropped whenever the names or the indices change.
+        """
+        key = None if type_ids is None else frozenset(type_ids)
+        universe = self._name_universes.get(key)
+        if universe is None:
+            if key is None:
+                universe = frozenset(self.name_index.names.tolist())
+            else:
+                universe = frozenset(self.get_names_by_ids(self.get_ids_by_types(key, as_id_set=True)))
+            self._name_universes[key] = universe
+        return universe
+
+    def rename(self, new_names: dict[str, str]):
+        """Replace each location name by `new_names.get(name, name)`, e.g. to apply the preprocessing to Gov names.
+
+        Ids of names that are mapped to the same new name are merged.
+        """
+        self.name_index = self.name_index.rename(new_names)
+        self.names_by_id = self.name_index.names_by_id
+        self.ids_by_name = self.name_index.ids_by_name
+        self._name_universes.clear()
+        if "path_decoder" in self._materialized:
+            self.path_decoder = self._path_decoder()
+
+    def apply_delta(self, delta_root: str):
+        """Apply changed or deleted rows of the Gov tables and update the search indices incrementally.
+
+        `delta_root` contains any subset of the Gov csv files in their usual format:
+            * govitems: new or changed items. Items with `deleted` set are removed together with their relations.
+            * propertynames, propertytypes: the rows of each listed id replace all current rows of this id.
+            * relation: the rows of each listed child replace all current relations of this child.
+            * typenames: the rows of each listed type replace all current rows of this type.
+
+        Only the paths through changed nodes, their descendants and their ancestors are searched again.
+        All other paths, names and types are kept. If the indices have not been built yet, only the tables are updated.
+        Note: Apply the delta before `rename()`. The names of the delta are not renamed.
+
+        Args:
+            delta_root (str): Path to a folder containing the delta tables.
+        """
+        if self.shared_folder is not None:
+            raise ValueError(f"Gov instance attached to {self.shared_folder} is read-only.")
+        delta_root = Path(delta_root)
+        tables = {
+            "items": (FILENAME_GOV_ITEMS, self._read_item, "id"),
+            "names": (FILENAME_GOV_PROPERTY_NAMES, self._read_names, "id"),
+            "types": (FILENAME_GOV_PROPERTY_TYPES, self._read_types, "id"),
+            "relations": (FILENAME_GOV_RELATIONS, self._read_relations, "child"),
+            "type_names": (FILENAME_GOV_TYPENAMES, self._read_type_names, "type_id"),
+        }
+        tables = {table: value for table, value in tables.items() if (delta_root / value[0]).is_file()}
+        if not tables:
+            logger.info(f"No delta tables found in {delta_root}.")
+            return
+        if self.items.empty:
+            self.load_data()
+
+        logger.info(f"Start applying delta {delta_root} ...")
+        with self._report.step("total", "apply_delta"):
+            self._apply_delta(delta_root, tables)
+
+    def _apply_delta(self, delta_root: Path, tables: dict[str, tuple[str, Callable, str]]):
+        """Apply the delta `tables` in `delta_root`, see `apply_delta()`."""
+        delta = {
+            table: self._run_step("read", f"delta_{table}", reader, delta_root)
+            for table, (_, reader, _) in tables.items()
+        }
+        old_relations = self.relations
+        for table, (_, _, key) in tables.items():
+            data = getattr(self, table)
+            data = data[~data[key].isin(delta[table][key])]
+            setattr(self, table, pd.concat([data, delta[table]], ignore_index=True))
+        self._prefilter_names()
+        self._prefilter_relations()
+        self._prefilter_types()
+        self.fingerprint = snapshot.fingerprint(
+            [delta_root / filename for filename, _, _ in tables.values()], self.fingerprint
+        )
+
+        if not self._materialized.issuperset(_INDEX_BUILDERS):
+            self._reset_indices()
+            logger.info("Finished applying delta. Please call `build_indices()` next.")
+            return
+
+        # All nodes whose paths may change: changed nodes and their descendants plus all their ancestors.
+        changed = [np.empty(0, dtype=np.int64)]
+        for table, (_, _, key) in tables.items():
+            if table != "type_names":
+                changed.append(delta[table][key].to_numpy(dtype=np.int64))
+        changed = np.unique(np.concatenate(changed))
+        relations = pd.concat([old_relations, self.relations])
+        parents = relations.parent.to_numpy(dtype=np.int64)
+        children = relations.child.to_numpy(dtype=np.int64)
+        affected = _closure(changed, parents, children)
+        scope = np.union1d(affected, _closure(affected, children, parents))
+        logger.info(f"Delta changes {len(changed)} nodes. Searching paths of {len(scope)} nodes again.")
+
+        if "items" in delta:
+            items = delta["items"]
+            # copy, as the mapping may be shared with other time windows
+            self._items_by_id_raw = {
+                **self._items_by_id_raw,
+                **dict(zip(items.id.tolist(), zip(items.textual_id.tolist(), items.deleted.tolist()))),
+            }
+        self._names_by_id_raw = self._names_by_id()
+        self._types_by_id_raw = self._types_by_id()
+        self.all_relations = self._all_relations()
+        if "type_names" in delta:
+            self.type_names_by_type = self._type_names_by_type()
+
+        with self._report.step("index", "all_paths") as record:
+            paths, windows = self._search_paths(scope)
+            record["entries"] = len(paths)
+        in_scope = set(scope.tolist())
+        self.all_paths = {path for path in self.all_paths if not in_scope.issuperset(path)} | paths
+
+        items_by_id = {id_: item for id_, item in self.items_by_id.items() if id_ not in in_scope}
+        items_by_id.update((id_, self._items_by_id_raw[id_][0]) for id_ in np.unique(windows[:, 0]).tolist())
+        self.items_by_id = items_by_id
+        types_by_id = {id_: types for id_, types in self.types_by_id.items() if id_ not in in_scope}
+        types_by_id.update(self._collect_types(windows))
+        self.types_by_id = types_by_id
+        ids, names = self.name_index.pairs()
+        keep = ~np.isin(ids, scope)
+        new_ids, new_names = self._collect_names(windows).pairs()
+        self.name_index = NameIndex(np.concatenate([ids[keep], new_ids]), np.concatenate([names[keep], new_names]))
+        self.names_by_id = self.name_index.names_by_id
+
+        self.ids_by_type = self._ids_by_type()
+        self.ids_by_name = self._ids_by_name()
+        self.reachability = self._reachability()
+        if "path_decoder" in self._materialized:
+            self.path_decoder = self._path_decoder()
+        if "id_space" in self._materialized:
+            self.id_space = self._id_space()
+        self._name_universes.clear()
+        logger.info("Finished applying delta.")
+
+    def _source_files(self) -> list[Path]:
+        """Return the paths of all csv files `load_data()` reads from."""
+        return [
+            self.data_root / filename
+            for filename in (
+                FILENAME_GOV_ITEMS,
+                FILENAME_GOV_PROPERTY_NAMES,
+                FILENAME_GOV_PROPERTY_TYPES,
+                FILENAME_GOV_RELATIONS,
+                FILENAME_GOV_TYPENAMES,
+            )
+        ]
+
+    def _read_snapshot(self) -> bool:
+        """Load the pre-filtered tables from the snapshot matching the current fingerprint.
+
+        Returns:
+            bool: True if a snapshot was found and loaded. False if the tables have to be read from csv.
+        """
+        folder = self.data_root / FOLDERNAME_GOV_SNAPSHOT / self.fingerprint
+        if not snapshot.has_snapshot(folder):
+            logger.info("No snapshot found for the current Gov csv files.")
+            return False
+
+        logger.info(f"Reading in snapshot {self.fingerprint}.")
+        tables = snapshot.read_snapshot(folder)
+        self.items = tables["items"]
+        self.names = tables["names"]
+        self.types = tables["types"]
+        self.relations = tables["relations"]
+        self.type_names = tables["type_names"]
+        return True
+
+    def _write_snapshot(self):
+        """Store the pre-filtered tables as snapshot and remove outdated snapshots."""
+        root = self.data_root / FOLDERNAME_GOV_SNAPSHOT
+        logger.info(f"Writing snapshot {self.fingerprint}.")
+        try:
+            snapshot.write_snapshot(
+                root / self.fingerprint,
+                {
+                    "items": self.items,
+                    "names": self.names,
+                    "types": self.types,
+                    "relations": self.relations,
+                    "type_names": self.type_names,
+                },
+            )
+            snapshot.prune_snapshots(root, keep=self.fingerprint)
+        except OSError as e:
+            logger.warning(f"Could not write snapshot to {root}: {e}")
+
+    def _read_cached_index(self, name: str) -> bool:
+        """Load the index `name` of the current time window from the snapshot folder if it is cached.
+
+        Returns:
+            bool: True if the index was found and loaded.
+        """
+        folder = self.data_root / FOLDERNAME_GOV_SNAPSHOT / self.fingerprint
+        if (
+            not self.use_snapshot
+            or name not in _CACHED_INDICES
+            or not self.fingerprint
+            or not snapshot.has_index(folder, self.window_key, name)
+        ):
+            return False
+
+        logger.info(f"Reading in cached index {name}.")
+        try:
+            with self._report.step("cache", name) as record:
+                values = snapshot.read_index(folder, self.window_key, name)
+                record["entries"] = len(values[name])
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Could not read cached index {name}: {e}")
+            return False
+        for attribute, value in values.items():
+            setattr(self, attribute, value)
+        return True
+
+    def _write_cached_index(self, name: str):
+        """Store the index `name` of the current time window, together with its side effects, in the snapshot folder."""
+        folder = self.data_root / FOLDERNAME_GOV_SNAPSHOT / self.fingerprint
+        if not self.use_snapshot or name not in _CACHED_INDICES or not snapshot.has_snapshot(folder):
+            return
+        attributes = [name, *(alias for alias, index in _INDEX_ALIASES.items() if index == name)]
+        try:
+            snapshot.write_index(
+                folder, self.window_key, name, {attribute: getattr(self, attribute) for attribute in attributes}
+            )
+        except OSError as e:
+            logger.warning(f"Could not write index {name} to {folder}: {e}")
+
+    def _read_csv(
+        self,
+        filename: str,
+        column_types: dict[str, pa.DataType],
+        root: Optional[Path] = None,
+        keep: Optional[Callable[[pd.DataFrame], np.ndarray]] = None,
+    ) -> pd.DataFrame:
+        """Read in a tab separated Gov table with pyarrow's multithreaded csv reader.
+
+        The table is read from `root` which defaults to `data_root`. Time columns are converted by `convert_time()`.
+        If `chunk_size` is set, the table is streamed in chunks and only the rows of each chunk that are selected
+        by the boolean mask `keep(chunk)` are kept. Otherwise, `keep` is applied to the whole table.
+        """
+        path = Path(root or self.data_root) / filename
+        parse_options = pv.ParseOptions(delimiter="\t")
+        convert_options = pv.ConvertOptions(
+            column_types=column_types,
+            include_columns=list(column_types),
+            null_values=_NULL_VALUES,
+            strings_can_be_null=True,
+        )
+        if not self.chunk_size:
+            table = pv.read_csv(
+                path,
+                read_options=pv.ReadOptions(use_threads=True),
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+            return self._convert_chunk(table, keep)
+
+        reader = pv.open_csv(
+            path,
+            read_options=pv.ReadOptions(use_threads=True, block_size=self.chunk_size),
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+        chunks = [self._convert_chunk(reader.schema.empty_table(), keep)]
+        chunks.extend(self._convert_chunk(pa.Table.from_batches([batch]), keep) for batch in reader)
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _convert_chunk(table: pa.Table, keep: Optional[Callable[[pd.DataFrame], np.ndarray]]) -> pd.DataFrame:
+        """Convert an Arrow table to a DataFrame and keep only the rows selected by `keep`."""
+        data = table.to_pandas()
+        # Arrow marks missing strings as None, whereas pd.read_csv uses NaN.
+        for column in data.columns[data.dtypes == object]:
+            data.loc[data[column].isna(), column] = np.nan
+        if "time_begin" in data.columns:
+            data = Gov.convert_time(data)
+        if keep is not None:
+            data = data[keep(data)]
+        return data
+
+    def _read_item(self, root: Optional[Path] = None) -> pd.DataFrame:
         """Read in govitems.csv"""
         logger.info("Reading in govitems.csv.")
-        gov_item = pd.read_csv(
-            self.data_root / FILENAME_GOV_ITEMS,
-            sep="\t",
-            dtype={"id": np.int32, "textual_id": object, "deleted": bool},
+        gov_item = self._read_csv(
+            FILENAME_GOV_ITEMS,
+            {"id": pa.int32(), "textual_id": pa.string(), "deleted": pa.bool_()},
+            root,
         )
         assert not gov_item.id.duplicated().any()
         return gov_item
 
-    def _read_names(self) -> pd.DataFrame:
+    def _read_names(
+        self, root: Optional[Path] = None, keep: Optional[Callable[[pd.DataFrame], np.ndarray]] = None
+    ) -> pd.DataFrame:
         """Read in propertynames.csv"""
         logger.info("Reading in propertynames.csv.")
-        names = pd.read_csv(
-            self.data_root / FILENAME_GOV_PROPERTY_NAMES,
-            sep="\t",
-            dtype={
-                "id": np.int32,
-                "content": object,
-                "language": object,
-                "time_begin": object,
-                "time_end": object,
+        names = self._read_csv(
+            FILENAME_GOV_PROPERTY_NAMES,
+            {
+                "id": pa.int32(),
+                "content": pa.string(),
+                "language": pa.string(),
+                "time_begin": pa.int64(),
+                "time_end": pa.int64(),
             },
+            root,
+            keep,
         )
-        names = Gov.convert_time(names)
         return names
 
-    def _read_types(self) -> pd.DataFrame:
+    def _read_types(
+        self, root: Optional[Path] = None, keep: Optional[Callable[[pd.DataFrame], np.ndarray]] = None
+    ) -> pd.DataFrame:
         """Read in propertytypes.csv"""
         logger.info("Reading in propertytypes.csv.")
-        types = pd.read_csv(
-            self.data_root / FILENAME_GOV_PROPERTY_TYPES,
-            sep="\t",
-            dtype={
-                "id": np.int32,
-                "content": np.int32,
-                "time_begin": object,
-                "time_end": object,
+        types = self._read_csv(
+            FILENAME_GOV_PROPERTY_TYPES,
+            {
+                "id": pa.int32(),
+                "content": pa.int32(),
+                "time_begin": pa.int64(),
+                "time_end": pa.int64(),
             },
+            root,
+            keep,
         )
-        types = Gov.convert_time(types)
         return types
 
-    def _read_relations(self) -> pd.DataFrame:
+    def _read_relations(
+        self, root: Optional[Path] = None, keep: Optional[Callable[[pd.DataFrame], np.ndarray]] = None
+    ) -> pd.DataFrame:
         """Read in relation.csv"""
         logger.info("Reading in relation.csv.")
-        relations = pd.read_csv(
-            self.data_root / FILENAME_GOV_RELATIONS,
-            sep="\t",
-            dtype={
-                "child": np.int32,
-                "parent": np.int32,
-                "time_begin": object,
-                "time_end": object,
+        relations = self._read_csv(
+            FILENAME_GOV_RELATIONS,
+            {
+                "child": pa.int32(),
+                "parent": pa.int32(),
+                "time_begin": pa.int64(),
+                "time_end": pa.int64(),
             },
+            root,
+            keep,
         )
-        relations = Gov.convert_time(relations)
         return relations
 
-    def _read_type_names(self) -> pd.DataFrame:
+    def _read_type_names(self, root: Optional[Path] = None) -> pd.DataFrame:
         """Read in typenames.csv"""
         logger.info("Reading in typenames.csv.")
-        type_names = pd.read_csv(
-            self.data_root / FILENAME_GOV_TYPENAMES,
-            sep="\t",
-            dtype={
-                "type_id": int,
-                "language": object,
-                "value": object,
+        type_names = self._read_csv(
+            FILENAME_GOV_TYPENAMES,
+            {
+                "type_id": pa.int64(),
+                "language": pa.string(),
+                "value": pa.string(),
             },
+            root,
         )
         return type_names
 
+    def _alive_by_id(self) -> np.ndarray:
+        """Create a dense lookup array that is True at index `id` if the item exists and is not deleted."""
+        ids = self.items.id.to_numpy()
+        alive = np.zeros(ids.max(initial=-1) + 1, dtype=bool)
+        alive[ids] = ~self.items.deleted.to_numpy(dtype=bool)
+        return alive
+
+    @staticmethod
+    def _is_alive(alive: np.ndarray, ids: pd.Series) -> np.ndarray:
+        """Boolean mask that is True for each id that refers to an existing and not deleted item."""
+        ids = ids.to_numpy()
+        mask = (ids >= 0) & (ids < len(alive))
+        mask[mask] = alive[ids[mask]]
+        return mask
+
     def _prefilter_names(self):
         """Removes any data from the DataFrame that is tagged as deleted."""
         logger.info(f"Pre-filtering raw names.")
         logger.debug(f"Shape of names before filtering: {self.names.shape}")
-        names_filtered = self.names.merge(
-            self.items[["id", "deleted"]],
-            left_on="id",
-            right_on="id",
-        )
-        self.names = names_filtered.query("~deleted").drop(columns=["deleted"])
+        alive = self._alive_by_id()
+        self.names = self.names[self._is_alive(alive, self.names.id)]
         logger.debug(f"Shape of names after filtering: {self.names.shape}")
 
     def _prefilter_relations(self):
         """Removes any data from the DataFrame that is tagged as deleted."""
         logger.info(f"Pre-filtering raw relations.")
         logger.debug(f"Shape of relations before filtering: {self.relations.shape}")
-        # Filter relations DataFrame based on time
-        relations_filtered = self.filter_time(self.relations)
-        # Filter relations DataFrame based on deleted
-        relations_filtered = relations_filtered.merge(self.items[["id", "deleted"]], left_on="child", right_on="id")
-        relations_filtered = relations_filtered.merge(self.items[["id", "deleted"]], left_on="parent", right_on="id")
-        self.relations = relations_filtered.query("~deleted_x and ~deleted_y").drop(
-            columns=["id_x", "id_y", "deleted_x", "deleted_y"]
-        )
+        alive = self._alive_by_id()
+        # Filter relations DataFrame based on deleted. The time window is applied in `_all_relations()`.
+        mask = self._is_alive(alive, self.relations.child)
+        mask &= self._is_alive(alive, self.relations.parent)
+        self.relations = self.relations[mask]
         logger.debug(f"Shape of relations after filtering: {self.relations.shape}")
 
     def _prefilter_types(self):
         """Removes any data from the DataFrame that is tagged as deleted."""
         logger.info(f"Pre-filtering raw types.")
         logger.debug(f"Shape of types before filtering: {self.types.shape}")
-        types_filtered = self.types.merge(
-            self.items[["id", "deleted"]],
-            left_on="id",
-            right_on="id",
-        )
-        self.types = types_filtered.query("~deleted").drop(columns=["deleted"])
+        alive = self._alive_by_id()
+        self.types = self.types[self._is_alive(alive, self.types.id)]
         logger.debug(f"Shape of types after filtering: {self.types.shape}")
 
     def _items_by_id(self) -> dict[int, tuple[str, bool]]:
@@ -299,61 +1050,44 @@ class Gov:
         }
         return gov_dict
 
-    def _names_by_id(self) -> dict[int, set[str]]:
-        """Create a mapping from propertynames with `id` as key and `content` as value.
+    def _names_by_id(self) -> TimedProperties:
+        """Store propertynames as time-scoped properties with `id` as key and the lower-cased `content` as value.
 
-        All names associated with the same id are combined into a set.
+        The names and languages are stored as categorical codes. Missing names and languages are coded as -1.
         """
         logger.info("Create names by id.")
-        names = set(
-            zip(
-                self.names.id,
-                self.names.content.str.lower(),
-                self.names.time_begin,
-                self.names.time_end,
-                self.names.language,
-            )
+        contents, content_categories = pd.factorize(self.names.content.str.lower())
+        languages, language_categories = pd.factorize(self.names.language)
+        return TimedProperties(
+            self.names.id.to_numpy(),
+            contents,
+            self.names.time_begin.to_numpy(),
+            self.names.time_end.to_numpy(),
+            self.years,
+            languages=languages,
+            value_categories=np.asarray(content_categories, dtype=object),
+            language_categories=np.asarray(language_categories, dtype=object),
         )
 
-        name_dict = defaultdict(set)
-        for n in names:
-            name_dict[n[0]] |= {n[1:]}
-        name_dict.default_factory = None
-        return name_dict
-
-    def _ids_by_name(self) -> dict[str, set[int]]:
+    def _ids_by_name(self) -> Mapping[str, frozenset[int]]:
         """Create a mapping from names to ids. Based on the filtered names.
 
         All ids associated with the same name are combined into a set.
         """
         logger.info("Create ids by name")
+        return self.name_index.ids_by_name
 
-        ids_by_name = defaultdict(set)
-        for k, v in self.names_by_id.items():
-            for n in v:
-                ids_by_name[n] |= {k}
-        ids_by_name.default_factory = None
-        return ids_by_name
-
-    def _types_by_id(self) -> dict[int, set[int]]:
-        """Create a mapping from propertytypes with `id` as key and `content` as value.
-
-        All types associated with the same id are combined into a set.
-        """
+    def _types_by_id(self) -> TimedProperties:
+        """Store propertytypes as time-scoped properties with `id` as key and `content` as value."""
         logger.info("Create types by id.")
-        types = set(
-            zip(
-                self.types.id,
-                self.types.content,
-                self.types.time_begin,
-                self.types.time_end,
-            )
+        types = self.types[self.types.content.notna()]
+        return TimedProperties(
+            types.id.to_numpy(),
+            types.content.to_numpy(dtype=np.int64),
+            types.time_begin.to_numpy(),
+            types.time_end.to_numpy(),
+            self.years,
         )
-        type_dict = defaultdict(set)
-        for t in types:
-            type_dict[t[0]] |= {t[1:]}
-        type_dict.default_factory = None
-        return type_dict
 
     def _ids_by_type(self) -> dict[int, set[int]]:
         """Create a mapping from types to ids. Based on the filtered types.
@@ -385,18 +1119,17 @@ class Gov:
                 type_names_dict[t[0]] = t[2]
         return type_names_dict
 
-    def _all_relations(self) -> set[tuple[int, int, str, str]]:
-        """Transform the relations to set of tuples."""
+    def _all_relations(self) -> TimedProperties:
+        """Store the relations in the time window with `parent` as key and `child` as value."""
         logger.info("Create all relations.")
-        relations = set(
-            zip(
-                self.relations.parent,
-                self.relations.child,
-                self.relations.time_begin,
-                self.relations.time_end,
-            )
+        relations = self.relations[self.time_mask(self.relations, self.t_begin, self.t_end)]
+        return TimedProperties(
+            relations.parent.to_numpy(),
+            relations.child.to_numpy(),
+            relations.time_begin.to_numpy(),
+            relations.time_end.to_numpy(),
+            self.years,
         )
-        return relations
 
     def _all_paths(self) -> set[tuple[int, ...]]:
         """
@@ -404,79 +1137,132 @@ class Gov:
         Additionally, collect all valid textual-ids, types, names of the resulting graph.
         """
         logger.info("Create all paths.")
-        relations = self.all_relations
-        paths_by_leaf_curr = {k: {((k,), T_BEGIN, T_END)} for k in SUPERNODES}
-        paths = set()
-        new_leaves_found = True
-
-        self.items_by_id = dict()
-        self.types_by_id = defaultdict(set)
-        self.names_by_id = defaultdict(set)
-        for k in SUPERNODES:
-            self._collect_item(self.items_by_id, k)
-            self._collect_type(self.types_by_id, k, T_BEGIN, T_END)
-            self._collect_name(self.names_by_id, k, T_BEGIN, T_END)
-
-        while new_leaves_found:
-            paths_by_leaf_next = defaultdict(set)
-            leaves_updated = set()
-            for r in relations:
-                if r[0] in paths_by_leaf_curr:
-                    for path in paths_by_leaf_curr[r[0]]:
-                        # Track the time-constrains of the path
-                        tmin = max(r[2], path[1])
-                        tmax = min(r[3], path[2])
-                        if (
-                            r[2],
-                            r[3],
-                        ) in self.years:  # Special case: When the time-validity of the relation is exactly one year from January 1 to December 31, the constraint is meant as a lower limit only.
-                            tmax = path[2]
-                        if tmin > tmax:
-                            continue
-                        if self._collect_type(self.types_by_id, r[1], tmin, tmax):
-                            leaves_updated.add(r[0])
-                            path_updated = ((*path[0], r[1]), tmin, tmax)
-                            paths_by_leaf_next[r[1]] |= {path_updated}
-                            self._collect_item(self.items_by_id, r[1])
-                            self._collect_name(self.names_by_id, r[1], tmin, tmax)
-            for l in leaves_updated:
-                del paths_by_leaf_curr[l]
-            # If no matching relation has been found for a path/leave, the path is final and can be moved to the final output.
-            paths.update(*paths_by_leaf_curr.values())
-            if len(leaves_updated) == 0:
-                new_leaves_found = False
-            logger.debug(f"Final paths: {len(paths)}, Updated paths: {len(set().union(*paths_by_leaf_next.values()))}")
-            paths_by_leaf_curr = paths_by_leaf_next
-        self.types_by_id.default_factory = None
-        self.names_by_id.default_factory = None
-        paths = {p[0] for p in paths}  # Take path only. Without time_begin and time_end
+        paths, windows = self._search_paths()
+        self.items_by_id = {id_: self._items_by_id_raw[id_][0] for id_ in np.unique(windows[:, 0]).tolist()}
+        self.types_by_id = self._collect_types(windows)
+        self.name_index = self._collect_names(windows)
+        self.names_by_id = self.name_index.names_by_id
         return paths
 
-    def _collect_item(self, item_dict: dict(), k: int):
-        """
-        Extends the item_dict by the provided id k and its textual-id.
-        """
-        item_dict[k] = self._items_by_id_raw[k][0]
+    def _search_paths(self, scope: Optional[np.ndarray] = None) -> tuple[set[tuple[int, ...]], np.ndarray]:
+        """Search all paths from the supernodes to their children.
+
+        The paths are expanded breadth-first. Each iteration extends all current paths at once with vectorized
+        operations on the relations of their leaves. A path is stored as pointer to its parent path plus its leaf.
 
-    def _collect_type(self, type_dict: defaultdict(set), k: int, tmin: int, tmax: int):
+        Args:
+            scope (np.ndarray, optional): Sorted array of ids that contains all ancestors of its ids.
+                If given, only paths within the scope are searched. A path still counts as extended
+                if its leaf has a valid child outside of the scope.
+
+        Returns:
+            tuple: All final paths and the unique (id, tmin, tmax) time windows of all nodes on the paths.
         """
-        Extends the type_dict if the type and the time-constraints are valid.
+        relations = self.all_relations.data
+        supernodes = np.array(sorted(self.supernodes), dtype=np.int64)
+        if scope is not None:
+            supernodes = supernodes[np.isin(supernodes, scope)]
+        path_parent = [np.full(len(supernodes), -1, dtype=np.int64)]
+        path_leaf = [supernodes]
+        num_paths = len(supernodes)
+
+        # The search state consists of a path together with its time window.
+        state_path = np.arange(len(supernodes))
+        state_leaf = supernodes
+        state_tmin = np.full(len(supernodes), self.t_begin, dtype=np.int64)
+        state_tmax = np.full(len(supernodes), self.t_end, dtype=np.int64)
+        final_paths = [np.empty(0, dtype=np.int64)]
+        windows = [np.stack((state_leaf, state_tmin, state_tmax), axis=1)]
+        self._report.start_path_search()
+
+        while len(state_path):
+            start = time.perf_counter()
+            num_states = len(state_path)
+            owner, rows = self.all_relations.rows_of(state_leaf)
+            edges = relations[rows]
+            # Track the time-constrains of the path
+            tmin = np.maximum(edges["time_begin"], state_tmin[owner])
+            # Special case: When the time-validity of the relation is exactly one year from January 1 to December 31, the constraint is meant as a lower limit only.
+            tmax = np.where(edges["is_year"], state_tmax[owner], np.minimum(edges["time_end"], state_tmax[owner]))
+            child = edges["value"].astype(np.int64)
+            keep = tmin <= tmax
+            keep[keep] = self._has_valid_type(child[keep], tmin[keep], tmax[keep])
+            owner, child, tmin, tmax = owner[keep], child[keep], tmin[keep], tmax[keep]
+
+            # If no matching relation has been found for a path/leave, the path is final and can be moved to the final output.
+            updated = np.isin(state_leaf, state_leaf[owner])
+            final_paths.append(state_path[~updated])
+
+            if scope is not None:
+                keep = np.isin(child, scope)
+                owner, child, tmin, tmax = owner[keep], child[keep], tmin[keep], tmax[keep]
+
+            # New states sorted by parent path and child, without duplicates
+            states = np.unique(np.stack((state_path[owner], child, tmin, tmax), axis=1), axis=0)
+            is_new_path = np.ones(len(states), dtype=bool)
+            is_new_path[1:] = np.any(states[1:, :2] != states[:-1, :2], axis=1)
+            path_parent.append(states[is_new_path, 0])
+            path_leaf.append(states[is_new_path, 1])
+            state_path = num_paths + np.cumsum(is_new_path) - 1
+            num_paths += int(is_new_path.sum())
+            state_leaf, state_tmin, state_tmax = states[:, 1], states[:, 2], states[:, 3]
+            windows.append(states[:, 1:])
+            self._report.add_iteration(
+                states=num_states,
+                edges=len(rows),
+                final_paths=len(final_paths[-1]),
+                new_states=len(states),
+                seconds=time.perf_counter() - start,
+            )
+            logger.debug(f"Final paths: {sum(map(len, final_paths))}, Updated paths: {len(states)}")
+
+        paths = self._decode_paths(np.concatenate(path_parent), np.concatenate(path_leaf), np.concatenate(final_paths))
+        return paths, np.unique(np.concatenate(windows), axis=0)
+
+    @staticmethod
+    def _decode_paths(path_parent: np.ndarray, path_leaf: np.ndarray, paths: np.ndarray) -> set[tuple[int, ...]]:
+        """Convert paths stored as parent pointers into tuples of node ids."""
+        columns = []
+        while (paths >= 0).any():
+            columns.append(np.where(paths >= 0, path_leaf[paths], -1))
+            paths = np.where(paths >= 0, path_parent[paths], -1)
+        if not columns:
+            return set()
+        # Shorter paths are padded with -1 at the beginning.
+        rows = np.stack(columns[::-1], axis=1).tolist()
+        return {tuple(id_ for id_ in row if id_ >= 0) for row in rows}
+
+    def _valid_types(self, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Find all desired types that are valid in the time window of each (id, tmin, tmax) row of `windows`.
+
         Returns:
-            bool:
-                If at least one type was added (all conditions have been met) the method returns True. Else the method returns False.
+            tuple: For each valid type, the position of its window in `windows` and the type.
         """
-        valid_type_found = False
-        for t in self._types_by_id_raw[k]:
-            if t[0] not in T_UNDESIRED and (
-                (t[1] <= tmax and t[2] >= tmin) or ((t[1], t[2]) in self.years and t[1] <= tmax)
-            ):
-                type_dict[k] |= {t[0]}
-                valid_type_found = True
-        return valid_type_found
+        owner, rows = self._types_by_id_raw.rows_of(windows[:, 0])
+        types = self._types_by_id_raw.data[rows]
+        valid = valid_mask(types, windows[owner, 1], windows[owner, 2])
+        valid &= ~np.isin(types["value"], list(T_UNDESIRED))
+        return owner[valid], types["value"][valid]
+
+    def _has_valid_type(self, ids: np.ndarray, tmin: np.ndarray, tmax: np.ndarray) -> np.ndarray:
+        """Boolean mask that is True if the id has at least one valid type in its time window [tmin, tmax]."""
+        windows, inverse = np.unique(np.stack((ids, tmin, tmax), axis=1), axis=0, return_inverse=True)
+        found = np.zeros(len(windows), dtype=bool)
+        found[self._valid_types(windows)[0]] = True
+        return found[inverse.reshape(-1)]
+
+    def _collect_types(self, windows: np.ndarray) -> dict[int, set[int]]:
+        """Collect the valid types of each (id, tmin, tmax) row of `windows`."""
+        owner, types = self._valid_types(windows)
+        type_dict = defaultdict(set)
+        for id_, type_ in set(zip(windows[owner, 0].tolist(), types.tolist())):
+            type_dict[id_].add(type_)
+        type_dict.default_factory = None
+        return type_dict
 
-    def _collect_name(self, name_dict: defaultdict(set), k: int, tmin: int, tmax: int):
+    def _collect_names(self, windows: np.ndarray) -> NameIndex:
         """
-        Extends the name_dict with at least one name.
+        Collect the names of each (id, tmin, tmax) row of `windows`.
         The method divides the name-candidates in six groups by priority.
         It picks the name(s) from the group with the highes priority. The other names are disregarded.
         * Group 1: Time constraint met + German
@@ -486,54 +1272,56 @@ class Gov:
         * Group 5: other more favorable languages (time constraint not met)
         * Group 6: remaining languages (time constraint not met). If all prior groups were empty this will contain at least one name.
         """
-        valid_names_prio1 = set()
-        valid_names_prio2 = set()
-        valid_names_prio3 = set()
-        for n in self._names_by_id_raw[k]:
-            if (n[1] <= tmax and n[2] >= tmin) or ((n[1], n[2]) in self.years and n[1] <= tmax):
-                if n[3] == "deu":
-                    valid_names_prio1.add(n[0])
-                elif n[3] in {"fre", "pol", "eng"}:
-                    valid_names_prio2.add(n[0])
-                else:
-                    valid_names_prio3.add(n[0])
-        if len(valid_names_prio1) > 0:
-            # group 1
-            name_dict[k] |= valid_names_prio1
-        elif len(valid_names_prio1) > 0:
-            # group 2
-            name_dict[k] |= valid_names_prio2
-        elif len(valid_names_prio3) > 0:
-            # group 3
-            name_dict[k] |= valid_names_prio3
-        else:
-            for n in self._names_by_id_raw[k]:
-                if n[3] == "deu":
-                    valid_names_prio1.add(n[0])
-                elif n[3] in {"fre", "pol", "eng"}:
-                    valid_names_prio2.add(n[0])
-                else:
-                    valid_names_prio3.add(n[0])
-            if len(valid_names_prio1) > 0:
-                # group 4
-                name_dict[k] |= valid_names_prio1
-            elif len(valid_names_prio2) > 0:
-                # group 5
-                name_dict[k] |= valid_names_prio2
-            else:
-                # group 6
-                name_dict[k] |= valid_names_prio3
+        names = self._names_by_id_raw
+        owner, rows = names.rows_of(windows[:, 0])
+        data = names.data[rows]
+        valid = valid_mask(data, windows[owner, 1], windows[owner, 2])
+        # 0: German, 1: other more favorable languages, 2: remaining languages.
+        # A missing language (-1) refers to the last entry.
+        priorities = np.array(
+            [0 if language == "deu" else 1 if language in {"fre", "pol", "eng"} else 2 for language in names.languages]
+            + [2],
+            dtype=np.int8,
+        )
+        priority = priorities[data["language"]]
+
+        def any_by_window(mask):
+            result = np.zeros(len(windows), dtype=bool)
+            result[owner[mask]] = True
+            return result[owner]
+
+        german = priority == 0
+        favorable = priority == 1
+        remaining = priority == 2
+        # Note: Valid names of the more favorable languages (group 2) are not preferred over group 3.
+        # They are only picked in group 5.
+        selected = np.select(
+            [
+                any_by_window(valid & german),
+                any_by_window(valid & remaining),
+                any_by_window(german),
+                any_by_window(favorable),
+            ],
+            [valid & german, valid & remaining, german, favorable],
+            default=remaining,
+        )
+        selected &= data["value"] >= 0  # skip missing names
+        return NameIndex(windows[owner[selected], 0], names.value_categories[data["value"][selected]])
 
-    def _all_reachable_nodes_by_id(self) -> dict[int, set[int]]:
-        """Find all reachable nodes for a given node."""
-        logger.info("Create all reachable nodes by id.")
-        reachable_nodes = defaultdict(set)
+    def _reachability(self) -> ReachabilityIndex:
+        """Index all reachable nodes for a given node."""
+        logger.info("Create reachability index.")
+        return ReachabilityIndex(self.all_paths)
 
-        for path in self.all_paths:
-            for id_ in path:
-                reachable_nodes[id_].update(set(path) - {id_})
+    def _id_space(self) -> IdSpace:
+        """Number all ids on any path densely and collect the compact ids of each type."""
+        logger.info("Create id space.")
+        return IdSpace(np.fromiter(self.items_by_id, dtype=np.int64, count=len(self.items_by_id)), self.ids_by_type)
 
-        return reachable_nodes
+    def _path_decoder(self) -> PathDecoder:
+        """Create the lookup arrays for `decode_ids()` and `decode_paths()`."""
+        logger.info("Create path decoder.")
+        return PathDecoder.from_mappings(self.items_by_id, self.name_index, self.types_by_id, self.type_names_by_type)
 
     def decode_path_id(self, path: tuple[int]) -> tuple[int]:
         """Return the gov textual id for each node in a path."""
@@ -541,8 +1329,8 @@ class Gov:
         return path_decoded
 
     def decode_path_name(self, path: tuple[int]) -> tuple[str]:
-        """Return the gov display name for each node in a path."""
-        path_decoded = tuple(_set_retrieve(self.names_by_id[o]) for o in path)
+        """Return the gov display name for each node in a path. It is the alphabetically first name of the node."""
+        path_decoded = tuple(min(self.names_by_id[o]) for o in path)
         return path_decoded
 
     def decode_path_type(self, path: tuple[int]) -> tuple[int]:
@@ -550,43 +1338,98 @@ class Gov:
         path_decoded = tuple(self.type_names_by_type[_set_retrieve(self.types_by_id[o])] for o in path)
         return path_decoded
 
-    def get_ids_by_types(self, type_ids: set[int]) -> set[int]:
+    def decode_ids(self, ids: Iterable[int], kind: str = "id") -> np.ndarray:
+        """Decode many ids at once, e.g. a DataFrame column of matched ids.
+
+        Args:
+            ids (Iterable[int]): Gov ids.
+            kind (str): "id" for the textual id, "name" for the display name or "type" for the type name of each id.
+                Each id is decoded as in `decode_path_id()`, `decode_path_name()` and `decode_path_type()` respectively.
+
+        Returns:
+            np.ndarray: Object array with the decoded string of each id.
+        """
+        return self.path_decoder.decode(ids, kind)
+
+    def decode_paths(self, paths: Iterable[tuple[int]], kind: str = "id") -> list[tuple[str]]:
+        """Decode many paths at once. See `decode_ids()` for the possible values of `kind`."""
+        return self.path_decoder.decode_paths(paths, kind)
+
+    def get_ids_by_types(self, type_ids: set[int], as_id_set: bool = False) -> set[int]:
         """
         Get the set of gov-ids based on a set of type-ids.
+        If `as_id_set` is True, the result is an `IdSet` of `id_space`.
         """
+        if as_id_set:
+            return self.id_space.of_types(type_ids)
         gov_ids = set().union(*(self.ids_by_type.get(t, set()) for t in type_ids))
         return gov_ids
 
     def get_names_by_ids(self, gov_ids: set[int]) -> set[str]:
         """
-        Get the set of names based on a set of gov-ids.
+        Get the set of names based on a set of gov-ids. The gov-ids may be given as `IdSet`.
         """
-        names = set().union(*(self.names_by_id.get(i, set()) for i in gov_ids))
+        if isinstance(gov_ids, IdSet):
+            gov_ids = gov_ids.ids
+        names = self.name_index.get_names(gov_ids)
         return names
 
-    def get_ids_by_names(self, names: set[str]) -> set[int]:
-        ids = set().union(*(self.ids_by_name.get(name, set()) for name in names))
+    def get_ids_by_names(self, names: set[str], as_id_set: bool = False) -> set[int]:
+        """
+        Get the set of gov-ids of all names.
+        If `as_id_set` is True, the result is an `IdSet` of `id_space`.
+        """
+        if as_id_set:
+            return self.id_space.id_set(self.name_index.ids_of(names))
+        ids = self.name_index.get_ids(names)
         return ids
 
-    def get_reachable_nodes_by_id(self, gov_ids: set[int]) -> set[int]:
-        ids = set().union(*(self.all_reachable_nodes_by_id.get(id_, set()) for id_ in gov_ids))
+    def get_reachable_nodes_by_id(self, gov_ids: set[int], as_id_set: bool = False) -> set[int]:
+        """
+        Get the set of gov-ids that share a path with any of the given gov-ids. The gov-ids may be given as `IdSet`.
+        If `as_id_set` is True, the result is an `IdSet` of `id_space`.
+        """
+        if isinstance(gov_ids, IdSet):
+            gov_ids = gov_ids.ids
+        if as_id_set:
+            return self.id_space.id_set(self.reachability.reachable_ids(gov_ids))
+        ids = self.reachability.reachable_from(gov_ids)
         return ids
 
+    def is_reachable(self, gov_id: int, other_id: int) -> bool:
+        """
+        Return True if both gov-ids are different and share a path.
+        """
+        return self.reachability.is_reachable(gov_id, other_id)
+
+    def count_reachable_nodes(self, gov_id: int) -> int:
+        """
+        Return the number of gov-ids that share a path with the given gov-id.
+        """
+        return self.reachability.count_reachable(gov_id)
+
     @staticmethod
     def convert_time(data: pd.DataFrame) -> pd.DataFrame:
-        data = data.replace({"time_begin": {np.NaN: T_MIN}, "time_end": {np.NaN: T_MAX}},).astype(
-            {
-                "time_begin": np.int64,
-                "time_end": np.int64,
-            }
-        )
+        """Convert the time columns to int64 in place. Missing values are replaced by T_MIN and T_MAX respectively."""
+        for column, fill_value in (("time_begin", T_MIN), ("time_end", T_MAX)):
+            values = data[column].to_numpy()
+            if values.dtype == np.int64:
+                continue
+            missing = pd.isna(values)
+            converted = np.full(len(values), fill_value, dtype=np.int64)
+            converted[~missing] = values[~missing].astype(np.int64)
+            data[column] = converted
         return data
 
     @staticmethod
-    def filter_time(data: pd.DataFrame) -> pd.DataFrame:
-        data = data.query(
-            "time_begin < @T_END and time_end > @T_BEGIN"
-        )  # TODO: Introduce correct time constraints for julian date???
+    def time_mask(data: pd.DataFrame, t_begin: int = T_BEGIN, t_end: int = T_END) -> np.ndarray:
+        """Boolean mask that is True for each row whose time span overlaps with [t_begin, t_end]."""
+        # TODO: Introduce correct time constraints for julian date???
+        return (data.time_begin.to_numpy() < t_end) & (data.time_end.to_numpy() > t_begin)
+
+    @staticmethod
+    def filter_time(data: pd.DataFrame, t_begin: int = T_BEGIN, t_end: int = T_END) -> pd.DataFrame:
+        data = data[Gov.time_mask(data, t_begin, t_end)]
         return data
 
     def julian_years(self) -> set[tuple[int, int]]:
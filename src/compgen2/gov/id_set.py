@@ -0,0 +1,176 @@
+"""This module contains the IdSpace and IdSet classes for fast set algebra on Gov ids.
+
+An `IdSpace` numbers all Gov ids on any path densely by their position in a sorted array (compact ids).
+An `IdSet` is a boolean mask over the compact ids of its space. Union, intersection and difference of two sets
+of the same space are vectorized operations on their masks, no Python set is built in between.
+The space also stores the compact ids of each type, so that the ids of a group of types can be collected at once.
+
+Examples:
+```Python
+space = IdSpace(ids, ids_by_type)
+cities = space.of_types({T_STADT})
+scope = cities & space.id_set(gov.reachability.reachable_ids({190315}))
+190315 in scope
+scope.ids  # sorted np.ndarray of the ids in the set
+```
+"""
+from collections.abc import Iterable, Iterator, Mapping, Set
+from typing import Optional
+
+import numpy as np
+
+from .shared import _position
+
+
+class IdSpace:
+    """Dense numbering of Gov ids.
+
+    Attributes:
+        ids (np.ndarray): Sorted array of all ids. The position of an id is its compact id.
+        type_keys (np.ndarray): Sorted array of all types.
+        type_offsets (np.ndarray): CSR offsets into `type_values` for each type.
+        type_values (np.ndarray): Compact ids of the ids of each type.
+    """
+
+    def __init__(self, ids: Iterable[int], ids_by_type: Optional[Mapping[int, Iterable[int]]] = None) -> None:
+        ids = ids if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        self.ids = np.unique(ids).astype(np.int64)
+        ids_by_type = ids_by_type or {}
+        self.type_keys = np.array(sorted(ids_by_type), dtype=np.int64)
+        values = [self.positions(np.fromiter(ids_by_type[t], dtype=np.int64)) for t in self.type_keys.tolist()]
+        self.type_offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        self.type_offsets[1:] = np.cumsum(np.array([len(v) for v in values], dtype=np.int64))
+        self.type_values = np.concatenate(values) if values else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(
+        cls, ids: np.ndarray, type_keys: np.ndarray, type_offsets: np.ndarray, type_values: np.ndarray
+    ) -> "IdSpace":
+        """Create the space from its attributes without copying them, e.g. from memory-mapped arrays."""
+        space = cls.__new__(cls)
+        space.ids = ids
+        space.type_keys = type_keys
+        space.type_offsets = type_offsets
+        space.type_values = type_values
+        return space
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, ids: np.ndarray) -> np.ndarray:
+        """Return the compact ids of all `ids` that are part of the space."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.empty(0, dtype=np.int64)
+        positions = np.searchsorted(self.ids, ids)
+        positions[positions == len(self.ids)] = 0
+        return positions[self.ids[positions] == ids]
+
+    def empty(self) -> "IdSet":
+        return IdSet(self, np.zeros(len(self.ids), dtype=bool))
+
+    def id_set(self, ids: Iterable[int]) -> "IdSet":
+        """Create the set of all `ids` that are part of the space."""
+        if isinstance(ids, IdSet) and ids.space is self:
+            return ids
+        if not isinstance(ids, np.ndarray):
+            ids = np.fromiter(ids, dtype=np.int64)
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.positions(ids)] = True
+        return IdSet(self, mask)
+
+    def of_types(self, type_ids: Iterable[int]) -> "IdSet":
+        """Create the set of all ids that have any of the types `type_ids`."""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for type_ in type_ids:
+            row = _position(self.type_keys, type_)
+            if row is not None:
+                mask[self.type_values[self.type_offsets[row] : self.type_offsets[row + 1]]] = True
+        return IdSet(self, mask)
+
+
+class IdSet(Set):
+    """Immutable set of Gov ids, stored as boolean mask over the compact ids of an `IdSpace`.
+
+    Operations between two sets of the same space are vectorized. All other operations fall back to
+    the generic implementations of `collections.abc.Set` and return Python sets.
+
+    Attributes:
+        space (IdSpace): The space of the set.
+        mask (np.ndarray): Boolean array that is True at the compact id of each id in the set.
+    """
+
+    def __init__(self, space: IdSpace, mask: np.ndarray) -> None:
+        self.space = space
+        self.mask = mask
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Sorted array of all ids in the set."""
+        return self.space.ids[self.mask]
+
+    def __contains__(self, id_: object) -> bool:
+        position = _position(self.space.ids, id_)
+        return position is not None and bool(self.mask[position])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids.tolist())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.mask))
+
+    def __repr__(self) -> str:
+        return f"IdSet({self.ids.tolist()})"
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[int]) -> set[int]:
+        return set(iterable)
+
+    def _same_space(self, other: object) -> bool:
+        return isinstance(other, IdSet) and other.space is self.space
+
+    def __or__(self, other):
+        if self._same_space(other):
+            return IdSet(self.space, self.mask | other.mask)
+        return super().__or__(other)
+
+    def __and__(self, other):
+        if self._same_space(other):
+            return IdSet(self.space, self.mask & other.mask)
+        return super().__and__(other)
+
+    def __sub__(self, other):
+        if self._same_space(other):
+            return IdSet(self.space, self.mask & ~other.mask)
+        return super().__sub__(other)
+
+    def __xor__(self, other):
+        if self._same_space(other):
+            return IdSet(self.space, self.mask ^ other.mask)
+        return super().__xor__(other)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __eq__(self, other):
+        if self._same_space(other):
+            return bool(np.array_equal(self.mask, other.mask))
+        return super().__eq__(other)
+
+    def __le__(self, other):
+        if self._same_space(other):
+            return not np.any(self.mask & ~other.mask)
+        return super().__le__(other)
+
+    def __ge__(self, other):
+        if self._same_space(other):
+            return not np.any(other.mask & ~self.mask)
+        return super().__ge__(other)
+
+    def isdisjoint(self, other) -> bool:
+        if self._same_space(other):
+            return not np.any(self.mask & other.mask)
+        return super().isdisjoint(other)
+
+    __hash__ = None
@@ -5,23 +5,83 @@ Examples:
 m = Matcher(gov)
 m.get_match_for_locations(["Aachen", "aarösund, flensburg"])
 print(m.results)
+
+# match in 8 processes that share the Gov instance
+m.get_match_for_locations(locations, num_processes=8)
+
+# "AACHEN" is served from the result cache of "Aachen"
+m.get_match_for_locations(["AACHEN"])
+m.cache_info()  # CacheInfo(hits=1, misses=2, maxsize=100000, currsize=2)
+
+# keep the results across runs
+m = Matcher(gov, result_store=ResultStore("results.sqlite"))
+
+# keep the name trie of the Levenshtein search in a folder that all processes memory-map
+m = Matcher(gov, use_difflib=False, trie_folder="name_trie")
 ```
 """
+import copy
 import difflib
+import heapq
 import logging
+import multiprocessing
+import shutil
+import tempfile
+from collections import OrderedDict, namedtuple
 from itertools import product
 from operator import itemgetter
-from typing import Optional, Union
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
 from .. import LocCorrection, Phonetic
+from ..correction import DeletionIndex, NgramIndex
 from ..const import T_KREISUNDHOEHER, T_STADT
 from . import Gov
+from .result_store import ResultStore
+from .store import GovStore
 
 logger = logging.getLogger(__name__)
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Matcher of a worker process of `Matcher.get_match_for_locations()`.
+_worker_matcher = None
+
+
+def _init_worker(source: str, gov: object, matcher: Optional["Matcher"], index_folder: Optional[str]):
+    """Set up the matcher of a worker process.
+
+    `source` is "inherit" if `gov` is the Gov instance inherited from the parent process via fork,
+    "attach" if `gov` is the folder of published indices and "store" if `gov` is the file of a GovStore.
+    Under fork, `matcher` is None: the parent sets `_worker_matcher` to a copy of its matcher with all search indices
+    before it creates the pool. Otherwise, `matcher` is a copy without Gov and indices, and the indices are
+    memory-mapped from `index_folder`.
+    """
+    global _worker_matcher
+    if matcher is None:
+        matcher = _worker_matcher
+    if source == "store":
+        # An SQLite connection must not be used across a fork.
+        matcher.gov = GovStore(gov)
+    elif source == "attach" and matcher.gov is None:
+        matcher.gov = Gov.attach(gov)
+    if index_folder is not None:
+        matcher._load_indices(Path(index_folder))
+    _worker_matcher = matcher
+
+
+def _match_chunk(locations: list[str]) -> list[tuple[str, dict]]:
+    """Match all locations in the worker process and return the result of each location."""
+    results = []
+    for location in locations:
+        _worker_matcher.find_match_for_location(location)
+        results.append((location, _worker_matcher.results.pop(location)))
+    return results
+
 
 class Matcher:
     """Main class to match names against the Gov database.
@@ -33,9 +93,21 @@ class Matcher:
         gov (Gov): A fully initialized instance of the Gov class.
         koelner_phonetic (Phonetic): Instance of Phonetic class.
         use_difflib (bool): If True, uses difflib.get_close_matches to find candidates.
+        use_ngram_index (bool): If True, difflib only scores the names that share enough trigrams with the part,
+            see `NgramIndex`. This is much faster, but may miss a few of the matches of the full difflib search.
+        ngram_index (Optional[NgramIndex]): Trigram index of all names in Gov if `use_ngram_index` is True.
+        use_symspell (bool): If True and `use_difflib` is False, finds the candidates with the lowest Levenshtein
+            distance via a deletion index (see `DeletionIndex`) instead of the trie of `LocCorrection`.
+        deletion_index (Optional[DeletionIndex]): Deletion index of all names in Gov if `use_symspell` is True.
         use_phonetic (bool): If True, uses Koelner Phonetic to search for candidates.
         max_cost (int): Max cost for searching for candidates. Value between 1 and max_cost.
         search_kreis_first (bool): If True, searches for candidates in Kreis or higher first.
+        cache_size (Optional[int]): Max number of results in the result cache, see `find_match_for_location()`.
+            None for an unbounded cache, 0 to disable the cache.
+        result_store (Optional[ResultStore]): Persistent store of results that is consulted before matching a
+            location and that keeps all new results.
+        trie_folder (Optional[str]): Folder of the saved name trie of the Levenshtein search. The trie is loaded
+            from there if it was saved for the same Gov data and time window, else it is built and saved there.
         results (dict): A dictionary containing the final results.
             Provides information about the found parts and the possible matches for each query.
 
@@ -48,10 +120,15 @@ class Matcher:
         use_phonetic: bool = False,
         max_cost: int = 3,
         search_kreis_first: bool = False,
+        cache_size: Optional[int] = 100_000,
+        result_store: Optional[ResultStore] = None,
+        use_ngram_index: bool = False,
+        use_symspell: bool = False,
+        trie_folder: Optional[str] = None,
     ) -> None:
         self.gov = gov
 
-        if not self.gov.fully_initialized:
+        if not self.gov.fully_initialized and not self.gov.lazy:
             logger.warning(
                 "Passed instance of gov is not fully initialized. "
                 "Make sure to run `load_data()` and `build_indices()`."
@@ -63,16 +140,267 @@ class Matcher:
         self.use_phonetic = use_phonetic
         self.max_cost = max_cost
         self.search_kreis_first = search_kreis_first
+        self.use_ngram_index = use_ngram_index
+        self.use_symspell = use_symspell
+        self.cache_size = cache_size
+        self.result_store = result_store
+        self.trie_folder = trie_folder
         self.results = {}
+        self._result_store_config = None
+        self._name_trie = None
+        self._trie_scopes = {}
+        self._name_lengths = {}
+        self._result_cache = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
         self.koelner_phonetic = Phonetic()
         if self.use_phonetic:
-            self.koelner_phonetic.build_phonetic_index(gov.get_loc_names())
+            self.koelner_phonetic.build_phonetic_index(gov.name_universe())
+
+        self.ngram_index = NgramIndex(gov.name_universe()) if self.use_ngram_index else None
+        # The anchor search in Kreis and Stadt goes up to cost 3, see `find_part_with_best_candidates()`.
+        index_cost = max(self.max_cost, 3) if self.search_kreis_first else self.max_cost
+        self.deletion_index = DeletionIndex(gov.name_universe(), index_cost) if self.use_symspell else None
+
+    @property
+    def search_params(self) -> dict[str, object]:
+        """The parameters that determine the results of the matcher."""
+        return {
+            "use_difflib": self.use_difflib,
+            "use_phonetic": self.use_phonetic,
+            "max_cost": self.max_cost,
+            "search_kreis_first": self.search_kreis_first,
+            "use_ngram_index": self.use_ngram_index,
+            "use_symspell": self.use_symspell,
+        }
+
+    def get_match_for_locations(
+        self, locations: Union[list[str], pd.Series], num_processes: int = 1, chunk_size: int = 64
+    ) -> None:
+        """Find the matches of all locations and store them in `results`.
 
-    def get_match_for_locations(self, locations: Union[list[str], pd.Series]) -> None:
-        for location in tqdm(locations, desc="Processing locations"):
+        Args:
+            locations (Union[list[str], pd.Series]): location names, e.g. "aachen, alsdorf".
+            num_processes (int): Number of worker processes. Defaults to 1, i.e. all locations are matched in this
+                process.
+            chunk_size (int): Number of locations that a worker process matches at once if all their parts are in Gov.
+                Other locations are scheduled one by one. Defaults to 64.
+        """
+        if num_processes > 1:
+            self._get_match_for_locations_parallel(locations, num_processes, chunk_size)
+        else:
+            for location in tqdm(locations, desc="Processing locations"):
+                self.find_match_for_location(location)
+        if self.result_store is not None:
+            self.result_store.flush()
+
+    def find_match_for_location(self, location: str) -> dict:
+        """Find the parts and the possible matches of a location, store them in `results` and return them.
+
+        The results are cached by the parts of the location (see `get_query_parts()`). Thus, locations that only
+        differ in case or whitespace are matched only once. Each location gets its own copy of the result, so that
+        changing one result does not change the others. The order of the parts is part of the key, since the anchor
+        is the first part with candidates: "alsdorf, aachen" and "aachen, alsdorf" may have different results.
+        If the result is not cached, it is looked up in the `result_store` before the location is matched.
+
+        Args:
+            location (str): location name, e.g. "aachen, alsdorf".
+
+        Returns:
+            dict: The result of the location.
+        """
+        parts = Matcher.get_query_parts(location)
+        result = self._result_cache.get(parts)
+        if result is not None:
+            self._cache_hits += 1
+            self._result_cache.move_to_end(parts)
+            result = self.results[location] = copy.deepcopy(result)
+            return result
+
+        self._cache_misses += 1
+        result = self._stored_result(parts)
+        if result is None:
             self.find_parts_for_location(location)
             self.find_textual_id_for_location(location)
+            result = self.results[location]
+            self._store_result(parts, result)
+        else:
+            self.results[location] = result
+        self._cache_result(parts, result)
+        return result
+
+    def _cache_result(self, parts: tuple[str], result: dict) -> None:
+        if self.cache_size == 0:
+            return
+        self._result_cache[parts] = copy.deepcopy(result)
+        if self.cache_size is not None and len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
+
+    def _get_result_store_config(self) -> Optional[str]:
+        """Return the configuration key of the results in `result_store` or None if there is no store."""
+        if self.result_store is None:
+            return None
+        if self._result_store_config is None:
+            if self.gov.fingerprint:
+                self._result_store_config = self.result_store.config_key(self.gov.window_key, self.search_params)
+            else:
+                logger.warning("Gov instance has no fingerprint. Its results are not kept in the result store.")
+                self._result_store_config = ""
+        return self._result_store_config or None
+
+    def _stored_result(self, parts: tuple[str]) -> Optional[dict]:
+        config = self._get_result_store_config()
+        return None if config is None else self.result_store.get(config, parts)
+
+    def _store_result(self, parts: tuple[str], result: dict) -> None:
+        config = self._get_result_store_config()
+        if config is not None:
+            self.result_store.put(config, parts, result)
+
+    def cache_info(self) -> CacheInfo:
+        """Return the statistics of the result cache."""
+        return CacheInfo(self._cache_hits, self._cache_misses, self.cache_size, len(self._result_cache))
+
+    def clear_cache(self) -> None:
+        """Clear the result cache and its statistics, e.g. after the names of Gov have been changed."""
+        self._result_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def _worker_source(self) -> tuple[str, object]:
+        """Return how a worker process gets the Gov instance, see `_init_worker()`."""
+        if isinstance(self.gov, GovStore):
+            # An SQLite connection must not be used across a fork.
+            return "store", str(self.gov.file)
+        if getattr(self.gov, "shared_folder", None) is not None:
+            return "attach", str(self.gov.shared_folder)
+        return "inherit", self.gov
+
+    def _worker_copy(self, with_indices: bool) -> "Matcher":
+        """Return a copy of the matcher for a worker process, see `_init_worker()`.
+
+        The copy has no results, result cache or result store. Without indices, it also has no Gov instance and no
+        search indices, so that it is small to send to a spawned process.
+        """
+        matcher = copy.copy(self)
+        matcher.results = {}
+        matcher.result_store = None
+        matcher._result_store_config = None
+        matcher._result_cache = OrderedDict()
+        matcher._cache_hits = 0
+        matcher._cache_misses = 0
+        if not with_indices:
+            matcher.gov = None
+            matcher.koelner_phonetic = Phonetic()
+            matcher.ngram_index = None
+            matcher.deletion_index = None
+            matcher._name_trie = None
+            matcher._trie_scopes = {}
+            matcher._name_lengths = {}
+        return matcher
+
+    def _publish_indices(self, folder: Path) -> None:
+        """Save the search indices into `folder`, so that worker processes memory-map them via `_load_indices()`."""
+        if self._uses_name_trie():
+            self._get_name_trie().save(folder / "trie", self._trie_meta())
+        if self.deletion_index is not None:
+            self.deletion_index.save(folder / "deletion_index")
+        if self.ngram_index is not None:
+            self.ngram_index.save(folder / "ngram_index")
+        if self.use_phonetic:
+            self.koelner_phonetic.save(folder / "phonetic")
+
+    def _load_indices(self, folder: Path) -> None:
+        """Memory-map the search indices that `_publish_indices()` saved into `folder`."""
+        if self._uses_name_trie():
+            self._name_trie = LocCorrection.load(folder / "trie")
+        if self.use_symspell:
+            self.deletion_index, _ = DeletionIndex.load(folder / "deletion_index")
+        if self.use_ngram_index:
+            self.ngram_index = NgramIndex.load(folder / "ngram_index")
+        if self.use_phonetic:
+            self.koelner_phonetic = Phonetic.load(folder / "phonetic")
+
+    def _get_match_for_locations_parallel(
+        self, locations: Union[list[str], pd.Series], num_processes: int, chunk_size: int
+    ) -> None:
+        """Match the locations in a pool of worker processes.
+
+        The workers get the Gov instance via fork (copy-on-write), via `Gov.attach()` or as `GovStore`.
+        Under fork, they inherit a copy of this matcher with its search indices. Otherwise, the indices are published
+        into a temporary folder, which the workers memory-map. Thus, no worker builds its own indices.
+        Locations whose parts are all in Gov are cheap and are sent in chunks. All other locations may need a fuzzy
+        search. They are sent first and one by one, so that the workers pick up new work as soon as they are done.
+        Only one location per parts is sent and only if its parts are neither in the result cache nor in the
+        result store.
+        The results are stored in the order of `locations`, independent of the order in which the workers finish.
+        """
+        source, gov = self._worker_source()
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        elif source != "inherit":
+            context = multiprocessing.get_context("spawn")
+        else:
+            logger.warning("Cannot share the gov instance without fork. Publish and attach it first.")
+            self.get_match_for_locations(locations)
+            return
+
+        results = {}
+        locations_by_parts = {}
+        for location in locations:
+            parts = Matcher.get_query_parts(location)
+            if parts in self._result_cache or parts in results or parts in locations_by_parts:
+                continue
+            result = self._stored_result(parts)
+            if result is None:
+                locations_by_parts[parts] = location
+            else:
+                results[parts] = result
+        cheap = []
+        expensive = []
+        for parts, location in locations_by_parts.items():
+            if all(part in self.gov.ids_by_name for part in parts):
+                cheap.append(location)
+            else:
+                expensive.append(location)
+        chunks = [[location] for location in expensive]
+        chunks.extend(cheap[start : start + chunk_size] for start in range(0, len(cheap), chunk_size))
+
+        global _worker_matcher
+        index_folder = None
+        if context.get_start_method() == "fork":
+            if self._uses_name_trie():
+                self._get_name_trie()
+            _worker_matcher = self._worker_copy(with_indices=True)
+            initargs = (source, gov, None, None)
+        else:
+            index_folder = tempfile.mkdtemp(prefix="compgen2_indices_")
+            self._publish_indices(Path(index_folder))
+            initargs = (source, gov, self._worker_copy(with_indices=False), index_folder)
+        try:
+            with context.Pool(num_processes, initializer=_init_worker, initargs=initargs) as pool:
+                with tqdm(total=len(locations_by_parts), desc="Processing locations") as progress:
+                    for chunk_results in pool.imap_unordered(_match_chunk, chunks):
+                        for location, result in chunk_results:
+                            parts = Matcher.get_query_parts(location)
+                            results[parts] = result
+                            self._store_result(parts, result)
+                        progress.update(len(chunk_results))
+        finally:
+            _worker_matcher = None
+            if index_folder is not None:
+                shutil.rmtree(index_folder, ignore_errors=True)
+
+        for location in locations:
+            parts = Matcher.get_query_parts(location)
+            result = results.pop(parts, None)
+            if result is None:
+                self.find_match_for_location(location)
+            else:
+                self._cache_misses += 1
+                self._cache_result(parts, result)
+                self.results[location] = result
 
     def find_parts_for_location(self, location: str) -> None:
         """Find the Gov parts for each location name.
@@ -144,9 +472,9 @@ class Matcher:
                 for ids in product(*ids_for_combination):
                     if len(ids) > 1:
                         # TODO: what to do if items exist in Gov but not the relationship?
-                        highest_id = max(ids, key=lambda x: len(self.gov.all_reachable_nodes_by_id[x]))
+                        highest_id = max(ids, key=self.gov.count_reachable_nodes)
                         other_ids = {id_ for id_ in ids if id_ != highest_id}
-                        if not self.gov.all_reachable_nodes_by_id[highest_id].issuperset(other_ids):
+                        if not all(self.gov.is_reachable(highest_id, id_) for id_ in other_ids):
                             continue
 
                     match = {}
@@ -165,6 +493,19 @@ class Matcher:
                     self.results[location]["possible_matches"].append(match)
 
     def find_part_with_best_candidates(self, location: str, parts: tuple[str]) -> tuple[str, list[str]]:
+        """Find the anchor of a location without any part in Gov.
+
+        The search spaces are tried in the order phonetic, Kreis or higher and Stadt (with cost 1 to 3) and all
+        names in Gov (with cost 1 to `max_cost`). The anchor is the part with the lowest cost in the first search
+        space that has candidates for any part, see `_find_anchor()`.
+
+        Args:
+            location (str): location names, e.g. "aachen, alsdorf".
+            parts (tuple[str]): The parts of the location.
+
+        Returns:
+            tuple[str, list[str]]: The anchor part and its candidates or ("", []) if there is no anchor.
+        """
         if self.use_phonetic:
             for part in parts:
                 candidates = list(
@@ -174,38 +515,137 @@ class Matcher:
                 if candidates:
                     self._set_anchor_method_for_location(location, f"Phonetic")
                     return (part, candidates)
-                
+
         if self.search_kreis_first:
             for type_ids in [T_KREISUNDHOEHER, T_STADT]:
-                for cost in range(1, 3 + 1):
-                    for part in parts:
-                        relevant_names = self.get_loc_names(type_ids)
-                        candidates = self.get_matches(part, relevant_names, cost)
-
-                        if candidates:
-                            self._set_anchor_method_for_location(location, f"KREISORSTADT | Cost {cost}")
-                            return (part, candidates)
-
-        relevant_names = self.get_loc_names()
-        for cost in range(1, self.max_cost + 1):
-            for part in parts:
-                candidates = self.get_matches(part, relevant_names, cost)
+                cost, part, candidates = self._find_anchor(parts, self.get_loc_names(type_ids), 3)
 
                 if candidates:
-                    self._set_anchor_method_for_location(location, f"ALL GOV | Cost {cost}")
+                    self._set_anchor_method_for_location(location, f"KREISORSTADT | Cost {cost}")
                     return (part, candidates)
 
+        cost, part, candidates = self._find_anchor(parts, self.get_loc_names(), self.max_cost)
+
+        if candidates:
+            self._set_anchor_method_for_location(location, f"ALL GOV | Cost {cost}")
+            return (part, candidates)
+
         return ("", [])
 
+    def _find_anchor(self, parts: tuple[str], relevant_names: set[str], max_cost: int) -> tuple[int, str, list[str]]:
+        """Return the first part with candidates among `relevant_names` when searching with cost 1 to `max_cost`.
+
+        For each cost, all parts are searched before the next cost. The search of each part continues where it
+        stopped at the previous cost, see `iter_matches()`. It is only started once an earlier part has no
+        candidates at cost 1.
+
+        Returns:
+            tuple[int, str, list[str]]: The cost, the part and its candidates or (0, "", []) if there are none.
+        """
+        searches = [self.iter_matches(part, relevant_names, max_cost) for part in parts]
+        for cost in range(1, max_cost + 1):
+            for part, search in zip(parts, searches):
+                candidates = next(search)
+
+                if candidates:
+                    return (cost, part, candidates)
+
+        return (0, "", [])
+
     def get_matches(self, name: str, relevant_names: set[str], cost: int) -> list[str]:
         if self.use_difflib:
             return self.get_difflib_matches(name, relevant_names, cost)
+        elif self.use_symspell:
+            return self.get_symspell_matches(name, relevant_names, cost)
         else:
             return self.get_levenshtein_matches(name, relevant_names, cost)
 
+    def iter_matches(self, name: str, relevant_names: set[str], max_cost: int) -> Iterator[list[str]]:
+        """Yield the result of `get_matches()` for `name` with cost 1, 2, ... up to `max_cost`.
+
+        The names are searched once: the search for a cost continues where the search for the previous cost
+        stopped. Thus, stopping after the first candidates costs about as much as a single `get_matches()` call
+        with that cost.
+        """
+        if self.use_difflib:
+            yield from self._iter_difflib_matches(name, relevant_names, max_cost)
+            return
+        if self.use_symspell:
+            levels = self.deletion_index.search_by_cost(name, max_cost, relevant_names)
+        else:
+            levels = self._get_name_trie().search_by_cost(name, max_cost, self._get_trie_scope(relevant_names))
+        # the candidates are the names with the lowest distance up to the cost, starting with exact matches
+        candidates = [candidate for candidate, _ in next(levels)]
+        for level in levels:
+            if not candidates:
+                candidates = [candidate for candidate, _ in level]
+            yield candidates
+
     def get_levenshtein_matches(self, name: str, relevant_names: set[str], cost: int) -> list[str]:
-        lC = LocCorrection.from_list(tuple(relevant_names))
-        candidates = lC.search(name, cost)
+        lC = self._get_name_trie()
+        candidates = lC.search(name, cost, self._get_trie_scope(relevant_names))
+
+        if candidates:
+            best_cost = min(candidates, key=itemgetter(1))[1]
+            candidates = [c[0] for c in candidates if c[1] == best_cost]
+
+        return candidates
+
+    def _uses_name_trie(self) -> bool:
+        """Return True if the fuzzy search uses the trie of `_get_name_trie()`, see `iter_matches()`."""
+        return not self.use_difflib and not self.use_symspell
+
+    def _get_name_trie(self) -> LocCorrection:
+        """Return the trie of all names in Gov. It is built once per Gov and restricted by scopes per search."""
+        if self._name_trie is None:
+            self._name_trie = self._load_name_trie()
+        if self._name_trie is None:
+            # The shared name universe is a frozenset, which caches its hash. Thus, the trie is found in O(1).
+            self._name_trie = LocCorrection.from_list(self.gov.name_universe())
+            if self.trie_folder is not None and self.gov.fingerprint:
+                self._name_trie.save(self.trie_folder, self._trie_meta())
+                logger.info(f"Saved name trie to {self.trie_folder}.")
+        return self._name_trie
+
+    def _load_name_trie(self) -> Optional[LocCorrection]:
+        """Return the trie saved in `trie_folder` if it belongs to the Gov instance, else None."""
+        if self.trie_folder is None:
+            return None
+        if not self.gov.fingerprint:
+            logger.warning("Gov instance has no fingerprint. The name trie is not kept in the trie folder.")
+            return None
+        try:
+            trie = LocCorrection.load(self.trie_folder)
+        except FileNotFoundError:
+            return None
+        if trie.meta != self._trie_meta():
+            logger.info(f"Name trie in {self.trie_folder} belongs to other Gov data or names. It is rebuilt.")
+            return None
+        return trie
+
+    def _trie_meta(self) -> dict[str, str]:
+        """Return the meta data that identifies the name trie of the Gov instance.
+
+        The `window_key` does not change with `Gov.rename()`, so the names are identified by their own hash.
+        """
+        return {"window_key": self.gov.window_key, "names_key": self.gov.names_key}
+
+    def _get_trie_scope(self, relevant_names: set[str]) -> Optional[list[int]]:
+        """Return the scope of the trie search for `relevant_names` or None for all names in Gov.
+
+        The scopes of the shared name universes of type groups are cached.
+        """
+        if relevant_names is self.gov.name_universe():
+            return None
+        if not isinstance(relevant_names, frozenset):
+            return self._get_name_trie().scope(relevant_names)
+        scope = self._trie_scopes.get(relevant_names)
+        if scope is None:
+            scope = self._trie_scopes[relevant_names] = self._get_name_trie().scope(relevant_names)
+        return scope
+
+    def get_symspell_matches(self, name: str, relevant_names: set[str], cost: int) -> list[str]:
+        candidates = self.deletion_index.search(name, cost, relevant_names)
 
         if candidates:
             best_cost = min(candidates, key=itemgetter(1))[1]
@@ -214,21 +654,70 @@ class Matcher:
         return candidates
 
     def get_difflib_matches(self, name: str, relevant_names: set[str], cost) -> list[str]:
-        return difflib.get_close_matches(
-            name,
-            relevant_names,
-            n=30,
-            cutoff=0.90 - (0.90 - 0.6) * (cost - 1) / (self.max_cost - 1),
-        )
-
-    def get_loc_names(self, type_ids: Optional[set[int]] = None) -> set[str]:
-        if type_ids is not None:
-            relevant_ids = self.gov.get_ids_by_types(type_ids)
-            relevant_names = self.gov.get_names_by_ids(relevant_ids)
-        else:
-            relevant_names = self.gov.get_loc_names()
+        cutoff = self._get_difflib_cutoff(cost)
+        if self.use_ngram_index:
+            relevant_names = self.ngram_index.candidates(name, cutoff, relevant_names)
+        return difflib.get_close_matches(name, relevant_names, n=30, cutoff=cutoff)
 
-        return relevant_names
+    def _iter_difflib_matches(self, name: str, relevant_names: set[str], max_cost: int) -> Iterator[list[str]]:
+        """Yield the result of `get_difflib_matches()` for `name` with cost 1, 2, ... up to `max_cost`.
+
+        The quick ratio and the ratio of each name are computed at most once. For the shared name sets of Gov, names
+        whose length rules out the cutoff (as `difflib.SequenceMatcher.real_quick_ratio()` does) are skipped without
+        a comparison.
+        """
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(name)
+        quick_ratios = {}
+        ratios = {}
+        for cost in range(1, max_cost + 1):
+            cutoff = self._get_difflib_cutoff(cost)
+            if self.use_ngram_index:
+                names = self.ngram_index.candidates(name, cutoff, relevant_names)
+            else:
+                names = self._get_names_of_length(relevant_names, len(name), cutoff)
+            scores = []
+            for other in names:
+                quick_ratio = quick_ratios.get(other)
+                if quick_ratio is None:
+                    matcher.set_seq1(other)
+                    if matcher.real_quick_ratio() < cutoff:
+                        continue
+                    quick_ratio = quick_ratios[other] = matcher.quick_ratio()
+                if quick_ratio < cutoff:
+                    continue
+                score = ratios.get(other)
+                if score is None:
+                    matcher.set_seq1(other)
+                    score = ratios[other] = matcher.ratio()
+                if score >= cutoff:
+                    scores.append((score, other))
+            # like `difflib.get_close_matches()`
+            yield [other for _, other in heapq.nlargest(30, scores)]
+
+    def _get_names_of_length(self, relevant_names: set[str], length: int, cutoff: float) -> Iterable[str]:
+        """Return the names of `relevant_names` whose length allows a difflib ratio of `cutoff` with `length`.
+
+        Only the shared name sets of Gov are filtered. Their names and lengths are cached as arrays.
+        """
+        if not isinstance(relevant_names, frozenset):
+            return relevant_names
+        names = self._name_lengths.get(relevant_names)
+        if names is None:
+            names = np.array(sorted(relevant_names), dtype=object)
+            names = self._name_lengths[relevant_names] = (names, np.fromiter(map(len, names), dtype=np.int64))
+        names, lengths = names
+        # `real_quick_ratio()` is 2 * min(l, m) / (l + m), an upper bound of the ratio
+        ratios = 2.0 * np.minimum(lengths, length) / np.maximum(lengths + length, 1)
+        return names[(ratios >= cutoff) | (lengths + length == 0)].tolist()
+
+    def _get_difflib_cutoff(self, cost: int) -> float:
+        """Return the cutoff of the difflib ratio for `cost`. It decreases from 0.9 at cost 1 to 0.6 at `max_cost`."""
+        return 0.90 - (0.90 - 0.6) * (cost - 1) / (self.max_cost - 1)
+
+    def get_loc_names(self, type_ids: Optional[set[int]] = None) -> frozenset[str]:
+        """Return the shared, immutable set of names of all ids with any of the types `type_ids` (or of all ids)."""
+        return self.gov.name_universe(type_ids)
 
     def get_relevant_names_from_matched_parts(self, location: str) -> set[str]:
         matched_parts = self.get_matched_parts(location)
@@ -236,14 +725,17 @@ class Matcher:
         if not matched_parts:
             return set()
         
-        relevant_ids = set()
+        relevant_ids = None
 
         # for each part, get all ids for all reachable nodes
         # then use only the intersection between different parts as search space
         for part in matched_parts:
-            ids_for_name = self.gov.get_ids_by_names(self.get_part_candidates(location, part)) 
-            ids_for_reachable_nodes = self.gov.get_reachable_nodes_by_id(ids_for_name)
-            relevant_ids.update(ids_for_reachable_nodes)
+            ids_for_name = self.gov.get_ids_by_names(self.get_part_candidates(location, part), as_id_set=True)
+            ids_for_reachable_nodes = self.gov.get_reachable_nodes_by_id(ids_for_name, as_id_set=True)
+            if relevant_ids is None:
+                relevant_ids = ids_for_reachable_nodes
+            else:
+                relevant_ids = relevant_ids | ids_for_reachable_nodes
 
         return self.gov.get_names_by_ids(relevant_ids)
 
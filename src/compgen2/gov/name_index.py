@@ -0,0 +1,209 @@
+"""This module contains the NameIndex class, a compact bidirectional index between Gov ids and their names.
+
+Instead of a dict of Python sets per name and per id, the index stores
+    * an interned table of all unique names (sorted) plus a hash lookup from name to its position (name code) and
+    * two CSR layouts with int32 arrays for name code -> ids and compact id -> name codes.
+
+`NameIndex.ids_by_name` and `NameIndex.names_by_id` provide read-only dict-like views on the index.
+
+Examples:
+```Python
+index = NameIndex.from_dict({1: {"aachen"}, 2: {"aachen", "achen"}})
+index.ids_by_name["aachen"]  # frozenset({1, 2})
+index.names_by_id[2]  # frozenset({"aachen", "achen"})
+```
+"""
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def _gather(offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenate the CSR rows `rows` of (`offsets`, `values`)."""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    if lengths.sum() == 0:
+        return values[:0]
+    # position of each gathered value: start of its row plus its offset within the row
+    row_starts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[row_starts + np.arange(lengths.sum())]
+
+
+def _csr(rows: np.ndarray, values: np.ndarray, num_rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Create CSR offsets and values from (row, value) pairs. The values of each row are sorted."""
+    order = np.lexsort((values, rows))
+    offsets = np.searchsorted(rows[order], np.arange(num_rows + 1))
+    return offsets, values[order]
+
+
+class NameIndex:
+    """Compact bidirectional index between Gov ids and names.
+
+    Attributes:
+        names (np.ndarray): Sorted array of all unique names. The position of a name is its name code.
+        ids (np.ndarray): Sorted array of all unique ids. The position of an id is its compact id.
+        ids_by_name (Mapping): Read-only view that maps a name to the frozenset of its ids.
+        names_by_id (Mapping): Read-only view that maps an id to the frozenset of its names.
+    """
+
+    def __init__(self, ids: Iterable[int], names: Iterable[str]) -> None:
+        """Create the index from (id, name) pairs given as two aligned iterables.
+
+        Pairs without a name (empty or missing names are read as NaN) are skipped.
+        """
+        ids = np.fromiter(ids, dtype=np.int64)
+        names = np.array(list(names), dtype=object)
+        valid = np.fromiter((isinstance(name, str) for name in names), dtype=bool, count=len(names))
+        ids, names = ids[valid], names[valid]
+        if len(names):
+            self.names, name_codes = np.unique(names, return_inverse=True)
+        else:
+            self.names, name_codes = names, np.zeros(0, dtype=np.int64)
+        self.ids, id_codes = np.unique(ids, return_inverse=True)
+        self._code_by_name = dict(zip(self.names.tolist(), range(len(self.names))))
+
+        # drop duplicate pairs
+        pairs = np.unique(id_codes.astype(np.int64) * max(len(self.names), 1) + name_codes)
+        id_codes, name_codes = np.divmod(pairs, max(len(self.names), 1))
+
+        self.id_offsets, self.id_values = _csr(name_codes, self.ids[id_codes].astype(np.int32), len(self.names))
+        self.name_offsets, self.name_values = _csr(id_codes, name_codes.astype(np.int32), len(self.ids))
+
+        self.ids_by_name = _IdsByName(self)
+        self.names_by_id = _NamesById(self)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        names,
+        code_by_name: Mapping,
+        ids: np.ndarray,
+        id_offsets: np.ndarray,
+        id_values: np.ndarray,
+        name_offsets: np.ndarray,
+        name_values: np.ndarray,
+    ) -> "NameIndex":
+        """Create the index from its attributes without copying them, e.g. from memory-mapped arrays.
+
+        `names` can be any sorted sequence that supports indexing with an array of name codes, e.g. a `StringTable`.
+        """
+        index = cls.__new__(cls)
+        index.names = names
+        index._code_by_name = code_by_name
+        index.ids = ids
+        index.id_offsets = id_offsets
+        index.id_values = id_values
+        index.name_offsets = name_offsets
+        index.name_values = name_values
+        index.ids_by_name = _IdsByName(index)
+        index.names_by_id = _NamesById(index)
+        return index
+
+    @staticmethod
+    def from_dict(names_by_id: dict[int, Iterable[str]]) -> "NameIndex":
+        """Create the index from a mapping between ids and their names."""
+        pairs = [(id_, name) for id_, names in names_by_id.items() for name in names]
+        return NameIndex((p[0] for p in pairs), (p[1] for p in pairs))
+
+    def rename(self, new_names: dict[str, str]) -> "NameIndex":
+        """Return a new index in which every name is replaced by `new_names.get(name, name)`.
+
+        Ids of names that are mapped to the same new name are merged.
+        """
+        renamed = np.array([new_names.get(name, name) for name in self.names.tolist()], dtype=object)
+        ids, _ = self.pairs()
+        return NameIndex(ids, renamed[self.name_values])
+
+    def pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return all (id, name) pairs of the index as two aligned arrays."""
+        id_codes = np.repeat(np.arange(len(self.ids)), np.diff(self.name_offsets))
+        return self.ids[id_codes], self.names[self.name_values]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def name_code(self, name: str) -> int:
+        """Return the name code of `name`. Raises a KeyError for unknown names."""
+        return self._code_by_name[name]
+
+    def name_codes(self, names: Iterable[str]) -> np.ndarray:
+        """Return the name codes of all known names in `names`."""
+        return np.fromiter(
+            (code for code in map(self._code_by_name.get, names) if code is not None),
+            dtype=np.int64,
+        )
+
+    def id_codes(self, ids: Iterable[int]) -> np.ndarray:
+        """Return the compact ids of all known ids in `ids`."""
+        ids = ids.astype(np.int64) if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        positions = np.searchsorted(self.ids, ids)
+        positions[positions == len(self.ids)] = 0
+        return positions[self.ids[positions] == ids] if len(self.ids) else positions[:0]
+
+    def ids_of(self, names: Iterable[str]) -> np.ndarray:
+        """Return the ids of all `names` as array, possibly with duplicates."""
+        return _gather(self.id_offsets, self.id_values, self.name_codes(names))
+
+    def get_ids(self, names: Iterable[str]) -> set[int]:
+        """Return the union of the ids of all `names`."""
+        return set(self.ids_of(names).tolist())
+
+    def get_names(self, ids: Iterable[int]) -> set[str]:
+        """Return the union of the names of all `ids`."""
+        codes = np.unique(_gather(self.name_offsets, self.name_values, self.id_codes(ids)))
+        return set(self.names[codes].tolist())
+
+
+class _IdsByName(Mapping):
+    """Read-only mapping from a name to the frozenset of its ids."""
+
+    def __init__(self, index: NameIndex) -> None:
+        self._index = index
+
+    def __getitem__(self, name: str) -> frozenset[int]:
+        code = self._index._code_by_name[name]
+        offsets = self._index.id_offsets
+        return frozenset(self._index.id_values[offsets[code] : offsets[code + 1]].tolist())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index._code_by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index._code_by_name)
+
+    def __len__(self) -> int:
+        return len(self._index.names)
+
+
+class _NamesById(Mapping):
+    """Read-only mapping from an id to the frozenset of its names."""
+
+    def __init__(self, index: NameIndex) -> None:
+        self._index = index
+
+    def _id_code(self, id_: object):
+        ids = self._index.ids
+        if not isinstance(id_, (int, np.integer)):
+            return None
+        position = np.searchsorted(ids, id_)
+        if position < len(ids) and ids[position] == id_:
+            return position
+        return None
+
+    def __getitem__(self, id_: int) -> frozenset[str]:
+        code = self._id_code(id_)
+        if code is None:
+            raise KeyError(id_)
+        offsets = self._index.name_offsets
+        codes = self._index.name_values[offsets[code] : offsets[code + 1]]
+        return frozenset(self._index.names[codes].tolist())
+
+    def __contains__(self, id_: object) -> bool:
+        return self._id_code(id_) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index.ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._index.ids)
@@ -0,0 +1,132 @@
+"""This module contains the TimedProperties class that stores time-scoped Gov properties as NumPy arrays.
+
+Names, types and relations of Gov items are only valid within a time span.
+`TimedProperties` keeps them as a structured array sorted by id, so that the rows of many ids can be gathered
+at once and their validity can be checked with vectorized interval tests.
+
+Examples:
+```Python
+types = TimedProperties(ids, type_ids, time_begin, time_end, years)
+owner, rows = types.rows_of(np.array([190315, 191050]))
+types.data["value"][rows]
+```
+"""
+from typing import Optional
+
+import numpy as np
+
+_FIELDS = [
+    ("id", np.int32),
+    ("value", np.int32),
+    ("language", np.int16),
+    ("time_begin", np.int64),
+    ("time_end", np.int64),
+    ("is_year", np.bool_),
+]
+
+
+def year_mask(years: set[tuple[int, int]], time_begin: np.ndarray, time_end: np.ndarray) -> np.ndarray:
+    """Boolean mask that is True where (time_begin, time_end) spans exactly one calendar year (see `Gov.julian_years`)."""
+    if not years:
+        return np.zeros(len(time_begin), dtype=bool)
+    begins, ends = (np.array(a, dtype=np.int64) for a in zip(*sorted(years)))
+    positions = np.searchsorted(begins, time_begin)
+    positions[positions == len(begins)] = 0
+    return (begins[positions] == time_begin) & (ends[positions] == time_end)
+
+
+def valid_mask(data: np.ndarray, tmin: np.ndarray, tmax: np.ndarray) -> np.ndarray:
+    """Check the time validity of property rows against the time windows [tmin, tmax].
+
+    A row is valid if its time span overlaps with the window.
+    Special case: A row that is valid exactly one calendar year is meant as a lower limit only.
+    """
+    begins_in_time = data["time_begin"] <= tmax
+    return begins_in_time & ((data["time_end"] >= tmin) | data["is_year"])
+
+
+class TimedProperties:
+    """Time-scoped properties of Gov items stored as NumPy structured array sorted by id.
+
+    Each row has the fields `id`, `value`, `language`, `time_begin`, `time_end` and `is_year`.
+    Duplicate rows are removed.
+
+    Attributes:
+        data (np.ndarray): Structured array of all rows sorted by id.
+        ids (np.ndarray): Sorted array of all unique ids.
+        offsets (np.ndarray): CSR offsets. The rows of `ids[i]` are `data[offsets[i]:offsets[i + 1]]`.
+        value_categories (np.ndarray): Categories of coded values, e.g. the names. Empty if the values are not coded.
+        languages (np.ndarray): Categories of the `language` field. The field stores the position in this array.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        values: np.ndarray,
+        time_begin: np.ndarray,
+        time_end: np.ndarray,
+        years: set[tuple[int, int]],
+        languages: Optional[np.ndarray] = None,
+        value_categories: Optional[np.ndarray] = None,
+        language_categories: Optional[np.ndarray] = None,
+    ) -> None:
+        """Create the properties from aligned arrays.
+
+        Args:
+            ids (np.ndarray): Gov id of each row.
+            values (np.ndarray): Value of each row, e.g. a type id or the code of a name in `value_categories`.
+            time_begin (np.ndarray): Begin of the time-validity of each row.
+            time_end (np.ndarray): End of the time-validity of each row.
+            years (set[tuple[int, int]]): All calendar years, see `Gov.julian_years()`.
+            languages (np.ndarray, optional): Code of the language of each row in `language_categories`.
+                -1 marks a missing language.
+            value_categories (np.ndarray, optional): Categories of coded values.
+            language_categories (np.ndarray, optional): Categories of the language codes.
+        """
+        data = np.empty(len(ids), dtype=_FIELDS)
+        data["id"] = ids
+        data["value"] = values
+        data["language"] = -1 if languages is None else languages
+        data["time_begin"] = time_begin
+        data["time_end"] = time_end
+        data["is_year"] = year_mask(years, data["time_begin"], data["time_end"])
+        # sort by id first and drop duplicate rows
+        data = data[np.lexsort([data[name] for name, _ in reversed(_FIELDS)])]
+        duplicate = np.ones(max(len(data) - 1, 0), dtype=bool)
+        for name, _ in _FIELDS:
+            duplicate &= data[name][1:] == data[name][:-1]
+        self.data = data[np.concatenate(([True], ~duplicate))[: len(data)]]
+        self.ids, offsets = np.unique(self.data["id"], return_index=True)
+        self.offsets = np.append(offsets, len(self.data))
+        self.value_categories = np.array([], dtype=object) if value_categories is None else value_categories
+        self.languages = np.array([], dtype=object) if language_categories is None else language_categories
+
+    @staticmethod
+    def empty() -> "TimedProperties":
+        """Create properties without any row."""
+        empty = np.empty(0, dtype=np.int64)
+        return TimedProperties(empty, empty, empty, empty, set())
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def rows_of(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Gather the rows of all given ids.
+
+        Returns:
+            tuple: For each gathered row, the position of its id in `ids` and its position in `data`.
+                Rows of the same position in `ids` are contiguous.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        positions = np.searchsorted(self.ids, ids)
+        positions[positions == len(self.ids)] = 0
+        found = self.ids[positions] == ids
+        positions = np.where(found, positions, 0)
+        lengths = np.where(found, self.offsets[positions + 1] - self.offsets[positions], 0)
+        owner = np.repeat(np.arange(len(ids)), lengths)
+        # position of each gathered row: start of its id's slice plus its offset within the slice
+        starts = self.offsets[positions]
+        rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return owner, rows
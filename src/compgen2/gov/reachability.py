@@ -0,0 +1,171 @@
+"""This module contains the ReachabilityIndex class that answers reachability queries on the Gov paths.
+
+Two nodes are reachable from each other if they lie on a common path.
+Instead of materializing the set of reachable nodes for every node, the index stores
+    * the ancestors of each node as a CSR array and
+    * pre-order interval labels of a prefix tree over all paths for the descendants.
+
+Examples:
+```Python
+index = ReachabilityIndex(gov.all_paths)
+index.is_reachable(190315, 356042)
+index.reachable_from({356042})
+```
+"""
+from typing import Iterable
+
+import numpy as np
+
+
+class ReachabilityIndex:
+    """Compact index over all nodes that share a path.
+
+    All paths are inserted into a prefix tree whose nodes are numbered in pre-order.
+    The descendants of a prefix tree node at position `p` are exactly the positions `p + 1` to `subtree_end[p] - 1`.
+    A Gov node may occur in several prefix tree nodes. Its descendants are the union of all its subtrees.
+
+    Attributes:
+        ids (np.ndarray): Sorted array of all Gov ids on any path. Position in this array is the compact id.
+        order (np.ndarray): Compact id of each prefix tree node in pre-order.
+        subtree_end (np.ndarray): Exclusive end position of the subtree of each prefix tree node.
+        occurrence_offsets (np.ndarray): CSR offsets into `occurrences` for each compact id.
+        occurrences (np.ndarray): Pre-order positions of the prefix tree nodes of each compact id, sorted ascending.
+        ancestor_offsets (np.ndarray): CSR offsets into `ancestors` for each compact id.
+        ancestors (np.ndarray): Sorted compact ids of the ancestors of each compact id.
+    """
+
+    def __init__(self, paths: Iterable[tuple[int, ...]]) -> None:
+        paths = sorted(paths)
+        self.ids = np.unique(np.fromiter((id_ for path in paths for id_ in path), dtype=np.int64))
+        code_by_id = dict(zip(self.ids.tolist(), range(len(self.ids))))
+
+        # Sorted paths enumerate the prefix tree in pre-order: each path only adds the nodes after the common prefix.
+        order = []
+        parent = []
+        subtree_end = []
+        stack = []  # positions of the prefix tree nodes of the current path
+        previous = ()
+        for path in paths:
+            common = 0
+            while common < min(len(path), len(previous)) and path[common] == previous[common]:
+                common += 1
+            while len(stack) > common:
+                subtree_end[stack.pop()] = len(order)
+            for id_ in path[common:]:
+                parent.append(stack[-1] if stack else -1)
+                stack.append(len(order))
+                order.append(code_by_id[id_])
+                subtree_end.append(0)
+            previous = path
+        while stack:
+            subtree_end[stack.pop()] = len(order)
+
+        self.order = np.array(order, dtype=np.int32)
+        self.subtree_end = np.array(subtree_end, dtype=np.int32)
+
+        occurrence_sort = np.argsort(self.order, kind="stable")
+        self.occurrences = occurrence_sort.astype(np.int32)
+        self.occurrence_offsets = np.searchsorted(self.order[occurrence_sort], np.arange(len(self.ids) + 1))
+
+        # Collect (node, ancestor) pairs level by level by following the parent pointers of the prefix tree.
+        parent = np.array(parent, dtype=np.int64)
+        nodes = np.flatnonzero(parent >= 0)
+        ancestor = parent[nodes]
+        pairs = []
+        while len(nodes):
+            pairs.append(self.order[nodes].astype(np.int64) * len(self.ids) + self.order[ancestor])
+            keep = parent[ancestor] >= 0
+            nodes, ancestor = nodes[keep], parent[ancestor[keep]]
+        pairs = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, dtype=np.int64)
+        nodes, ancestors = np.divmod(pairs, len(self.ids))
+        self.ancestors = ancestors.astype(np.int32)
+        self.ancestor_offsets = np.searchsorted(nodes, np.arange(len(self.ids) + 1))
+
+        self._counts = np.full(len(self.ids), -1, dtype=np.int64)
+
+    _ARRAYS = ("ids", "order", "subtree_end", "occurrences", "occurrence_offsets", "ancestors", "ancestor_offsets")
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "ReachabilityIndex":
+        """Create the index from its arrays (see `_ARRAYS`) without copying them, e.g. from memory-mapped arrays."""
+        index = cls.__new__(cls)
+        for name in cls._ARRAYS:
+            setattr(index, name, arrays[name])
+        index._counts = np.full(len(index.ids), -1, dtype=np.int64)
+        return index
+
+    def __contains__(self, id_: int) -> bool:
+        return self._code(id_) is not None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _code(self, id_: int):
+        """Return the compact id of a Gov id or None if the id is not part of any path."""
+        position = np.searchsorted(self.ids, id_)
+        if position < len(self.ids) and self.ids[position] == id_:
+            return int(position)
+        return None
+
+    def _codes(self, ids: Iterable[int]) -> np.ndarray:
+        """Return the compact ids of all given Gov ids that are part of any path."""
+        ids = ids.astype(np.int64) if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        if not len(self.ids):
+            return ids[:0]
+        positions = np.searchsorted(self.ids, ids)
+        positions[positions == len(self.ids)] = 0
+        return positions[self.ids[positions] == ids]
+
+    def _reachable_codes(self, code: int) -> np.ndarray:
+        """Return the compact ids of all ancestors and descendants of a compact id, possibly with duplicates."""
+        parts = [self.ancestors[self.ancestor_offsets[code] : self.ancestor_offsets[code + 1]]]
+        for position in self.occurrences[self.occurrence_offsets[code] : self.occurrence_offsets[code + 1]]:
+            parts.append(self.order[position + 1 : self.subtree_end[position]])
+        return np.concatenate(parts)
+
+    def reachable_ids(self, ids: Iterable[int]) -> np.ndarray:
+        """Return the sorted array of all nodes that share a path with at least one of the given ids.
+
+        A given id is only part of the result if it is reachable from another given id.
+        """
+        parts = [self._reachable_codes(code) for code in self._codes(ids).tolist()]
+        if not parts:
+            return self.ids[:0]
+        return self.ids[np.unique(np.concatenate(parts))]
+
+    def reachable_from(self, ids: Iterable[int]) -> set[int]:
+        """Return all nodes that share a path with at least one of the given ids.
+
+        A given id is only part of the result if it is reachable from another given id.
+        """
+        return set(self.reachable_ids(ids).tolist())
+
+    def count_reachable(self, id_: int) -> int:
+        """Return the number of nodes that share a path with `id_`."""
+        code = self._code(id_)
+        if code is None:
+            return 0
+        if self._counts[code] < 0:
+            self._counts[code] = len(np.unique(self._reachable_codes(code)))
+        return int(self._counts[code])
+
+    def is_reachable(self, a: int, b: int) -> bool:
+        """Return True if `a` and `b` are different nodes that lie on a common path."""
+        code_a = self._code(a)
+        code_b = self._code(b)
+        if code_a is None or code_b is None or code_a == code_b:
+            return False
+
+        # b is an ancestor of a
+        ancestors = self.ancestors[self.ancestor_offsets[code_a] : self.ancestor_offsets[code_a + 1]]
+        position = np.searchsorted(ancestors, code_b)
+        if position < len(ancestors) and ancestors[position] == code_b:
+            return True
+
+        # b lies in the subtree of any occurrence of a
+        occurrences_b = self.occurrences[self.occurrence_offsets[code_b] : self.occurrence_offsets[code_b + 1]]
+        for position in self.occurrences[self.occurrence_offsets[code_a] : self.occurrence_offsets[code_a + 1]]:
+            first = np.searchsorted(occurrences_b, position + 1)
+            if first < len(occurrences_b) and occurrences_b[first] < self.subtree_end[position]:
+                return True
+        return False
@@ -0,0 +1,132 @@
+"""This module contains the BuildReport class that records timing and memory of the Gov build steps.
+
+Each step (reading a table, pre-filtering, building an index, ...) records its wall time, the resident memory of the
+process and the number of entries of its result. If `tracemalloc` is tracing (e.g. `PYTHONTRACEMALLOC=1`),
+the memory allocated by the step and its peak are recorded as well.
+Steps that run in parallel threads share the process memory, so their memory figures overlap.
+The path search additionally records statistics for each breadth-first iteration.
+
+Examples:
+```Python
+report = BuildReport()
+with report.step("index", "all_paths") as record:
+    paths = build_paths()
+    record["entries"] = len(paths)
+report.to_dict()
+```
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+_MB = 1 << 20
+
+
+def current_rss() -> Optional[int]:
+    """Return the current resident set size of the process in bytes or None if it is unknown."""
+    try:
+        with open("/proc/self/statm") as stream:
+            return int(stream.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident set size of the process in bytes or None if it is unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _to_mb(value: Optional[int]) -> Optional[float]:
+    return None if value is None else round(value / _MB, 2)
+
+
+class BuildReport:
+    """Structured record of all build steps of a Gov instance.
+
+    The phase "total" marks the steps that enclose all others, i.e. `load_data()` and `build_indices()`.
+
+    Attributes:
+        steps (list[dict]): One record per step with the keys `phase`, `name`, `seconds`, `entries`, `rss_mb`,
+            `rss_delta_mb`, `peak_rss_mb` and, if tracemalloc is tracing, `traced_mb` and `traced_peak_mb`.
+        path_search (list[dict]): One record per iteration of the latest path search with the keys `iteration`,
+            `states`, `edges`, `final_paths`, `new_states` and `seconds`.
+    """
+
+    def __init__(self) -> None:
+        self.steps = []
+        self.path_search = []
+        self._traced_peaks = {}  # absolute tracemalloc peak of each open step, by id of its record
+
+    def clear(self):
+        self.steps = []
+        self.path_search = []
+
+    def _reset_traced_peak(self):
+        """Reset the peak of tracemalloc. The peak so far is kept for all open steps."""
+        _, traced_peak = tracemalloc.get_traced_memory()
+        for key, peak in list(self._traced_peaks.items()):
+            self._traced_peaks[key] = max(peak, traced_peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def step(self, phase: str, name: str) -> Iterator[dict]:
+        """Record a build step. The caller may set `entries` (and further keys) on the yielded record."""
+        record = {"phase": phase, "name": name, "entries": None}
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self._reset_traced_peak()
+            traced_before, _ = tracemalloc.get_traced_memory()
+            self._traced_peaks[id(record)] = traced_before
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            rss = current_rss()
+            record["rss_mb"] = _to_mb(rss)
+            record["rss_delta_mb"] = None if rss is None or rss_before is None else _to_mb(rss - rss_before)
+            record["peak_rss_mb"] = _to_mb(peak_rss())
+            if tracing:
+                traced, traced_peak = tracemalloc.get_traced_memory()
+                traced_peak = max(traced_peak, self._traced_peaks.pop(id(record), traced_peak))
+                record["traced_mb"] = _to_mb(traced - traced_before)
+                record["traced_peak_mb"] = _to_mb(traced_peak - traced_before)
+            self.steps.append(record)
+
+    def start_path_search(self):
+        """Drop the iterations of the previous path search."""
+        self.path_search = []
+
+    def add_iteration(self, states: int, edges: int, final_paths: int, new_states: int, seconds: float):
+        """Record one breadth-first iteration of the path search."""
+        self.path_search.append(
+            {
+                "iteration": len(self.path_search),
+                "states": states,
+                "edges": edges,
+                "final_paths": final_paths,
+                "new_states": new_states,
+                "seconds": round(seconds, 4),
+            }
+        )
+
+    def to_dict(self) -> dict:
+        """Return the report as JSON serializable dict."""
+        return {
+            "total_seconds": round(sum(step["seconds"] for step in self.steps if step["phase"] == "total"), 4),
+            "peak_rss_mb": _to_mb(peak_rss()),
+            "steps": [dict(step) for step in self.steps],
+            "path_search": [dict(iteration) for iteration in self.path_search],
+        }
@@ -0,0 +1,110 @@
+"""This module contains the ResultStore class, a persistent cache of Matcher results in a local SQLite file.
+
+Matching the same locations again is wasted work as long as neither the Gov data nor the matcher configuration
+changed. A `ResultStore` keeps the result of each location across runs. A result is keyed by
+    * the normalized parts of the location (see `Matcher.get_query_parts()`) and
+    * a configuration key: the `window_key` of the Gov instance (which contains the fingerprint of its csv files),
+      the parameters of the matcher and any further `context` of the store, e.g. whether preprocessing is used.
+Results of other configurations stay in the file, so switching back and forth between configurations is cheap.
+
+Examples:
+```Python
+store = ResultStore("results.sqlite", preprocessing=False)
+matcher = Matcher(gov, result_store=store)
+matcher.get_match_for_locations(locations)  # only locations missing in the store are matched
+store.close()
+```
+"""
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from . import snapshot
+
+logger = logging.getLogger(__name__)
+
+# Bump this version whenever the schema or the results of `Matcher` change.
+RESULT_STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    config TEXT NOT NULL,
+    parts TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (config, parts)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    """Persistent cache of Matcher results in an SQLite file.
+
+    New results are buffered and written in batches of `batch_size` results, by `flush()` or by `close()`.
+
+    Attributes:
+        file (Path): Path to the SQLite file.
+        context (dict): Further values that are part of the configuration key, e.g. `preprocessing=True`.
+        hits (int): Number of results found in the store.
+        misses (int): Number of results missing in the store.
+    """
+
+    def __init__(self, file: str, batch_size: int = 1000, **context: object) -> None:
+        """Open the store in `file`. The file is created if it does not exist.
+
+        Args:
+            file (str): Path to the SQLite file.
+            batch_size (int): Number of new results that are buffered before they are written. Defaults to 1000.
+            context (object): Further values that are part of the configuration key.
+        """
+        self.file = Path(file)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.context = context
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._pending = []
+        self._connection = sqlite3.connect(self.file, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        logger.info(f"Opened result store {self.file}.")
+
+    def config_key(self, window_key: str, params: dict[str, object]) -> str:
+        """Return the configuration key for the Gov instance with `window_key` and the matcher `params`."""
+        return snapshot.fingerprint(
+            [], RESULT_STORE_VERSION, window_key, sorted(params.items()), sorted(self.context.items())
+        )
+
+    def get(self, config: str, parts: tuple[str]) -> Optional[dict]:
+        """Return the stored result of `parts` or None if it is missing."""
+        row = self._connection.execute(
+            "SELECT result FROM results WHERE config = ? AND parts = ?", (config, json.dumps(parts))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, config: str, parts: tuple[str], result: dict) -> None:
+        """Store the result of `parts`. It is written with the next batch."""
+        self._pending.append((config, json.dumps(parts), json.dumps(result, ensure_ascii=False)))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered results."""
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", self._pending)
+        self._pending = []
+
+    def __len__(self) -> int:
+        self.flush()
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()
+        return count
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
@@ -0,0 +1,280 @@
+"""This module contains helpers to share the read-only search indices of Gov between processes.
+
+A fully built Gov instance publishes its indices as plain NumPy arrays (`.npy` files) into a folder.
+Other processes attach to the folder by memory-mapping the arrays, so that all processes share the same pages
+of the operating system's page cache instead of holding a private copy of the indices.
+Strings are stored as one UTF-8 byte array plus offsets (`StringTable`) instead of Python objects.
+
+Examples:
+```Python
+publish(folder, {"ids": ids}, {"fingerprint": fingerprint})
+arrays, meta = attach(folder)
+```
+"""
+import bisect
+import pickle
+import shutil
+import tempfile
+from collections.abc import Mapping, Set
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+_META_FILE = "meta.pkl"
+
+
+class StringTable:
+    """Immutable sequence of strings stored as concatenated UTF-8 bytes and offsets.
+
+    Attributes:
+        data (np.ndarray): Concatenated UTF-8 bytes of all strings.
+        offsets (np.ndarray): The i-th string is `data[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def from_strings(strings: Iterable[str]) -> "StringTable":
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.array([len(string) for string in encoded], dtype=np.int64))
+        return StringTable(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _string(self, position: int) -> str:
+        return self.data[self.offsets[position] : self.offsets[position + 1]].tobytes().decode()
+
+    def __getitem__(self, key: Union[int, np.ndarray]) -> Union[str, np.ndarray]:
+        if isinstance(key, (int, np.integer)):
+            return self._string(int(key))
+        positions = np.asarray(key).tolist()
+        return np.array([self._string(position) for position in positions], dtype=object)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._string(position) for position in range(len(self)))
+
+    def tolist(self) -> list[str]:
+        return list(self)
+
+    def find(self, string: str) -> int:
+        """Return the position of `string` in a sorted table or -1 if it is missing."""
+        encoded = string.encode()
+        low, high = 0, len(self)
+        # Sorting by UTF-8 bytes is the same as sorting by code points. Thus, np.unique(names) is sorted, too.
+        while low < high:
+            middle = (low + high) // 2
+            if self.data[self.offsets[middle] : self.offsets[middle + 1]].tobytes() < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.data[self.offsets[low] : self.offsets[low + 1]].tobytes() == encoded:
+            return low
+        return -1
+
+
+class StringCodes(Mapping):
+    """Read-only mapping from each string of a sorted `StringTable` to its position."""
+
+    def __init__(self, table: StringTable) -> None:
+        self._table = table
+
+    def __getitem__(self, string: str) -> int:
+        position = self._table.find(string) if isinstance(string, str) else -1
+        if position < 0:
+            raise KeyError(string)
+        return position
+
+    def __contains__(self, string: object) -> bool:
+        return isinstance(string, str) and self._table.find(string) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+def _position(keys: np.ndarray, key: object) -> Optional[int]:
+    """Return the position of `key` in the sorted array `keys` or None if it is missing."""
+    if not isinstance(key, (int, np.integer)):
+        return None
+    position = int(np.searchsorted(keys, key))
+    if position < len(keys) and keys[position] == key:
+        return position
+    return None
+
+
+class CsrMapping(Mapping):
+    """Read-only mapping from an integer key to the frozenset of its integer values, stored in CSR layout.
+
+    Attributes:
+        key_array (np.ndarray): Sorted array of all keys.
+        offsets (np.ndarray): The values of `key_array[i]` are `value_array[offsets[i]:offsets[i + 1]]`.
+        value_array (np.ndarray): Values of all keys.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, values: np.ndarray) -> None:
+        self.key_array = keys
+        self.offsets = offsets
+        self.value_array = values
+
+    @staticmethod
+    def from_dict(mapping: dict[int, Iterable[int]]) -> "CsrMapping":
+        keys = sorted(mapping)
+        values = [sorted(mapping[key]) for key in keys]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.array([len(v) for v in values], dtype=np.int64))
+        flat = np.fromiter((value for v in values for value in v), dtype=np.int64, count=int(offsets[-1]))
+        return CsrMapping(np.array(keys, dtype=np.int64), offsets, flat)
+
+    def __getitem__(self, key: int) -> frozenset[int]:
+        position = _position(self.key_array, key)
+        if position is None:
+            raise KeyError(key)
+        return frozenset(self.value_array[self.offsets[position] : self.offsets[position + 1]].tolist())
+
+    def __contains__(self, key: object) -> bool:
+        return _position(self.key_array, key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.key_array.tolist())
+
+    def __len__(self) -> int:
+        return len(self.key_array)
+
+
+class StringMapping(Mapping):
+    """Read-only mapping from an integer key to a string.
+
+    Attributes:
+        key_array (np.ndarray): Sorted array of all keys.
+        strings (StringTable): The string of `key_array[i]` is `strings[i]`.
+    """
+
+    def __init__(self, keys: np.ndarray, strings: StringTable) -> None:
+        self.key_array = keys
+        self.strings = strings
+
+    @staticmethod
+    def from_dict(mapping: dict[int, str]) -> "StringMapping":
+        keys = sorted(mapping)
+        return StringMapping(np.array(keys, dtype=np.int64), StringTable.from_strings(mapping[key] for key in keys))
+
+    def __getitem__(self, key: int) -> str:
+        position = _position(self.key_array, key)
+        if position is None:
+            raise KeyError(key)
+        return self.strings[position]
+
+    def take(self, keys: np.ndarray) -> np.ndarray:
+        """Return the strings of all `keys` as object array. Raises a KeyError for the first unknown key."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(self.key_array):
+            if len(keys):
+                raise KeyError(keys[0].item())
+            return np.empty(0, dtype=object)
+        positions = np.searchsorted(self.key_array, keys)
+        positions[positions == len(self.key_array)] = 0
+        missing = self.key_array[positions] != keys
+        if missing.any():
+            raise KeyError(keys[missing][0].item())
+        return np.asarray(self.strings[positions], dtype=object)
+
+    def __contains__(self, key: object) -> bool:
+        return _position(self.key_array, key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.key_array.tolist())
+
+    def __len__(self) -> int:
+        return len(self.key_array)
+
+
+class PathSet(Set):
+    """Read-only set of paths stored in sorted order as CSR layout.
+
+    Attributes:
+        offsets (np.ndarray): The i-th path is `nodes[offsets[i]:offsets[i + 1]]`.
+        nodes (np.ndarray): Nodes of all paths.
+    """
+
+    def __init__(self, offsets: np.ndarray, nodes: np.ndarray) -> None:
+        self.offsets = offsets
+        self.nodes = nodes
+
+    @staticmethod
+    def from_paths(paths: Iterable[tuple[int, ...]]) -> "PathSet":
+        paths = sorted(paths)
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.array([len(path) for path in paths], dtype=np.int64))
+        nodes = np.fromiter((id_ for path in paths for id_ in path), dtype=np.int64, count=int(offsets[-1]))
+        return PathSet(offsets, nodes)
+
+    def _path(self, position: int) -> tuple[int, ...]:
+        return tuple(self.nodes[self.offsets[position] : self.offsets[position + 1]].tolist())
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, tuple):
+            return False
+        paths = _PathSequence(self)
+        position = bisect.bisect_left(paths, path)
+        return position < len(self) and paths[position] == path
+
+    def __iter__(self) -> Iterator[tuple[int, ...]]:
+        return (self._path(position) for position in range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class _PathSequence:
+    """Sequence view on the sorted paths of a PathSet, used for binary search."""
+
+    def __init__(self, paths: PathSet) -> None:
+        self._paths = paths
+
+    def __getitem__(self, position: int) -> tuple[int, ...]:
+        return self._paths._path(position)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def publish(folder: Path, arrays: dict[str, np.ndarray], meta: dict[str, object]) -> None:
+    """Write all arrays as `.npy` files and the meta data into `folder`.
+
+    The files are written into a temporary folder first which replaces `folder` afterwards.
+    """
+    folder = Path(folder)
+    folder.parent.mkdir(parents=True, exist_ok=True)
+    tmp_folder = Path(tempfile.mkdtemp(prefix=f".{folder.name}.", dir=folder.parent))
+    try:
+        for name, array in arrays.items():
+            np.save(tmp_folder / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        with open(tmp_folder / _META_FILE, "wb") as stream:
+            pickle.dump({**meta, "arrays": sorted(arrays)}, stream)
+        if folder.exists():
+            shutil.rmtree(folder)
+        tmp_folder.rename(folder)
+    except BaseException:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+
+
+def attach(folder: Path) -> tuple[dict[str, np.ndarray], dict[str, object]]:
+    """Memory-map all arrays in `folder` read-only and load its meta data."""
+    folder = Path(folder)
+    with open(folder / _META_FILE, "rb") as stream:
+        meta = pickle.load(stream)
+    arrays = {}
+    for name in meta.pop("arrays"):
+        try:
+            arrays[name] = np.load(folder / f"{name}.npy", mmap_mode="r")
+        except ValueError:  # empty arrays cannot be memory-mapped
+            arrays[name] = np.load(folder / f"{name}.npy")
+    return arrays, meta
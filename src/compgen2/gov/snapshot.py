@@ -0,0 +1,141 @@
+"""This module contains helpers to persist the pre-filtered Gov tables as a columnar snapshot.
+
+The snapshot is written in the Arrow IPC (feather) format without compression, so that the next load reads
+the binary columns instead of parsing the raw csv files again.
+Each snapshot lives in its own folder that is named after a content hash of the source files.
+The search indices built for a particular time window are pickled into the same folder.
+
+Examples:
+```Python
+key = fingerprint(files)
+if has_snapshot(folder / key):
+    tables = read_snapshot(folder / key)
+else:
+    write_snapshot(folder / key, tables)
+if has_index(folder / key, window_key, "all_paths"):
+    values = read_index(folder / key, window_key, "all_paths")
+```
+"""
+import hashlib
+import logging
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+# Bump this version whenever the content of the stored tables changes, e.g. due to new filter steps.
+SNAPSHOT_VERSION = 2
+SNAPSHOT_TABLES = ("items", "names", "types", "relations", "type_names")
+_BLOCK_SIZE = 1 << 20
+
+
+def fingerprint(files: Iterable[Path], *extra: object) -> str:
+    """Compute a content hash of the given files.
+
+    Args:
+        files (Iterable[Path]): Files whose content is hashed in the given order.
+        extra (object): Further values that change the content of the snapshot, e.g. filter parameters.
+
+    Returns:
+        str: hex digest of the hash.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((SNAPSHOT_VERSION, *extra)).encode())
+    for file in files:
+        h.update(Path(file).name.encode())
+        with open(file, "rb") as stream:
+            for block in iter(lambda: stream.read(_BLOCK_SIZE), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def has_snapshot(folder: Path) -> bool:
+    """Return True if `folder` contains a complete snapshot."""
+    return all((folder / f"{name}.arrow").is_file() for name in SNAPSHOT_TABLES)
+
+
+def write_snapshot(folder: Path, tables: dict[str, pd.DataFrame]) -> None:
+    """Write all tables as uncompressed Arrow IPC files into `folder`.
+
+    The files are written into a temporary folder first which is renamed afterwards.
+    Thus, a concurrent reader never sees a partially written snapshot.
+    """
+    folder = Path(folder)
+    folder.parent.mkdir(parents=True, exist_ok=True)
+    tmp_folder = Path(tempfile.mkdtemp(prefix=f".{folder.name}.", dir=folder.parent))
+    try:
+        for name in SNAPSHOT_TABLES:
+            table = pa.Table.from_pandas(tables[name], preserve_index=False)
+            feather.write_feather(table, tmp_folder / f"{name}.arrow", compression="uncompressed")
+        tmp_folder.rename(folder)
+    except OSError:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        if not has_snapshot(folder):
+            raise
+
+
+def read_snapshot(folder: Path) -> dict[str, pd.DataFrame]:
+    """Read all tables of the snapshot in `folder` as DataFrames.
+
+    The files are memory-mapped while reading, but the DataFrames own copies of the columns. Each column is
+    converted into its own block, so the columns are not copied a second time to consolidate them.
+    """
+    tables = {}
+    for name in SNAPSHOT_TABLES:
+        df = feather.read_table(Path(folder) / f"{name}.arrow", memory_map=True).to_pandas(split_blocks=True)
+        # Arrow marks missing strings as None, whereas pd.read_csv uses NaN.
+        strings = df.columns[df.dtypes == object]
+        tables[name] = df.fillna(dict.fromkeys(strings, np.nan)) if len(strings) else df
+    return tables
+
+
+def _index_file(folder: Path, window_key: str, name: str) -> Path:
+    return Path(folder) / f"indices_{window_key}" / f"{name}.pkl"
+
+
+def has_index(folder: Path, window_key: str, name: str) -> bool:
+    """Return True if `folder` contains the search index `name` of the time window `window_key`."""
+    return _index_file(folder, window_key, name).is_file()
+
+
+def write_index(folder: Path, window_key: str, name: str, values: dict[str, object]) -> None:
+    """Pickle the search index `name` of the time window `window_key` into `folder`.
+
+    `values` maps attribute names to values, so that indices collected as side effect can be stored alongside.
+    As for the tables, the file is written to a temporary file first which is renamed afterwards.
+    """
+    file = _index_file(folder, window_key, name)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(prefix=f".{file.name}.", dir=file.parent, delete=False) as stream:
+        try:
+            pickle.dump(values, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            stream.close()
+            Path(stream.name).unlink(missing_ok=True)
+            raise
+    Path(stream.name).replace(file)
+
+
+def read_index(folder: Path, window_key: str, name: str) -> dict[str, object]:
+    """Load the search index `name` of the time window `window_key` from `folder`."""
+    with open(_index_file(folder, window_key, name), "rb") as stream:
+        return pickle.load(stream)
+
+
+def prune_snapshots(root: Path, keep: str) -> None:
+    """Remove all complete snapshots in `root` except the one named `keep`.
+
+    Temporary folders (starting with a dot) belong to a concurrent `write_snapshot()` and are left alone,
+    as is anything else that is not a snapshot.
+    """
+    for folder in Path(root).iterdir():
+        if folder.is_dir() and folder.name != keep and not folder.name.startswith(".") and has_snapshot(folder):
+            shutil.rmtree(folder, ignore_errors=True)
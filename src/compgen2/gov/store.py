@@ -0,0 +1,395 @@
+"""This module contains the GovStore class, a Gov backend that answers all queries from a local SQLite file.
+
+A fully built Gov instance keeps all search indices in memory. For small machines, `GovStore.write()` persists
+the indices into an indexed SQLite file once. `GovStore(file)` then answers the same queries as `Gov` from that file.
+Only a bounded LRU cache of recent lookups and SQLite's page cache are held in memory.
+
+The store is read-only. It supports the query surface that `Matcher` uses, so it can replace a Gov instance there.
+
+Examples:
+```Python
+gov = Gov(data_root)
+gov.load_data()
+gov.build_indices()
+GovStore.write("gov.sqlite", gov)
+
+store = GovStore("gov.sqlite", cache_size=10_000)
+store.ids_by_name["aachen"]
+Matcher(store).get_match_for_locations(["Aachen"])
+```
+"""
+import logging
+import sqlite3
+import tempfile
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump this version whenever the schema changes.
+STORE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE names (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE name_ids (code INTEGER NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (code, id)) WITHOUT ROWID;
+CREATE INDEX name_ids_by_id ON name_ids (id, code);
+CREATE TABLE items (id INTEGER PRIMARY KEY, textual_id TEXT NOT NULL);
+CREATE TABLE types (id INTEGER NOT NULL, type_id INTEGER NOT NULL, PRIMARY KEY (id, type_id)) WITHOUT ROWID;
+CREATE INDEX types_by_type ON types (type_id, id);
+CREATE TABLE type_names (type_id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE ancestors (id INTEGER NOT NULL, ancestor INTEGER NOT NULL, PRIMARY KEY (id, ancestor)) WITHOUT ROWID;
+CREATE INDEX descendants ON ancestors (ancestor, id);
+"""
+
+# SQLite limits the number of parameters of a statement (999 in older versions).
+_MAX_PARAMETERS = 900
+
+
+def _chunks(values: Iterable[object]) -> Iterator[list[object]]:
+    """Split `values` into lists that fit into the parameters of one statement."""
+    values = list(values)
+    for start in range(0, len(values), _MAX_PARAMETERS):
+        yield values[start : start + _MAX_PARAMETERS]
+
+
+class GovStore:
+    """Read-only Gov backend that answers queries from an SQLite file written by `GovStore.write()`.
+
+    Lookups of single names and ids are cached in an LRU cache of `cache_size` entries per kind of lookup.
+    Queries for sets of ids or names are not cached, since their results can be arbitrarily large.
+    They always return Python sets, `as_id_set` is accepted for compatibility with `Gov`.
+
+    Attributes:
+        file (Path): Path to the SQLite file.
+        fingerprint (str): Content hash of the source csv files of the Gov instance the store was written from.
+        window_key (str): Hash of the time window and the supernodes of that Gov instance.
+        names_key (str): Hash of all location names of that Gov instance.
+        t_begin (int): Begin of the time window in julian date format (times 10).
+        t_end (int): End of the time window in julian date format (times 10).
+        lazy (bool): Always False. Present for compatibility with `Gov`.
+        fully_initialized (bool): Always True. Present for compatibility with `Gov`.
+        items_by_id (Mapping): A read-only mapping between an item's id and its textual id.
+        items (Mapping): Same as `items_by_id`, the Gov tables themselves are not stored.
+        types_by_id (Mapping): A read-only mapping between an item's id and the frozenset of its types.
+        ids_by_type (Mapping): A read-only mapping between a type and the frozenset of its ids.
+        names_by_id (Mapping): A read-only mapping between an item's id and the frozenset of its names.
+        ids_by_name (Mapping): A read-only mapping between a name and the frozenset of its ids.
+        type_names_by_type (dict): A mapping from the type-id to its type-name.
+    """
+
+    lazy = False
+    fully_initialized = True
+
+    def __init__(self, file: str, cache_size: int = 65536, page_cache_mb: int = 32) -> None:
+        """Open the store in `file`.
+
+        Args:
+            file (str): Path to an SQLite file written by `GovStore.write()`.
+            cache_size (int): Maximum number of entries of each LRU cache. Defaults to 65536.
+            page_cache_mb (int): Size of SQLite's page cache in megabytes. Defaults to 32.
+        """
+        self.file = Path(file)
+        if not self.file.is_file():
+            raise FileNotFoundError(self.file)
+        self._connection = sqlite3.connect(f"{self.file.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        self._connection.execute(f"PRAGMA cache_size = {-1024 * page_cache_mb}")
+
+        meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"{self.file} has version {meta.get('version')}, expected {STORE_VERSION}.")
+        self.fingerprint = meta["fingerprint"]
+        self.window_key = meta["window_key"]
+        self.names_key = meta["names_key"]
+        self.t_begin = meta["t_begin"]
+        self.t_end = meta["t_end"]
+        self.type_names_by_type = dict(self._connection.execute("SELECT type_id, name FROM type_names"))
+        self._name_universes = {}
+
+        self._name_code = lru_cache(maxsize=cache_size)(self._query_name_code)
+        self._ids_of_code = lru_cache(maxsize=cache_size)(self._query_ids_of_code)
+        self._names_of_id = lru_cache(maxsize=cache_size)(self._query_names_of_id)
+        self._types_of_id = lru_cache(maxsize=cache_size)(self._query_types_of_id)
+        self._textual_id = lru_cache(maxsize=cache_size)(self._query_textual_id)
+        self._count_reachable = lru_cache(maxsize=cache_size)(self._query_count_reachable)
+        self._is_ancestor = lru_cache(maxsize=cache_size)(self._query_is_ancestor)
+
+        self.ids_by_name = _IdsByName(self)
+        self.names_by_id = _Lookup(self, self._names_of_id, "SELECT DISTINCT id FROM name_ids ORDER BY id")
+        self.items_by_id = _Lookup(self, self._textual_id, "SELECT id FROM items ORDER BY id")
+        self.items = self.items_by_id
+        self.types_by_id = _Lookup(self, self._types_of_id, "SELECT DISTINCT id FROM types ORDER BY id")
+        self.ids_by_type = _Lookup(self, self._ids_of_type, "SELECT DISTINCT type_id FROM types ORDER BY type_id")
+        logger.info(f"Opened gov store {self.file}.")
+
+    @staticmethod
+    def write(file: str, gov) -> "GovStore":
+        """Persist the search indices of `gov` into the SQLite file `file` and open it.
+
+        The file is written to a temporary file first which replaces `file` afterwards.
+
+        Args:
+            file (str): Path to the SQLite file.
+            gov (Gov): Gov instance. Its indices are built first if necessary.
+
+        Returns:
+            GovStore: The opened store.
+        """
+        if not gov.fully_initialized:
+            if gov.items.empty:
+                gov.load_data()
+            gov.build_indices()
+
+        file = Path(file)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Writing gov store {file}.")
+        with tempfile.NamedTemporaryFile(prefix=f".{file.name}.", dir=file.parent, delete=False) as stream:
+            tmp_file = Path(stream.name)
+        try:
+            connection = sqlite3.connect(tmp_file)
+            with connection:
+                connection.executescript(_SCHEMA)
+                GovStore._write_tables(connection, gov)
+            connection.execute("VACUUM")
+            connection.close()
+            tmp_file.replace(file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        return GovStore(file)
+
+    @staticmethod
+    def _write_tables(connection: sqlite3.Connection, gov):
+        meta = {
+            "version": STORE_VERSION,
+            "fingerprint": gov.fingerprint,
+            "window_key": gov.window_key,
+            "names_key": gov.names_key,
+            "t_begin": gov.t_begin,
+            "t_end": gov.t_end,
+        }
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+
+        index = gov.name_index
+        connection.executemany("INSERT INTO names VALUES (?, ?)", enumerate(index.names.tolist()))
+        codes = np.repeat(np.arange(len(index.names)), np.diff(index.id_offsets))
+        connection.executemany(
+            "INSERT INTO name_ids VALUES (?, ?)", zip(codes.tolist(), np.asarray(index.id_values).tolist())
+        )
+
+        connection.executemany("INSERT INTO items VALUES (?, ?)", gov.items_by_id.items())
+        connection.executemany(
+            "INSERT INTO types VALUES (?, ?)",
+            ((id_, type_) for id_, types in gov.types_by_id.items() for type_ in types),
+        )
+        connection.executemany("INSERT INTO type_names VALUES (?, ?)", gov.type_names_by_type.items())
+
+        reachability = gov.reachability
+        ids = np.asarray(reachability.ids)
+        nodes = np.repeat(np.arange(len(ids)), np.diff(reachability.ancestor_offsets))
+        connection.executemany(
+            "INSERT INTO ancestors VALUES (?, ?)",
+            zip(ids[nodes].tolist(), ids[np.asarray(reachability.ancestors)].tolist()),
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def cache_info(self) -> dict[str, tuple]:
+        """Return the statistics of each LRU cache."""
+        return {
+            name: getattr(self, name).cache_info()
+            for name in (
+                "_name_code",
+                "_ids_of_code",
+                "_names_of_id",
+                "_types_of_id",
+                "_textual_id",
+                "_count_reachable",
+                "_is_ancestor",
+            )
+        }
+
+    def _query(self, statement: str, *parameters) -> list[tuple]:
+        return self._connection.execute(statement, parameters).fetchall()
+
+    def _query_name_code(self, name: str) -> Optional[int]:
+        row = self._connection.execute("SELECT code FROM names WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def _query_ids_of_code(self, code: int) -> frozenset[int]:
+        return frozenset(id_ for (id_,) in self._query("SELECT id FROM name_ids WHERE code = ?", code))
+
+    def _query_names_of_id(self, id_: int) -> Optional[frozenset[str]]:
+        names = self._query(
+            "SELECT name FROM name_ids JOIN names USING (code) WHERE name_ids.id = ?",
+            id_,
+        )
+        return frozenset(name for (name,) in names) or None
+
+    def _query_types_of_id(self, id_: int) -> Optional[frozenset[int]]:
+        return frozenset(type_ for (type_,) in self._query("SELECT type_id FROM types WHERE id = ?", id_)) or None
+
+    def _ids_of_type(self, type_: int) -> Optional[frozenset[int]]:
+        return frozenset(id_ for (id_,) in self._query("SELECT id FROM types WHERE type_id = ?", type_)) or None
+
+    def _query_textual_id(self, id_: int) -> Optional[str]:
+        row = self._connection.execute("SELECT textual_id FROM items WHERE id = ?", (id_,)).fetchone()
+        return None if row is None else row[0]
+
+    def _query_count_reachable(self, id_: int) -> int:
+        (count,) = self._connection.execute(
+            "SELECT COUNT(*) FROM ("
+            "SELECT ancestor FROM ancestors WHERE id = ? UNION SELECT id FROM ancestors WHERE ancestor = ?"
+            ")",
+            (id_, id_),
+        ).fetchone()
+        return count
+
+    def _query_is_ancestor(self, id_: int, ancestor: int) -> bool:
+        row = self._connection.execute(
+            "SELECT 1 FROM ancestors WHERE id = ? AND ancestor = ?",
+            (id_, ancestor),
+        ).fetchone()
+        return row is not None
+
+    def get_loc_names(self) -> set[str]:
+        """Return all location names stored in Gov
+
+        Returns:
+            set[str]: set of names
+        """
+        return {name for (name,) in self._query("SELECT name FROM names")}
+
+    def name_universe(self, type_ids: Optional[Iterable[int]] = None) -> frozenset[str]:
+        """Return the names of all ids that have any of the types `type_ids`, or all names if `type_ids` is None.
+
+        As in `Gov.name_universe()`, the names of each type group are collected once and shared.
+        """
+        key = None if type_ids is None else frozenset(type_ids)
+        if key not in self._name_universes:
+            if key is None:
+                self._name_universes[key] = frozenset(self.get_loc_names())
+            else:
+                self._name_universes[key] = frozenset(self.get_names_by_ids(self.get_ids_by_types(key)))
+        return self._name_universes[key]
+
+    def decode_path_id(self, path: tuple[int]) -> tuple[int]:
+        """Return the gov textual id for each node in a path."""
+        return tuple(self.items_by_id[o] for o in path)
+
+    def decode_path_name(self, path: tuple[int]) -> tuple[str]:
+        """Return the gov display name for each node in a path. It is the alphabetically first name of the node."""
+        return tuple(min(self.names_by_id[o]) for o in path)
+
+    def decode_path_type(self, path: tuple[int]) -> tuple[int]:
+        """Return the type display name for each node in a path."""
+        return tuple(self.type_names_by_type[next(iter(self.types_by_id[o]))] for o in path)
+
+    def get_ids_by_types(self, type_ids: set[int], as_id_set: bool = False) -> set[int]:
+        """
+        Get the set of gov-ids based on a set of type-ids.
+        """
+        ids = set()
+        for chunk in _chunks(type_ids):
+            statement = f"SELECT id FROM types WHERE type_id IN ({','.join('?' * len(chunk))})"
+            ids.update(id_ for (id_,) in self._query(statement, *chunk))
+        return ids
+
+    def get_names_by_ids(self, gov_ids: set[int]) -> set[str]:
+        """
+        Get the set of names based on a set of gov-ids.
+        """
+        codes = set()
+        for chunk in _chunks(gov_ids):
+            statement = f"SELECT code FROM name_ids WHERE id IN ({','.join('?' * len(chunk))})"
+            codes.update(code for (code,) in self._query(statement, *chunk))
+        names = set()
+        for chunk in _chunks(codes):
+            statement = f"SELECT name FROM names WHERE code IN ({','.join('?' * len(chunk))})"
+            names.update(name for (name,) in self._query(statement, *chunk))
+        return names
+
+    def get_ids_by_names(self, names: set[str], as_id_set: bool = False) -> set[int]:
+        codes = (self._name_code(name) for name in names)
+        return set().union(*(self._ids_of_code(code) for code in codes if code is not None))
+
+    def get_reachable_nodes_by_id(self, gov_ids: set[int], as_id_set: bool = False) -> set[int]:
+        """
+        Get the set of gov-ids that share a path with any of the given gov-ids.
+        """
+        ids = set()
+        for chunk in _chunks(gov_ids):
+            parameters = ",".join("?" * len(chunk))
+            statement = (
+                f"SELECT ancestor FROM ancestors WHERE id IN ({parameters}) "
+                f"UNION SELECT id FROM ancestors WHERE ancestor IN ({parameters})"
+            )
+            ids.update(id_ for (id_,) in self._query(statement, *chunk, *chunk))
+        return ids
+
+    def is_reachable(self, gov_id: int, other_id: int) -> bool:
+        """
+        Return True if both gov-ids are different and share a path.
+        """
+        if gov_id == other_id:
+            return False
+        return self._is_ancestor(gov_id, other_id) or self._is_ancestor(other_id, gov_id)
+
+    def count_reachable_nodes(self, gov_id: int) -> int:
+        """
+        Return the number of gov-ids that share a path with the given gov-id.
+        """
+        return self._count_reachable(gov_id)
+
+
+class _Lookup(Mapping):
+    """Read-only mapping whose values are looked up by `get_value`, which returns None for missing keys."""
+
+    def __init__(self, store: GovStore, get_value, keys_statement: str) -> None:
+        self._store = store
+        self._get_value = get_value
+        self._keys_statement = keys_statement
+
+    def __getitem__(self, key: int):
+        value = self._get_value(key) if isinstance(key, (int, np.integer)) else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, (int, np.integer)) and self._get_value(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return (key for (key,) in self._store._connection.execute(self._keys_statement))
+
+    def __len__(self) -> int:
+        (length,) = self._store._connection.execute(f"SELECT COUNT(*) FROM ({self._keys_statement})").fetchone()
+        return length
+
+
+class _IdsByName(Mapping):
+    """Read-only mapping from a name to the frozenset of its ids."""
+
+    def __init__(self, store: GovStore) -> None:
+        self._store = store
+
+    def __getitem__(self, name: str) -> frozenset[int]:
+        code = self._store._name_code(name) if isinstance(name, str) else None
+        if code is None:
+            raise KeyError(name)
+        return self._store._ids_of_code(code)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._store._name_code(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for (name,) in self._store._connection.execute("SELECT name FROM names ORDER BY code"))
+
+    def __len__(self) -> int:
+        (length,) = self._store._connection.execute("SELECT COUNT(*) FROM names").fetchone()
+        return length
@@ -83,12 +83,13 @@ class Synthetic:
           size (int): number of synthetic records that get created
         """
         all_paths = list(self.gov.all_paths)
+        # decode all paths at once, the random choice picks a (path, decoded path) pair
+        all_paths = list(zip(all_paths, self.gov.decode_paths(all_paths, "name")))
         test_set = {"location": [], "truth": []}
         while len(test_set["location"]) < size:
-            p_id = random.choice(all_paths)
+            p_id, p = random.choice(all_paths)
             if len(p_id) < num_parts:
                 continue
-            p = self.gov.decode_path_name(p_id)
             location = self.create_location_from_path(p, num_parts)
             location_string = ", ".join(location)
             if location_string in test_set["truth"]:
@@ -205,7 +206,7 @@ def sample_test_set_from_gov(gov: Gov, size: int, num_parts: int = 2, valid: flo
     while len(test_set["location"]) != size:
         sample_id = random.sample(population=population, k=1)[0]
         while True:
-            sample_nodes = random.sample(gov.all_reachable_nodes_by_id[sample_id], k=num_parts)
+            sample_nodes = random.sample(sorted(gov.get_reachable_nodes_by_id({sample_id})), k=num_parts)
             try:
                 item = ", ".join(
                         map(
@@ -1,6 +1,8 @@
 import pytest
 from pathlib import Path
 
+from compgen2 import Gov
+
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -8,6 +10,15 @@ def pytest_addoption(parser):
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def data_root(request):
-    return request.config.getoption("--data-root")
\ No newline at end of file
+    return request.config.getoption("--data-root")
+
+
+@pytest.fixture(scope="module")
+def built_gov(data_root):
+    """A fully built Gov instance that is shared by the tests of a module. Tests must not change it."""
+    gov = Gov(data_root, use_snapshot=False)
+    gov.load_data()
+    gov.build_indices()
+    return gov
@@ -0,0 +1,52 @@
+import pytest
+
+from compgen2.correction import DeletionIndex, LocCorrection
+
+NAMES = ("aachen", "aalen", "alsdorf", "altdorf", "berlin", "bernau", "bremen", "dorf", "waldorf", "waldorfstetten")
+
+
+def test_search_like_trie():
+    index = DeletionIndex(NAMES, max_cost=3, prefix_length=4)
+    trie = LocCorrection(NAMES)
+    for query in ["aachne", "Alstorf", "berln", "xxdorf", "waldorfstädten", "", "zzzzzzzz"]:
+        for cost in (1, 2, 3):
+            expected = {(name, distance) for name, distance in trie.search(query, cost)}
+            found = index.search(query, cost)
+            assert found == sorted(found)
+            # The trie skips names worse than the last one it found, so it only returns a subset.
+            assert expected <= set(found)
+            best = min((distance for _, distance in found), default=None)
+            assert {name for name, distance in found if distance == best} == {
+                name for name, distance in expected if distance == best
+            }
+
+
+def test_search_restricted():
+    index = DeletionIndex(NAMES, max_cost=2)
+    assert index.search("aldorf", 1) == [("alsdorf", 1), ("altdorf", 1), ("waldorf", 1)]
+    assert index.search("aldorf", 1, {"altdorf", "dorf"}) == [("altdorf", 1)]
+    with pytest.raises(ValueError):
+        index.search("aldorf", 3)
+
+
+def test_search_by_cost():
+    index = DeletionIndex(NAMES, max_cost=3, prefix_length=4)
+    for query in ["aachne", "Alstorf", "berln", "xxdorf", "waldorfstädten", "", "dorf"]:
+        levels = list(index.search_by_cost(query, 3, {"aachen", "alsdorf", "dorf", "waldorf"}))
+        assert len(levels) == 4
+        expected = index.search(query, 3, {"aachen", "alsdorf", "dorf", "waldorf"})
+        assert sorted(found for level in levels for found in level) == expected
+        assert all(distance == cost for cost, level in enumerate(levels) for _, distance in level)
+    with pytest.raises(ValueError):
+        next(index.search_by_cost("aldorf", 4))
+
+
+def test_save_and_load(tmp_path):
+    index = DeletionIndex(NAMES, max_cost=2, prefix_length=4)
+    index.save(str(tmp_path / "index"), {"key": 1})
+    loaded, meta = DeletionIndex.load(str(tmp_path / "index"))
+    assert meta == {"key": 1}
+    assert len(loaded) == len(index)
+    for query in ["aachne", "Alstorf", "berln", "xxdorf", ""]:
+        assert loaded.search(query, 2) == index.search(query, 2)
+        assert list(loaded.search_by_cost(query, 2)) == list(index.search_by_cost(query, 2))
@@ -1,5 +1,11 @@
+import json
+import shutil
+from pathlib import Path
+
 from compgen2 import Gov
+from compgen2.const import SUPERNODES
 import numpy as np
+import pandas as pd
 import pytest
 
 @pytest.fixture
@@ -16,10 +22,171 @@ def test_read_gov_data(gov):
     assert gov.type_names.dtypes.to_list() == [int, object, object]
 
 
-def test_build_paths(gov):
-    gov.load_data()
-    gov.build_indices()
-    paths = gov.all_paths
+def test_build_paths(built_gov):
+    paths = built_gov.all_paths
     assert isinstance(paths, set)
     assert all(isinstance(path, tuple) for path in paths)
     assert all(isinstance(id_, int) for path in paths for id_ in path)
+
+
+def test_decode_paths(built_gov):
+    paths = list(built_gov.all_paths)
+    assert built_gov.decode_paths(paths, "id") == [built_gov.decode_path_id(path) for path in paths]
+    assert built_gov.decode_paths(paths, "name") == [built_gov.decode_path_name(path) for path in paths]
+    assert built_gov.decode_paths(paths, "type") == [built_gov.decode_path_type(path) for path in paths]
+    ids = np.array([path[-1] for path in paths])
+    assert built_gov.decode_ids(ids, "id").tolist() == [built_gov.items_by_id[id_] for id_ in ids]
+    with pytest.raises(KeyError):
+        built_gov.decode_ids([-1])
+
+
+def test_queries_as_id_set(built_gov):
+    type_ids = set(list(built_gov.ids_by_type)[:3])
+    assert built_gov.get_ids_by_types(type_ids, as_id_set=True) == built_gov.get_ids_by_types(type_ids)
+    names = set(sorted(built_gov.ids_by_name)[:10])
+    ids = built_gov.get_ids_by_names(names, as_id_set=True)
+    assert ids == built_gov.get_ids_by_names(names)
+    assert built_gov.get_reachable_nodes_by_id(ids, as_id_set=True) == built_gov.get_reachable_nodes_by_id(set(ids))
+    assert built_gov.get_names_by_ids(ids) == built_gov.get_names_by_ids(set(ids))
+
+
+def test_name_universe(gov):
+    gov.load_data()
+    gov.build_indices()
+    assert gov.name_universe() == gov.get_loc_names()
+    assert gov.name_universe() is gov.name_universe()
+    type_ids = set(list(gov.ids_by_type)[:3])
+    assert gov.name_universe(type_ids) == gov.get_names_by_ids(gov.get_ids_by_types(type_ids))
+    assert gov.name_universe(type_ids) is gov.name_universe(list(type_ids))
+    name = next(iter(gov.name_universe()))
+    gov.rename({name: name + " renamed"})
+    assert name + " renamed" in gov.name_universe()
+
+
+def test_load_data_from_snapshot(data_root, tmp_path):
+    for file in Path(data_root).glob("gov_a_*.csv"):
+        shutil.copy(file, tmp_path)
+    gov_csv = Gov(tmp_path)
+    gov_csv.load_data()
+    assert not (tmp_path / "gov_snapshot").exists()
+    gov_snapshot = Gov(tmp_path, use_snapshot=True)
+    gov_snapshot.load_data()  # writes the snapshot if it does not exist yet
+    gov_snapshot.load_data()  # reads the snapshot
+    assert gov_snapshot.fingerprint == gov_csv.fingerprint
+    for table in ["items", "names", "types", "relations", "type_names"]:
+        pd.testing.assert_frame_equal(
+            getattr(gov_snapshot, table).reset_index(drop=True),
+            getattr(gov_csv, table).reset_index(drop=True),
+        )
+
+
+def test_load_data_in_chunks(data_root):
+    gov_csv = Gov(data_root, use_snapshot=False)
+    gov_csv.load_data()
+    gov_chunks = Gov(data_root, use_snapshot=False, chunk_size=4096)
+    gov_chunks.load_data()
+    for table in ["items", "names", "types", "relations", "type_names"]:
+        pd.testing.assert_frame_equal(
+            getattr(gov_chunks, table).reset_index(drop=True),
+            getattr(gov_csv, table).reset_index(drop=True),
+        )
+
+
+def test_build_without_relations(data_root, tmp_path):
+    for file in Path(data_root).glob("gov_a_*.csv"):
+        shutil.copy(file, tmp_path)
+    with open(Path(data_root) / "gov_a_relation.csv") as stream:
+        (tmp_path / "gov_a_relation.csv").write_text(stream.readline())
+    gov = Gov(tmp_path, use_snapshot=False)
+    gov.load_data()
+    gov.build_indices()
+    assert gov.all_paths == {(id_,) for id_ in SUPERNODES}
+
+
+def test_lazy_indices(data_root):
+    gov = Gov(data_root, lazy=True)
+    assert gov.materialized_indices == set()
+    assert len(gov.ids_by_name) > 0
+    assert "ids_by_name" in gov.materialized_indices
+    assert "all_paths" in gov.materialized_indices
+    assert "reachability" not in gov.materialized_indices
+    assert not gov.fully_initialized
+    gov.build_indices()
+    assert gov.fully_initialized
+
+
+def test_apply_delta(data_root, tmp_path):
+    gov = Gov(data_root, use_snapshot=False)
+    gov.load_data()
+    gov.build_indices()
+    fingerprint = gov.fingerprint
+    leaf = max(gov.all_paths, key=len)[-1]
+    textual_id = gov.items_by_id[leaf]
+    pd.DataFrame({"id": [leaf], "textual_id": [textual_id], "deleted": [True]}).to_csv(
+        tmp_path / "gov_a_govitem.csv", sep="\t", index=False
+    )
+    gov.apply_delta(tmp_path)
+    assert gov.fingerprint != fingerprint
+    assert leaf not in gov.items_by_id
+    assert leaf not in gov.names_by_id
+    assert all(leaf not in path for path in gov.all_paths)
+    assert leaf not in gov.reachability
+
+
+def test_with_window(data_root):
+    t_begin, t_end = 2382000 * 10, 2404794 * 10  # 1810 to 1872
+    gov = Gov(data_root, use_snapshot=False)
+    gov.load_data()
+    gov.build_indices()
+    gov_window = gov.with_window(t_begin, t_end)
+    assert gov_window.items is gov.items
+    assert gov_window._names_by_id_raw is gov._names_by_id_raw
+    gov_window.build_indices()
+    gov_expected = Gov(data_root, use_snapshot=False, t_begin=t_begin, t_end=t_end)
+    gov_expected.load_data()
+    gov_expected.build_indices()
+    assert gov_window.all_paths == gov_expected.all_paths
+    assert dict(gov_window.names_by_id) == dict(gov_expected.names_by_id)
+
+
+def test_cached_indices(data_root, tmp_path):
+    for file in Path(data_root).glob("gov_a_*.csv"):
+        shutil.copy(file, tmp_path)
+    gov = Gov(tmp_path, use_snapshot=True)
+    gov.load_data()
+    gov.build_indices()
+    assert any((tmp_path / "gov_snapshot" / gov.fingerprint).glob("indices_*/all_paths.pkl"))
+    gov_cached = Gov(tmp_path, use_snapshot=True, lazy=True)
+    assert gov_cached.all_paths == gov.all_paths
+    assert "_names_by_id_raw" not in gov_cached.materialized_indices  # all_paths was not built again
+
+
+def test_build_report(built_gov):
+    report = built_gov.build_report()
+    steps = {(step["phase"], step["name"]): step for step in report["steps"]}
+    assert ("total", "load_data") in steps
+    assert ("total", "build_indices") in steps
+    assert steps[("read", "items")]["entries"] > 0
+    assert steps[("index", "all_paths")]["entries"] == len(built_gov.all_paths)
+    assert report["total_seconds"] > 0
+    assert sum(iteration["final_paths"] for iteration in report["path_search"]) >= len(built_gov.all_paths)
+    json.dumps(report)
+
+
+def test_publish_and_attach(built_gov, tmp_path):
+    built_gov.publish(tmp_path / "shared")
+    gov_attached = Gov.attach(tmp_path / "shared")
+    assert gov_attached.fully_initialized
+    assert set(gov_attached.all_paths) == built_gov.all_paths
+    assert dict(gov_attached.names_by_id) == dict(built_gov.names_by_id)
+    assert dict(gov_attached.ids_by_name) == dict(built_gov.ids_by_name)
+    assert dict(gov_attached.items_by_id) == built_gov.items_by_id
+    id_ = next(iter(built_gov.items_by_id))
+    assert gov_attached.get_reachable_nodes_by_id({id_}) == built_gov.get_reachable_nodes_by_id({id_})
+    assert set(gov_attached.types_by_id[id_]) == built_gov.types_by_id[id_]
+    paths = list(built_gov.all_paths)[:20]
+    assert gov_attached.decode_paths(paths, "name") == built_gov.decode_paths(paths, "name")
+    type_ids = set(built_gov.ids_by_type)
+    assert gov_attached.get_ids_by_types(type_ids, as_id_set=True) == built_gov.get_ids_by_types(type_ids)
+    with pytest.raises(ValueError):
+        gov_attached.apply_delta(tmp_path)
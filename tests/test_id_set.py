@@ -0,0 +1,20 @@
+import numpy as np
+
+from compgen2.gov.id_set import IdSet, IdSpace
+
+
+def test_id_set_algebra():
+    space = IdSpace([7, 3, 11, 5, 9], {1: {3, 5}, 2: {5, 9, 42}})
+    a = space.id_set([3, 5, 7])
+    b = space.id_set(np.array([5, 9, 13]))  # 13 is not part of the space
+    assert isinstance(a | b, IdSet)
+    assert a | b == {3, 5, 7, 9}
+    assert a & b == {5}
+    assert a - b == {3, 7}
+    assert a ^ b == {3, 7, 9}
+    assert 7 in a and 9 not in a and "7" not in a
+    assert a.ids.tolist() == [3, 5, 7]
+    assert space.id_set([5]) <= a
+    assert a | {1} == {1, 3, 5, 7}
+    assert space.of_types({2, 99}) == {5, 9}
+    assert space.of_types(set()) == set()
@@ -0,0 +1,55 @@
+from compgen2.correction import LocCorrection
+
+NAMES = ("aachen", "aalen", "alsdorf", "altdorf", "berlin", "bernau", "bremen", "dorf", "waldorf", "waldorfstetten")
+
+
+def test_trie_ranges():
+    trie = LocCorrection(NAMES).trie
+    assert (trie.code_begins[0], trie.code_ends[0], trie.ends[0]) == (0, len(NAMES), len(trie))
+    # pre-order: root, a, a, c, h, e, n, l, e, n, l, s, ...
+    assert "".join(map(chr, trie.letters[1:11])) == "aachenlenl"
+    node = 10  # "al"
+    assert (trie.code_begins[node], trie.code_ends[node]) == (2, 4)
+    assert trie.words[trie.word_codes[trie.ends[node] - 1]] == "altdorf"
+
+
+def test_save_and_load(tmp_path):
+    correction = LocCorrection(NAMES)
+    correction.save(tmp_path / "trie", {"key": "value"})
+    loaded = LocCorrection.load(tmp_path / "trie")
+    assert loaded.meta == {"key": "value"}
+    assert loaded.word_count == len(NAMES)
+    scope = loaded.scope({"altdorf", "dorf"})
+    assert loaded.search("aldorf", 2) == correction.search("aldorf", 2)
+    assert loaded.search("aldorf", 2, scope) == correction.search("aldorf", 2, scope)
+
+
+def test_scoped_search():
+    correction = LocCorrection(NAMES)
+    for allowed in [{"altdorf", "dorf"}, {"waldorfstetten", "aalen", "unknown"}, set(NAMES), set()]:
+        scope = correction.scope(allowed)
+        expected = LocCorrection(tuple(sorted(allowed & set(NAMES))))
+        for query in ["aldorf", "waldorf", "aachn", "bern"]:
+            for cost in (1, 2, 3):
+                assert correction.search(query, cost, scope) == expected.search(query, cost)
+
+
+def test_scope_is_lowercased():
+    correction = LocCorrection(("Berlin", "Bonn", "dorf"))
+    assert correction.scope({"Berlin", "DORF"}) == correction.scope({"berlin", "dorf"})
+    assert correction.search("berln", 1, correction.scope({"Berlin"})) == [("berlin", 1)]
+
+
+def test_search_by_cost():
+    correction = LocCorrection(NAMES)
+    scope = correction.scope({"altdorf", "dorf", "waldorf"})
+    for query in ["aldorf", "Waldorf", "aachn", "bern", ""]:
+        for search_scope in (None, scope):
+            levels = list(correction.search_by_cost(query, 3, search_scope))
+            assert len(levels) == 4
+            for cost, level in enumerate(levels):
+                assert all(distance == cost for _, distance in level)
+                # a search up to the cost returns the best level up to that cost
+                best = next((level for level in levels[: cost + 1] if level), [])
+                found = correction.search(query, cost, search_scope)
+                assert [word for word, _ in best] == [word for word, distance in found if distance == found[-1][1]]
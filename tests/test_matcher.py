@@ -0,0 +1,146 @@
+import multiprocessing
+
+from compgen2 import Gov, GovStore, Matcher, ResultStore
+from compgen2.correction import DeletionIndex, LocCorrection, NgramIndex, Phonetic
+
+
+def test_match_in_processes(built_gov, tmp_path):
+    names = sorted(built_gov.ids_by_name)
+    locations = [", ".join(names[i : i + 2]) for i in range(0, 20, 2)]
+    locations += [name[:-1] + "x" for name in names[:5]] + locations[:2]
+
+    sequential = Matcher(built_gov)
+    sequential.get_match_for_locations(locations)
+    parallel = Matcher(built_gov)
+    parallel.get_match_for_locations(locations, num_processes=2, chunk_size=3)
+    assert parallel.results == sequential.results
+    assert list(parallel.results) == list(sequential.results)
+
+    store = GovStore.write(tmp_path / "gov.sqlite", built_gov)
+    store_sequential = Matcher(store)
+    store_sequential.get_match_for_locations(locations)
+    store_parallel = Matcher(store)
+    store_parallel.get_match_for_locations(locations, num_processes=2)
+    assert store_parallel.results == store_sequential.results
+
+
+def test_workers_reuse_indices(built_gov, tmp_path, monkeypatch):
+    names = sorted(built_gov.ids_by_name)
+    locations = [f"{names[0]}, {names[1]}x", names[2][:-1] + "x", names[3][1:], "xxxxxxxx"]
+    for params in [
+        {"use_difflib": False},
+        {"use_difflib": False, "use_symspell": True, "use_phonetic": True},
+        {"use_ngram_index": True},
+    ]:
+        expected = Matcher(built_gov, **params)
+        expected.get_match_for_locations(locations)
+
+        # Under fork, the workers inherit the indices of the parent. A rebuilt index leaves a marker file.
+        matcher = Matcher(built_gov, **params)
+        # the parent builds its trie on its first fuzzy search
+        matcher.get_match_for_locations(locations[:1])
+        with monkeypatch.context() as patch:
+            for cls, method in [
+                (LocCorrection, "from_list"),
+                (DeletionIndex, "__init__"),
+                (NgramIndex, "__init__"),
+                (Phonetic, "build_phonetic_index"),
+            ]:
+                patch.setattr(cls, method, lambda *args, **kwargs: (tmp_path / "rebuilt").touch())
+            matcher.get_match_for_locations(locations, num_processes=2)
+        assert not (tmp_path / "rebuilt").exists()
+        assert matcher.results == expected.results
+
+        # Without fork, the workers memory-map the indices that the parent published.
+        store = GovStore.write(tmp_path / "gov.sqlite", built_gov)
+        matcher = Matcher(store, **params)
+        with monkeypatch.context() as patch:
+            patch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+            matcher.get_match_for_locations(locations, num_processes=2)
+        assert matcher.results == expected.results
+        store.close()
+        (tmp_path / "gov.sqlite").unlink()
+
+
+def test_result_cache(built_gov):
+    names = sorted(built_gov.ids_by_name)
+    location = f"{names[0]}, {names[1]}x"
+
+    uncached = Matcher(built_gov, cache_size=0)
+    uncached.get_match_for_locations([location])
+    matcher = Matcher(built_gov, cache_size=1)
+    matcher.get_match_for_locations([location, f" {location.upper()} ", location.replace(", ", ",")])
+    assert matcher.cache_info() == (2, 1, 1, 1)
+    assert all(result == uncached.results[location] for result in matcher.results.values())
+    results = list(matcher.results.values())
+    assert all(result is not other for result, other in zip(results, results[1:]))
+    results[0]["parts"].clear()
+    assert matcher.find_match_for_location(location) == uncached.results[location]
+
+    matcher.get_match_for_locations([names[2], location])
+    assert matcher.cache_info() == (3, 3, 1, 1)
+    matcher.clear_cache()
+    assert matcher.cache_info() == (0, 0, 1, 0)
+
+
+def test_result_store(built_gov, tmp_path):
+    names = sorted(built_gov.ids_by_name)
+    locations = [f"{names[0]}, {names[1]}x", names[2], names[3][:-1]]
+    expected = Matcher(built_gov)
+    expected.get_match_for_locations(locations)
+
+    store = ResultStore(tmp_path / "results.sqlite")
+    Matcher(built_gov, result_store=store).get_match_for_locations(locations)
+    assert (store.hits, store.misses, len(store)) == (0, 3, 3)
+    store.close()
+
+    store = ResultStore(tmp_path / "results.sqlite")
+    matcher = Matcher(built_gov, result_store=store)
+    matcher.get_match_for_locations([f" {location.replace(', ', ' ,')} " for location in locations])
+    assert (store.hits, store.misses) == (3, 0)
+    assert list(matcher.results.values()) == list(expected.results.values())
+
+    Matcher(built_gov, max_cost=2, result_store=store).get_match_for_locations(locations, num_processes=2)
+    assert (store.hits, store.misses, len(store)) == (3, 3, 6)
+    store.close()
+
+
+def test_trie_folder(built_gov, tmp_path):
+    names = sorted(built_gov.ids_by_name)
+    locations = [f"{names[0]}, {names[1]}x", names[2][:-1] + "x", names[3][1:]]
+    expected = Matcher(built_gov, use_difflib=False)
+    expected.get_match_for_locations(locations)
+
+    Matcher(built_gov, use_difflib=False, trie_folder=tmp_path / "trie").get_match_for_locations(locations)
+    assert (tmp_path / "trie").exists()
+    matcher = Matcher(built_gov, use_difflib=False, trie_folder=tmp_path / "trie")
+    matcher.get_match_for_locations(locations, num_processes=2)
+    assert matcher.results == expected.results
+
+    other = built_gov.with_window(built_gov.t_begin, built_gov.t_end - 10)
+    other.build_indices()
+    trie = Matcher(other, use_difflib=False, trie_folder=tmp_path / "trie")._get_name_trie()
+    assert trie.meta["window_key"] == other.window_key
+
+
+def test_trie_folder_after_rename(data_root, tmp_path):
+    gov = Gov(data_root, use_snapshot=False)
+    gov.load_data()
+    gov.build_indices()
+    Matcher(gov, use_difflib=False, trie_folder=tmp_path / "trie")._get_name_trie()
+    name = min(gov.ids_by_name)
+    gov.rename({name: "xqzrenamed"})
+    matcher = Matcher(gov, use_difflib=False, trie_folder=tmp_path / "trie")
+    assert matcher.get_levenshtein_matches("xqzrenamd", gov.name_universe(), 1) == ["xqzrenamed"]
+    assert matcher._get_name_trie().meta["names_key"] == gov.names_key
+
+
+def test_iter_matches(built_gov):
+    names = sorted(built_gov.ids_by_name)
+    queries = [names[0][:-1] + "x", names[1][1:], names[2] + "xyz", "xxxxxxxx"]
+    for params in [{}, {"use_ngram_index": True}, {"use_difflib": False}, {"use_difflib": False, "use_symspell": True}]:
+        matcher = Matcher(built_gov, **params)
+        for relevant_names in [matcher.get_loc_names(), set(names[:20])]:
+            for query in queries:
+                expected = [matcher.get_matches(query, relevant_names, cost) for cost in (1, 2, 3)]
+                assert list(matcher.iter_matches(query, relevant_names, 3)) == expected
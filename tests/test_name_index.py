@@ -0,0 +1,29 @@
+from compgen2.gov.name_index import NameIndex
+
+NAMES_BY_ID = {
+    1: {"aachen"},
+    2: {"aachen", "achen"},
+    3: {"köln", "cöln"},
+}
+
+
+def test_views():
+    index = NameIndex.from_dict(NAMES_BY_ID)
+    assert dict(index.names_by_id) == NAMES_BY_ID
+    assert dict(index.ids_by_name) == {"aachen": {1, 2}, "achen": {2}, "köln": {3}, "cöln": {3}}
+    assert "aachen" in index.ids_by_name
+    assert "bonn" not in index.ids_by_name
+    assert 4 not in index.names_by_id
+    assert index.get_names({1, 3, 4}) == {"aachen", "köln", "cöln"}
+    assert index.get_ids({"aachen", "cöln", "bonn"}) == {1, 2, 3}
+
+
+def test_rename():
+    index = NameIndex.from_dict(NAMES_BY_ID).rename({"achen": "aachen", "cöln": "koeln", "köln": "koeln"})
+    assert dict(index.ids_by_name) == {"aachen": {1, 2}, "koeln": {3}}
+    assert dict(index.names_by_id) == {1: {"aachen"}, 2: {"aachen"}, 3: {"koeln"}}
+
+
+def test_missing_names():
+    index = NameIndex([1, 2, 2, 3], ["aachen", float("nan"), "achen", None])
+    assert dict(index.names_by_id) == {1: {"aachen"}, 2: {"achen"}}
@@ -0,0 +1,36 @@
+import difflib
+
+from compgen2.correction import NgramIndex
+
+NAMES = ["aachen", "aalen", "alsdorf", "altdorf", "berlin", "bernau", "bremen", "dorf", "waldorf"]
+
+
+def test_candidates():
+    index = NgramIndex(NAMES)
+    assert index.ngrams("ab") == {"\x02\x02a", "\x02ab", "ab\x03"}
+    assert "aachen" in index.candidates("aachne", 0.75)
+    assert "bremen" not in index.candidates("aachne", 0.75)
+    assert index.candidates("alsdorff", 0.6, {"altdorf", "berlin"}) == ["altdorf"]
+    assert index.candidates("xyz", 0.6) == []
+
+
+def test_candidates_find_difflib_matches():
+    index = NgramIndex(NAMES)
+    for query in ["aachn", "alstorf", "berln", "bremn", "dorff"]:
+        for cutoff in (0.9, 0.75, 0.6):
+            expected = difflib.get_close_matches(query, NAMES, n=30, cutoff=cutoff)
+            assert difflib.get_close_matches(query, index.candidates(query, cutoff), n=30, cutoff=cutoff) == expected
+    assert index.recall(["aachn", "alstorf"], 0.6) == 1.0
+
+
+def test_save_and_load(tmp_path):
+    index = NgramIndex(NAMES)
+    index.save(str(tmp_path / "index"))
+    loaded = NgramIndex.load(str(tmp_path / "index"))
+    assert len(loaded) == len(index)
+    for query in ["aachn", "alstorf", "berln", "xyz"]:
+        for cutoff in (0.9, 0.6):
+            assert loaded.candidates(query, cutoff) == index.candidates(query, cutoff)
+            assert loaded.candidates(query, cutoff, {"altdorf", "berlin"}) == index.candidates(
+                query, cutoff, {"altdorf", "berlin"}
+            )
@@ -0,0 +1,44 @@
+import numpy as np
+
+from compgen2.gov.properties import TimedProperties, valid_mask
+
+YEAR = (100, 464)
+YEARS = {YEAR, (465, 829)}
+
+
+def test_rows_of():
+    properties = TimedProperties(
+        np.array([3, 1, 3, 3, 1]),
+        np.array([30, 10, 31, 30, 11]),
+        np.array([0, 0, 0, 0, 0]),
+        np.array([9, 9, 9, 9, 9]),
+        YEARS,
+    )
+    assert len(properties) == 4  # duplicate row (3, 30) is removed
+    owner, rows = properties.rows_of(np.array([3, 2, 1, 3]))
+    assert owner.tolist() == [0, 0, 2, 2, 3, 3]
+    assert properties.data["value"][rows].tolist() == [30, 31, 10, 11, 30, 31]
+
+
+def test_rows_of_empty():
+    owner, rows = TimedProperties.empty().rows_of(np.array([1, 2]))
+    assert owner.tolist() == [] and rows.tolist() == []
+
+
+def test_valid_mask_with_years():
+    properties = TimedProperties(
+        np.array([1, 1, 1]),
+        np.array([1, 2, 3]),
+        np.array([YEAR[0], 0, 500]),
+        np.array([YEAR[1], 50, 600]),
+        YEARS,
+    )
+    assert properties.data["is_year"].tolist() == [True, False, False]
+    data = properties.data
+    # a relation that is valid exactly one year is a lower limit only
+    tmin = np.full(len(data), 1000)
+    tmax = np.full(len(data), 2000)
+    assert data["value"][valid_mask(data, tmin, tmax)].tolist() == [1]
+    tmin = np.full(len(data), 40)
+    tmax = np.full(len(data), 550)
+    assert data["value"][valid_mask(data, tmin, tmax)].tolist() == [1, 2, 3]
@@ -0,0 +1,28 @@
+from compgen2.gov.reachability import ReachabilityIndex
+
+PATHS = {
+    (1, 2, 4),
+    (1, 2, 5),
+    (1, 3, 5, 6),
+    (7, 8),
+}
+
+
+def reachable_by_brute_force(id_):
+    return set().union(*(set(path) for path in PATHS if id_ in path)) - {id_}
+
+
+def test_reachable_from():
+    index = ReachabilityIndex(PATHS)
+    for id_ in range(10):
+        assert index.reachable_from({id_}) == reachable_by_brute_force(id_)
+        assert index.count_reachable(id_) == len(reachable_by_brute_force(id_))
+    assert index.reachable_from({4, 8}) == reachable_by_brute_force(4) | reachable_by_brute_force(8)
+    assert index.reachable_from(set()) == set()
+
+
+def test_is_reachable():
+    index = ReachabilityIndex(PATHS)
+    for a in range(10):
+        for b in range(10):
+            assert index.is_reachable(a, b) == (b in reachable_by_brute_force(a))
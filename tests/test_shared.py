@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from compgen2.gov.shared import CsrMapping, PathSet, StringCodes, StringMapping, StringTable
+
+
+def test_string_table():
+    strings = sorted(["aachen", "köln", "berlin", "zürich", "übach"])
+    table = StringTable.from_strings(strings)
+    assert table.tolist() == strings
+    assert table[np.array([1, 0])].tolist() == strings[1::-1]
+    codes = StringCodes(table)
+    for code, string in enumerate(strings):
+        assert codes[string] == code
+    assert "bonn" not in codes
+    assert "" not in codes
+
+
+def test_mappings():
+    types = CsrMapping.from_dict({3: {5, 1}, 1: {2}})
+    assert dict(types) == {1: frozenset({2}), 3: frozenset({1, 5})}
+    assert 2 not in types
+    items = StringMapping.from_dict({7: "object_7", 2: "object_2"})
+    assert dict(items) == {2: "object_2", 7: "object_7"}
+    assert items.take(np.array([7, 2, 7])).tolist() == ["object_7", "object_2", "object_7"]
+    with pytest.raises(KeyError):
+        items.take(np.array([2, 3]))
+
+
+def test_path_set():
+    paths = {(1, 2, 4), (1, 2), (1, 3, 5, 6), (7, 8)}
+    path_set = PathSet.from_paths(paths)
+    assert set(path_set) == paths
+    assert all(path in path_set for path in paths)
+    assert (1, 3) not in path_set
+    assert (9,) not in path_set
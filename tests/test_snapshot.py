@@ -0,0 +1,13 @@
+import pandas as pd
+
+from compgen2.gov import snapshot
+
+
+def test_prune_snapshots(tmp_path):
+    tables = {name: pd.DataFrame({"id": [1, 2]}) for name in snapshot.SNAPSHOT_TABLES}
+    snapshot.write_snapshot(tmp_path / "old", tables)
+    snapshot.write_snapshot(tmp_path / "new", tables)
+    (tmp_path / ".other.tmp1234").mkdir()  # written concurrently by another process
+    (tmp_path / "unrelated").mkdir()
+    snapshot.prune_snapshots(tmp_path, keep="new")
+    assert sorted(folder.name for folder in tmp_path.iterdir()) == [".other.tmp1234", "new", "unrelated"]
@@ -0,0 +1,40 @@
+from compgen2 import GovStore, Matcher
+
+
+def test_store_answers_like_gov(built_gov, tmp_path):
+    store = GovStore.write(tmp_path / "gov.sqlite", built_gov)
+
+    assert store.fingerprint == built_gov.fingerprint
+    assert store.get_loc_names() == built_gov.get_loc_names()
+    assert len(store.ids_by_name) == len(built_gov.ids_by_name)
+    names = sorted(built_gov.ids_by_name)[:50]
+    for name in names:
+        assert store.ids_by_name[name] == set(built_gov.ids_by_name[name])
+    assert "not a gov name" not in store.ids_by_name
+
+    ids = sorted(built_gov.items_by_id)[:50]
+    for id_ in ids:
+        assert store.items_by_id[id_] == built_gov.items_by_id[id_]
+        assert store.count_reachable_nodes(id_) == built_gov.count_reachable_nodes(id_)
+        assert all(store.is_reachable(id_, other) == built_gov.is_reachable(id_, other) for other in ids)
+    assert store.get_names_by_ids(set(ids)) == built_gov.get_names_by_ids(set(ids))
+    assert store.get_reachable_nodes_by_id(set(ids)) == built_gov.get_reachable_nodes_by_id(set(ids))
+    assert store.get_ids_by_types(set(built_gov.ids_by_type)) == built_gov.get_ids_by_types(set(built_gov.ids_by_type))
+    path = next(iter(built_gov.all_paths))
+    assert store.decode_path_id(path) == built_gov.decode_path_id(path)
+    assert store.decode_path_type(path) == built_gov.decode_path_type(path)
+
+
+def test_matcher_with_store(built_gov, tmp_path):
+    store = GovStore.write(tmp_path / "gov.sqlite", built_gov)
+    locations = [", ".join(sorted(built_gov.ids_by_name)[i : i + 2]) for i in range(0, 20, 2)]
+
+    matcher_gov = Matcher(built_gov)
+    matcher_gov.get_match_for_locations(locations)
+    matcher_store = Matcher(store)
+    matcher_store.get_match_for_locations(locations)
+    for location in locations:
+        assert matcher_store.results[location]["parts"] == matcher_gov.results[location]["parts"]
+        assert len(matcher_store.results[location]["possible_matches"]) == len(
+            matcher_gov.results[location]["possible_matches"]
+        )